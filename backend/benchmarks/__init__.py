@@ -0,0 +1 @@
+# Makes `backend.benchmarks` a package
@@ -0,0 +1,50 @@
+"""
+Latency of the cheat-scoring stage next to the rest of the post-decode pipeline.
+
+Trains a throwaway IsolationForest on synthetic frames (scikit-learn required), then times,
+per clip, the feature engine, the scorers and cheat detection run alone and batched.
+
+    python -m backend.benchmarks.bench_cheat_detection
+"""
+import time
+from typing import Callable, Dict
+
+from backend.benchmarks.bench_analysis import synthetic_landmarks
+from backend.services import features, inference
+from backend.services.artifacts import ARTIFACTS
+
+
+def _best_of(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(batch_sizes=(1, 8, 32), real_frames: int = 90, repeat: int = 5) -> Dict[str, float]:
+    from sklearn.ensemble import IsolationForest  # type: ignore
+
+    training = synthetic_landmarks(2000, seed=11).reshape(-1, 33 * 3)
+    artifacts = ARTIFACTS.replace(cheat_detector=IsolationForest(n_estimators=100, random_state=0).fit(training))
+
+    clip = inference._pad_or_truncate(synthetic_landmarks(real_frames, seed=12), inference.TARGET_LEN)
+    pose = features.PoseFeatures(clip, 30.0)
+    rows = inference._cheat_features(clip, pose.frame_valid)
+
+    results = {
+        "features_ms": _best_of(lambda: features.PoseFeatures(clip, 30.0), repeat) * 1000,
+        "analysis_ms": _best_of(lambda: inference._analyze_performance(clip, real_frames, 3.0, pose), repeat) * 1000,
+        "cheat_feature_matrix_ms": _best_of(lambda: inference._cheat_features(clip, pose.frame_valid), repeat) * 1000,
+    }
+    for batch_size in batch_sizes:
+        clips = [(artifacts, rows)] * batch_size
+        elapsed = _best_of(lambda: inference._score_cheat_batch(clips), repeat)
+        results[f"cheat_detector_batch{batch_size}_ms_per_clip"] = elapsed * 1000 / batch_size
+    return results
+
+
+if __name__ == "__main__":
+    for stage, ms in run().items():
+        print(f"{stage:<40}{ms:>10.3f} ms")
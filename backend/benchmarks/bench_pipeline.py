@@ -0,0 +1,229 @@
+"""
+End-to-end benchmark of process_video on synthetic clips, plus upload throughput against the
+FastAPI app, written as JSON so runs from different releases can be diffed.
+
+Clips are generated with OpenCV at each resolution / length / fps in the matrix. Every
+clip is profiled per stage (decode, pose, features, normalize, analysis, model, cheat,
+scoring) over a few runs, and once more under tracemalloc for peak Python/NumPy memory.
+The load test posts distinct clips to /upload_video/ at each concurrency level.
+The synthetic clips contain no person, so pose timings are a lower bound: MediaPipe
+runs its detector on every frame but never its landmark model.
+
+    python -m backend.benchmarks.bench_pipeline --output bench.json
+    python -m backend.benchmarks.bench_pipeline --quick --cheat-detector
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List, Sequence, Tuple
+
+# Measure the pipeline itself: no landmark files on disk, no cached results
+os.environ.setdefault("LANDMARK_STORE_DIR", "")
+os.environ.setdefault("RESULT_CACHE_SIZE", "0")
+os.environ.setdefault("DATABASE_PATH", ":memory:")
+# The load test sends every upload from one client address
+os.environ.setdefault("UPLOAD_IP_LIMIT", "0/1")
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+
+from backend.benchmarks.bench_analysis import synthetic_landmarks  # noqa: E402
+from backend.services import inference  # noqa: E402
+from backend.services.artifacts import ARTIFACTS  # noqa: E402
+
+RESOLUTIONS = ((640, 360), (1280, 720), (1920, 1080))
+DURATIONS_S = (2.0, 5.0)
+FRAME_RATES = (30.0, 60.0)
+CONCURRENCY = (1, 2, 4, 8)
+CONFIG_VARS = (
+    "PIPELINE_POSE_WORKERS", "PIPELINE_QUEUE_DEPTH", "POSE_MAX_SIDE", "POSE_RESIZE_INTERPOLATION",
+    "INFERENCE_POOL_KIND", "INFERENCE_WORKERS", "POSE_BATCH_MAX_SIZE", "DECODE_STRATEGY",
+)
+
+
+def make_video(path: str, width: int, height: int, frames: int, fps: float, seed: int = 0) -> str:
+    """A clip of a stick figure moving over a gradient; `seed` varies its position and colour"""
+    rng = np.random.default_rng(seed)
+    colour = tuple(int(c) for c in rng.integers(64, 255, 3))
+    gradient = np.linspace(0, 160, width, dtype=np.uint8)[None, :, None]
+    background = np.broadcast_to(gradient, (height, width, 3)).copy()
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    try:
+        scale = height / 10
+        for i in range(frames):
+            frame = background.copy()
+            x = int(width * (0.2 + 0.6 * ((i / max(1, frames - 1) + rng.random() * 0.1) % 1.0)))
+            y = int(height * 0.5 + scale * np.sin(i / 5))
+            thickness = max(1, height // 120)
+            cv2.circle(frame, (x, int(y - 3 * scale)), int(scale * 0.6), colour, -1)
+            cv2.line(frame, (x, int(y - 2.4 * scale)), (x, y), colour, thickness)
+            for dx in (-1, 1):
+                cv2.line(frame, (x, int(y - 2 * scale)), (int(x + dx * scale), int(y - scale)), colour, thickness)
+                cv2.line(frame, (x, y), (int(x + dx * scale * 0.8), int(y + 2 * scale)), colour, thickness)
+            writer.write(frame)
+    finally:
+        writer.release()
+    return path
+
+
+def install_cheat_detector() -> None:
+    """Fit a throwaway IsolationForest so the cheat stage has something to run (scikit-learn)"""
+    from sklearn.ensemble import IsolationForest  # type: ignore
+
+    training = synthetic_landmarks(2000, seed=11).reshape(-1, 33 * 3)
+    ARTIFACTS.replace(cheat_detector=IsolationForest(n_estimators=100, random_state=0).fit(training))
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def profile_clip(path: str, repeat: int = 3) -> Dict[str, Any]:
+    """Median per-stage milliseconds over `repeat` runs, then one run for peak memory"""
+    runs: List[Dict[str, float]] = []
+    walls: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = inference.process_video(path)
+        walls.append((time.perf_counter() - start) * 1000)
+        runs.append(result.get("timings_ms", {}))
+    stages = sorted({stage for run in runs for stage in run})
+    profile: Dict[str, Any] = {
+        "wall_ms": statistics.median(walls),
+        "stages_ms": {stage: statistics.median(run.get(stage, 0.0) for run in runs) for stage in stages},
+    }
+    tracemalloc.start()
+    try:
+        inference.process_video(path)
+        profile["peak_traced_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+    profile["peak_rss_mb"] = _peak_rss_mb()
+    return profile
+
+
+def profile_matrix(workdir: str, resolutions: Sequence[Tuple[int, int]] = RESOLUTIONS,
+                   durations: Sequence[float] = DURATIONS_S, frame_rates: Sequence[float] = FRAME_RATES,
+                   repeat: int = 3) -> List[Dict[str, Any]]:
+    cases = []
+    for width, height in resolutions:
+        for seconds in durations:
+            for fps in frame_rates:
+                frames = int(round(seconds * fps))
+                path = make_video(os.path.join(workdir, f"clip_{width}x{height}_{frames}f.mp4"),
+                                  width, height, frames, fps)
+                case = {"width": width, "height": height, "seconds": seconds, "fps": fps,
+                        "bytes": os.path.getsize(path)}
+                case.update(profile_clip(path, repeat))
+                cases.append(case)
+                os.remove(path)
+    return cases
+
+
+async def _load_level(client: Any, clips: Sequence[bytes], concurrency: int) -> Dict[str, Any]:
+    gate = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+
+    async def upload(index: int, data: bytes) -> None:
+        async with gate:
+            start = time.perf_counter()
+            response = await client.post(
+                "/upload_video/", files={"file": (f"clip{index}.mp4", data, "video/mp4")}
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(upload(i, data) for i, data in enumerate(clips)))
+    elapsed = time.perf_counter() - start
+    ordered = sorted(latencies)
+    return {
+        "concurrency": concurrency,
+        "requests": len(clips),
+        "throughput_rps": len(clips) / elapsed if elapsed else 0.0,
+        "latency_p50_ms": ordered[len(ordered) // 2],
+        "latency_p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "statuses": statuses,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def load_test(workdir: str, levels: Sequence[int] = CONCURRENCY, requests_per_level: int = 8,
+              size: Tuple[int, int] = (640, 360), seconds: float = 2.0) -> List[Dict[str, Any]]:
+    """Upload throughput and latency through the ASGI app, one distinct clip per request"""
+    import httpx
+
+    from backend.main import app
+
+    clips = []
+    for seed in range(requests_per_level):
+        path = make_video(os.path.join(workdir, f"load_{seed}.mp4"), size[0], size[1],
+                          int(seconds * 30), 30.0, seed=seed)
+        with open(path, "rb") as f:
+            clips.append(f.read())
+        os.remove(path)
+
+    async def run_levels() -> List[Dict[str, Any]]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            return [await _load_level(client, clips, level) for level in levels]
+
+    return asyncio.run(run_levels())
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "pipeline_version": inference.pipeline_version(),
+        "config": {name: os.environ.get(name) for name in CONFIG_VARS if os.environ.get(name) is not None},
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Profile process_video and the upload endpoint")
+    parser.add_argument("--output", help="JSON file to write (default: stdout)")
+    parser.add_argument("--quick", action="store_true", help="one small clip per axis, two concurrency levels")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per clip")
+    parser.add_argument("--cheat-detector", action="store_true", help="fit a synthetic cheat detector first")
+    parser.add_argument("--skip-load", action="store_true", help="profile clips only")
+    args = parser.parse_args(argv)
+
+    if args.cheat_detector:
+        install_cheat_detector()
+    report: Dict[str, Any] = {"environment": environment()}
+    with tempfile.TemporaryDirectory(prefix="bench_pipeline_") as workdir:
+        if args.quick:
+            report["clips"] = profile_matrix(workdir, ((640, 360),), (2.0,), (30.0,), args.repeat)
+        else:
+            report["clips"] = profile_matrix(workdir, repeat=args.repeat)
+        if not args.skip_load:
+            levels = (1, 4) if args.quick else CONCURRENCY
+            report["load"] = load_test(workdir, levels, requests_per_level=4 if args.quick else 8)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
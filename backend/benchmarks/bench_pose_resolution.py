@@ -0,0 +1,124 @@
+"""
+Pose throughput and landmark accuracy at several POSE_MAX_SIDE settings.
+
+Each setting ("<max side>/<interpolation>", "native" for colour conversion only, "legacy"
+for the old full-size channel-reversed copy) runs the same frames through a fresh estimator.
+Accuracy is the mean absolute landmark difference (normalized image coordinates) from the
+legacy run over frames detected by both, alongside the number of frames detected. Without a video argument a
+synthetic 4K clip is used, which measures throughput only since nobody is in it.
+
+    python -m backend.benchmarks.bench_pose_resolution [video.mp4] [--frames 60]
+"""
+import argparse
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from ml_models.utils.preprocessing import FramePreprocessor, PoseEstimator
+
+MAX_SIDES = (0, 1920, 1280, 960, 640, 480, 320)
+
+
+def synthetic_frames(count: int = 60, width: int = 3840, height: int = 2160, seed: int = 0) -> List[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 255, (height // 8, width // 8, 3), dtype=np.uint8)
+    base = cv2.resize(base, (width, height), interpolation=cv2.INTER_LINEAR)
+    frames = []
+    for i in range(count):
+        frame = base.copy()
+        cv2.circle(frame, (width // 4 + i * 20, height // 2), height // 8, (255, 255, 255), -1)
+        frames.append(frame)
+    return frames
+
+
+def read_frames(path: str, count: int) -> List[np.ndarray]:
+    cap = cv2.VideoCapture(path)
+    frames = []
+    try:
+        while len(frames) < count:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frames.append(frame)
+    finally:
+        cap.release()
+    return frames
+
+
+def _legacy_preprocess(frame: np.ndarray) -> np.ndarray:
+    # What extract_pose_landmarks did before: a full-size channel-reversed view MediaPipe copies
+    return np.ascontiguousarray(frame[:, :, ::-1])
+
+
+def variants(max_sides: Sequence[int] = MAX_SIDES) -> Dict[str, Callable[[], Callable[[np.ndarray], np.ndarray]]]:
+    """Setting name -> factory for a fresh frame preprocessor"""
+    found: Dict[str, Callable[[], Callable[[np.ndarray], np.ndarray]]] = {"legacy": lambda: _legacy_preprocess}
+    for side in max_sides:
+        if side == 0:
+            found["native"] = lambda: FramePreprocessor(0)
+            continue
+        for interpolation in ("area", "linear"):
+            found[f"{side}/{interpolation}"] = (
+                lambda side=side, interpolation=interpolation: FramePreprocessor(side, interpolation)
+            )
+    return found
+
+
+def _measure(frames: Sequence[np.ndarray], make: Callable[[], Callable[[np.ndarray], np.ndarray]]) -> Dict[str, object]:
+    estimator = PoseEstimator(preprocessor=make())
+    coords = np.zeros((len(frames), 33, 3), dtype=np.float32)
+    visibility = np.zeros((len(frames), 33), dtype=np.float32)
+    prepare = make()
+    try:
+        # First frame builds the graph; keep it out of the timings
+        estimator.extract(frames[0])
+        estimator.reset()
+        start = time.perf_counter()
+        for frame in frames:
+            prepare(frame)
+        preprocess_s = time.perf_counter() - start
+        start = time.perf_counter()
+        for i, frame in enumerate(frames):
+            estimator.extract_into(frame, coords[i], visibility[i])
+        total_s = time.perf_counter() - start
+    finally:
+        estimator.close()
+    return {"coords": coords, "preprocess_s": preprocess_s, "total_s": total_s}
+
+
+def run(frames: Sequence[np.ndarray], max_sides: Sequence[int] = MAX_SIDES) -> Dict[str, Dict[str, Optional[float]]]:
+    runs = {name: _measure(frames, make) for name, make in variants(max_sides).items()}
+    reference = runs["legacy"]["coords"]
+    ref_detected = ~np.all(reference == 0, axis=(1, 2))
+    results: Dict[str, Dict[str, Optional[float]]] = {}
+    for name, measured in runs.items():
+        coords = measured["coords"]
+        detected = ~np.all(coords == 0, axis=(1, 2))
+        both = detected & ref_detected
+        results[name] = {
+            "fps": len(frames) / measured["total_s"] if measured["total_s"] else None,
+            "preprocess_ms_per_frame": measured["preprocess_s"] * 1000 / len(frames),
+            "total_ms_per_frame": measured["total_s"] * 1000 / len(frames),
+            "detected_frames": float(detected.sum()),
+            "mean_abs_error": (
+                float(np.abs(coords[both, :, :2] - reference[both, :, :2]).mean()) if both.any() else None
+            ),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pose throughput vs. accuracy by input resolution")
+    parser.add_argument("video", nargs="?", help="clip with a person in it (default: synthetic 4K frames)")
+    parser.add_argument("--frames", type=int, default=60)
+    args = parser.parse_args()
+    frames = read_frames(args.video, args.frames) if args.video else synthetic_frames(args.frames)
+    height, width = frames[0].shape[:2]
+    print(f"{len(frames)} frames at {width}x{height}")
+    print(f"{'setting':<16}{'fps':>8}{'prep ms':>10}{'total ms':>10}{'detected':>10}{'abs err':>10}")
+    for setting, row in run(frames).items():
+        error = f"{row['mean_abs_error']:.4f}" if row["mean_abs_error"] is not None else "-"
+        print(f"{setting:<16}{row['fps']:>8.1f}{row['preprocess_ms_per_frame']:>10.2f}"
+              f"{row['total_ms_per_frame']:>10.2f}{row['detected_frames']:>10.0f}{error:>10}")
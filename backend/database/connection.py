@@ -1,18 +1,260 @@
-from typing import Generator, Optional
+import atexit
+import itertools
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Generator, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-# Minimal DB stub to satisfy imports; replace with real DB later
-class DummyDBSession:
-    def __enter__(self):
-        return self
+logger = logging.getLogger(__name__)
 
-    def __exit__(self, exc_type, exc_value, traceback):
-        pass
+# Support absolute (run from project root) and relative (run from backend/) imports
+try:
+    from backend.database.models import SCHEMA
+except Exception:
+    from database.models import SCHEMA
 
-def get_db() -> Generator[DummyDBSession, None, None]:
-    db: Optional[DummyDBSession] = DummyDBSession()
-    try:
-        yield db
-    finally:
-        pass
+# SQLite in WAL mode: readers never block the writer, and every uvicorn worker on the host
+# shares the same file. Each process keeps a small pool of connections; sqlite3 caches the
+# prepared statements of each connection, so hot queries are compiled once per connection.
+# The default lives under backend/data whatever directory the server is started from; a
+# relative DATABASE_PATH is still taken relative to the working directory.
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+DATABASE_PATH = os.environ.get("DATABASE_PATH", os.path.join(DATA_DIR, "app.db"))
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "8"))
+DB_BUSY_TIMEOUT_MS = int(os.environ.get("DB_BUSY_TIMEOUT_MS", "5000"))
+DB_STATEMENT_CACHE = int(os.environ.get("DB_STATEMENT_CACHE", "256"))
+# Seconds to wait for a free pooled connection before giving up
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+# Queued writes are flushed in one transaction at this size or after this many milliseconds
+DB_BATCH_SIZE = int(os.environ.get("DB_BATCH_SIZE", "256"))
+DB_BATCH_INTERVAL_MS = float(os.environ.get("DB_BATCH_INTERVAL_MS", "50"))
 
 
+class PoolTimeout(Exception):
+    """Raised when no pooled connection frees up within the pool timeout"""
+
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections, created on demand and configured once"""
+
+    def __init__(self, path: str = DATABASE_PATH, size: int = DB_POOL_SIZE, timeout: float = DB_POOL_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        # Every connection to ":memory:" is a separate database, so share one
+        self.size = 1 if path == ":memory:" else max(1, size)
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory and self.path != ":memory:":
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(
+            self.path,
+            timeout=DB_BUSY_TIMEOUT_MS / 1000.0,
+            check_same_thread=False,
+            cached_statements=DB_STATEMENT_CACHE,
+            isolation_level=None,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL only fsyncs at checkpoints; a crash may lose the last commits, never corrupt
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+        # Idempotent, and needed per connection for ":memory:" databases
+        conn.executescript(SCHEMA)
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+        if create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolTimeout(f"no free database connection after {self.timeout:.0f}s ({self.size} in use)")
+
+    @contextmanager
+    def connection(self, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a connection; work done inside runs in one transaction, rolled back on error.
+        `immediate` takes the write lock up front, for read-modify-write across processes.
+        """
+        conn = self._acquire()
+        try:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._created = 0
+
+
+class DBSession:
+    """One request's view of the database: a pooled connection inside a single transaction"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> sqlite3.Cursor:
+        return self.conn.execute(sql, params)
+
+    def executemany(self, sql: str, rows: Iterable[Sequence[Any]]) -> sqlite3.Cursor:
+        return self.conn.executemany(sql, rows)
+
+    def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[sqlite3.Row]:
+        return self.conn.execute(sql, params).fetchone()
+
+    def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        return self.conn.execute(sql, params).fetchall()
+
+
+class BatchWriter:
+    """
+    Queues INSERT/UPDATE statements and writes them in one transaction per batch, so a burst
+    of uploads costs one commit instead of one per row. Statement order is preserved.
+    """
+
+    def __init__(self, pool: ConnectionPool, max_batch: int = DB_BATCH_SIZE,
+                 interval_ms: float = DB_BATCH_INTERVAL_MS):
+        self.pool = pool
+        self.max_batch = max(1, max_batch)
+        self.interval = max(0.0, interval_ms) / 1000.0
+        # One list per add_many call, so a failed batch can be replayed group by group
+        self._pending: List[List[Tuple[str, Sequence[Any]]]] = []
+        self._pending_rows = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._has_work = threading.Event()
+        self._full = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.batches = 0
+        self.rows = 0
+        # Groups dropped because they failed even when written on their own
+        self.failed_groups = 0
+
+    def add(self, sql: str, params: Sequence[Any]) -> None:
+        self.add_many([(sql, params)])
+
+    def add_many(self, statements: Iterable[Tuple[str, Sequence[Any]]]) -> None:
+        """Queue statements that must be written together and in this order"""
+        group = list(statements)
+        if not group:
+            return
+        with self._lock:
+            self._pending.append(group)
+            self._pending_rows += len(group)
+            full = self._pending_rows >= self.max_batch
+        self._ensure_worker()
+        self._has_work.set()
+        if full:
+            self._full.set()
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, statements: List[Tuple[str, Sequence[Any]]]) -> None:
+        for sql, group in itertools.groupby(statements, key=lambda statement: statement[0]):
+            conn.executemany(sql, [params for _, params in group])
+
+    def flush(self) -> int:
+        """
+        Write everything queued so far on the calling thread; returns the rows written. If the
+        batch fails, each group is retried in its own transaction so one bad group cannot take
+        the others with it; groups that still fail are logged and dropped.
+        """
+        with self._flush_lock:
+            with self._lock:
+                groups, self._pending, self._pending_rows = self._pending, [], 0
+            if not groups:
+                return 0
+            try:
+                with self.pool.connection() as conn:
+                    self._write(conn, [statement for group in groups for statement in group])
+                written = sum(len(group) for group in groups)
+            except Exception:
+                logger.warning("batched write of %d groups failed; retrying them one by one", len(groups),
+                               exc_info=True)
+                written = 0
+                for group in groups:
+                    try:
+                        with self.pool.connection() as conn:
+                            self._write(conn, group)
+                        written += len(group)
+                    except Exception:
+                        self.failed_groups += 1
+                        logger.exception("dropping %d queued statements that failed to write: %s",
+                                         len(group), sorted({sql.split("(")[0].strip() for sql, _ in group}))
+            self.batches += 1
+            self.rows += written
+            return written
+
+    def _ensure_worker(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="db-batch-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._has_work.wait()
+            # Let the batch fill for up to `interval` unless it is already full
+            self._full.wait(self.interval)
+            self._has_work.clear()
+            self._full.clear()
+            try:
+                self.flush()
+            except Exception:
+                # flush() already logged and counted what it dropped; keep the worker alive
+                logger.exception("database batch writer failed")
+
+
+POOL = ConnectionPool()
+WRITER = BatchWriter(POOL)
+atexit.register(WRITER.flush)
+
+
+def get_db() -> Generator[DBSession, None, None]:
+    """FastAPI dependency: a DBSession whose transaction commits when the request finishes"""
+    with POOL.connection() as conn:
+        yield DBSession(conn)
+
+
+def get_fresh_db() -> Generator[DBSession, None, None]:
+    """
+    Like get_db, but first writes out rows this process has queued, so a read sees them.
+    The flush happens before a connection is borrowed; flushing while holding one could wait
+    forever on a small pool.
+    """
+    WRITER.flush()
+    with POOL.connection() as conn:
+        yield DBSession(conn)
@@ -0,0 +1,385 @@
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Weight of the newest score in each athlete's exponentially weighted mean
+ATHLETE_EWMA_ALPHA = float(os.environ.get("ATHLETE_EWMA_ALPHA", "0.3"))
+# Assessments averaged for the "rolling_mean" of an athlete summary
+ATHLETE_ROLLING_WINDOW = int(os.environ.get("ATHLETE_ROLLING_WINDOW", "5"))
+# Sport recorded in per-sport aggregates for uploads that did not name one
+UNSPECIFIED_SPORT = "unspecified"
+
+# Tables are plain SQLite; rows come back as sqlite3.Row and are turned into dicts at the edge.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS athletes (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    sport TEXT,
+    region TEXT,
+    birth_year INTEGER,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS assessments (
+    id INTEGER PRIMARY KEY,
+    athlete_id TEXT REFERENCES athletes(id),
+    video_id TEXT,
+    sport TEXT,
+    score REAL NOT NULL,
+    form_score REAL,
+    consistency_score REAL,
+    power_score REAL,
+    technique_score REAL,
+    cheat_detected INTEGER NOT NULL DEFAULT 0,
+    cheat_score REAL,
+    pipeline_version TEXT,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_assessments_athlete_time ON assessments (athlete_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_assessments_created ON assessments (created_at);
+CREATE INDEX IF NOT EXISTS idx_assessments_video ON assessments (video_id);
+
+CREATE INDEX IF NOT EXISTS idx_athletes_updated ON athletes (updated_at);
+
+-- Running aggregates per athlete and sport, updated with every clean assessment
+CREATE TABLE IF NOT EXISTS athlete_stats (
+    athlete_id TEXT NOT NULL REFERENCES athletes(id),
+    sport TEXT NOT NULL,
+    assessments INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    best_score REAL NOT NULL,
+    best_at REAL NOT NULL,
+    last_score REAL NOT NULL,
+    last_at REAL NOT NULL,
+    ewma_score REAL NOT NULL,
+    form_sum REAL NOT NULL DEFAULT 0,
+    consistency_sum REAL NOT NULL DEFAULT 0,
+    power_sum REAL NOT NULL DEFAULT 0,
+    technique_sum REAL NOT NULL DEFAULT 0,
+    component_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (athlete_id, sport)
+);
+
+-- One point per athlete, sport and UTC day for trend charts
+CREATE TABLE IF NOT EXISTS athlete_daily (
+    athlete_id TEXT NOT NULL REFERENCES athletes(id),
+    sport TEXT NOT NULL,
+    day TEXT NOT NULL,
+    assessments INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    best_score REAL NOT NULL,
+    PRIMARY KEY (athlete_id, sport, day)
+);
+
+-- Best clean score per athlete and sport; the in-memory leaderboards are rebuilt from it
+CREATE TABLE IF NOT EXISTS leaderboard_entries (
+    athlete_id TEXT NOT NULL REFERENCES athletes(id),
+    sport TEXT NOT NULL,
+    score REAL NOT NULL,
+    video_id TEXT,
+    achieved_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (athlete_id, sport)
+);
+CREATE INDEX IF NOT EXISTS idx_leaderboard_updated ON leaderboard_entries (updated_at);
+
+-- One-time passwords when OTP_STORE_BACKEND=sqlite, shared by every worker
+CREATE TABLE IF NOT EXISTS otp_codes (
+    phone_number TEXT PRIMARY KEY,
+    code TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_otp_codes_expires ON otp_codes (expires_at);
+
+-- Rate limiting state when RATE_LIMIT_BACKEND=sqlite: token buckets keyed "<scope>:<key>"
+-- and the uploads currently admitted, each with a lease in case its worker dies
+CREATE TABLE IF NOT EXISTS rate_buckets (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS upload_tickets (
+    id TEXT PRIMARY KEY,
+    bytes INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS landmarks (
+    video_id TEXT PRIMARY KEY,
+    sport TEXT,
+    frames INTEGER NOT NULL,
+    sample_fps REAL,
+    mean_visibility REAL,
+    store_dir TEXT,
+    created_at REAL NOT NULL
+);
+"""
+
+INSERT_ATHLETE_IF_NEW = (
+    "INSERT OR IGNORE INTO athletes (id, sport, created_at, updated_at) VALUES (?, ?, ?, ?)"
+)
+UPSERT_ATHLETE = (
+    "INSERT INTO athletes (id, name, sport, region, birth_year, created_at, updated_at)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?)"
+    " ON CONFLICT(id) DO UPDATE SET"
+    " name = COALESCE(excluded.name, name), sport = COALESCE(excluded.sport, sport),"
+    " region = COALESCE(excluded.region, region), birth_year = COALESCE(excluded.birth_year, birth_year),"
+    " updated_at = excluded.updated_at"
+)
+INSERT_ASSESSMENT = (
+    "INSERT INTO assessments (athlete_id, video_id, sport, score, form_score, consistency_score,"
+    " power_score, technique_score, cheat_detected, cheat_score, pipeline_version, result, created_at)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+# In DO UPDATE, bare column names are the stored row and excluded.* the new assessment
+UPSERT_ATHLETE_STATS = (
+    "INSERT INTO athlete_stats (athlete_id, sport, assessments, score_sum, best_score, best_at, last_score,"
+    " last_at, ewma_score, form_sum, consistency_sum, power_sum, technique_sum, component_count)"
+    " VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    " ON CONFLICT(athlete_id, sport) DO UPDATE SET"
+    " assessments = assessments + 1,"
+    " score_sum = score_sum + excluded.score_sum,"
+    " best_at = CASE WHEN excluded.best_score > best_score THEN excluded.best_at ELSE best_at END,"
+    " best_score = MAX(best_score, excluded.best_score),"
+    " last_score = CASE WHEN excluded.last_at >= last_at THEN excluded.last_score ELSE last_score END,"
+    " last_at = MAX(last_at, excluded.last_at),"
+    " ewma_score = ewma_score + ? * (excluded.ewma_score - ewma_score),"
+    " form_sum = form_sum + excluded.form_sum,"
+    " consistency_sum = consistency_sum + excluded.consistency_sum,"
+    " power_sum = power_sum + excluded.power_sum,"
+    " technique_sum = technique_sum + excluded.technique_sum,"
+    " component_count = component_count + excluded.component_count"
+)
+UPSERT_ATHLETE_DAILY = (
+    "INSERT INTO athlete_daily (athlete_id, sport, day, assessments, score_sum, best_score)"
+    " VALUES (?, ?, ?, 1, ?, ?)"
+    " ON CONFLICT(athlete_id, sport, day) DO UPDATE SET"
+    " assessments = assessments + 1, score_sum = score_sum + excluded.score_sum,"
+    " best_score = MAX(best_score, excluded.best_score)"
+)
+UPSERT_LEADERBOARD_ENTRY = (
+    "INSERT INTO leaderboard_entries (athlete_id, sport, score, video_id, achieved_at, updated_at)"
+    " VALUES (?, ?, ?, ?, ?, ?)"
+    " ON CONFLICT(athlete_id, sport) DO UPDATE SET"
+    " score = excluded.score, video_id = excluded.video_id, achieved_at = excluded.achieved_at,"
+    " updated_at = excluded.updated_at"
+    " WHERE excluded.score > leaderboard_entries.score"
+)
+UPSERT_LANDMARKS = (
+    "INSERT OR REPLACE INTO landmarks (video_id, sport, frames, sample_fps, mean_visibility, store_dir, created_at)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+Statement = Tuple[str, Sequence[Any]]
+
+# Analysis sub-scores kept per assessment and averaged per athlete
+COMPONENTS = ("form", "consistency", "power", "technique")
+
+
+def athlete_statement(athlete_id: str, name: Optional[str] = None, sport: Optional[str] = None,
+                      region: Optional[str] = None, birth_year: Optional[int] = None) -> Statement:
+    now = time.time()
+    return UPSERT_ATHLETE, (athlete_id, name, sport, region, birth_year, now, now)
+
+
+def assessment_statements(response: Dict[str, Any], athlete_id: Optional[str], sport: Optional[str],
+                          pipeline_version: str, created_at: Optional[float] = None) -> List[Statement]:
+    """
+    Rows recording one upload's response, creating a bare athlete record if it is new and
+    folding clean scores into the athlete's running aggregates
+    """
+    now = created_at or time.time()
+    analysis = response.get("analysis") or {}
+    score = float(response.get("score") or 0.0)
+    components = [analysis.get(f"{name}_score") for name in COMPONENTS]
+    cheat_detected = int(response.get("cheat_detected") or 0)
+    statements: List[Statement] = []
+    if athlete_id:
+        statements.append((INSERT_ATHLETE_IF_NEW, (athlete_id, sport, now, now)))
+    statements.append((INSERT_ASSESSMENT, (
+        athlete_id,
+        response.get("video_id"),
+        sport,
+        score,
+        *components,
+        cheat_detected,
+        response.get("cheat_score"),
+        pipeline_version,
+        json.dumps(response),
+        now,
+    )))
+    if athlete_id and not cheat_detected:
+        stats_sport = sport or UNSPECIFIED_SPORT
+        has_components = all(value is not None for value in components)
+        component_sums = [float(value) if has_components else 0.0 for value in components]
+        statements.append((UPSERT_ATHLETE_STATS, (
+            athlete_id, stats_sport, score, score, now, score, now, score,
+            *component_sums, int(has_components), ATHLETE_EWMA_ALPHA,
+        )))
+        day = time.strftime("%Y-%m-%d", time.gmtime(now))
+        statements.append((UPSERT_ATHLETE_DAILY, (athlete_id, stats_sport, day, score, score)))
+    return statements
+
+
+def leaderboard_statement(athlete_id: str, sport: str, score: float, video_id: Optional[str],
+                          achieved_at: float) -> Statement:
+    """Keeps the row only if `score` beats the athlete's stored best for the sport"""
+    return UPSERT_LEADERBOARD_ENTRY, (athlete_id, sport, float(score), video_id, achieved_at, time.time())
+
+
+def landmark_statement(video_id: str, video_info: Dict[str, Any], sport: Optional[str],
+                       store_dir: Optional[str]) -> Statement:
+    return UPSERT_LANDMARKS, (
+        video_id,
+        sport,
+        int(video_info.get("sampled_frames") or 0),
+        video_info.get("sample_fps"),
+        video_info.get("mean_visibility"),
+        store_dir,
+        time.time(),
+    )
+
+
+def latest_assessment(db: Any, athlete_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Most recent stored response, overall or for one athlete"""
+    if athlete_id is None:
+        row = db.fetchone("SELECT result FROM assessments ORDER BY id DESC LIMIT 1")
+    else:
+        row = db.fetchone(
+            "SELECT result FROM assessments WHERE athlete_id = ? ORDER BY created_at DESC, id DESC LIMIT 1",
+            (athlete_id,),
+        )
+    return json.loads(row["result"]) if row is not None else None
+
+
+def list_athletes(db: Any, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+    """Athletes with their latest clean score and assessment count, from the running aggregates"""
+    rows = db.fetchall(
+        "SELECT a.id, a.name, a.sport, a.region, a.birth_year,"
+        " (SELECT s.last_score FROM athlete_stats s WHERE s.athlete_id = a.id"
+        "  ORDER BY s.last_at DESC LIMIT 1) AS latest_score,"
+        " (SELECT SUM(s.assessments) FROM athlete_stats s WHERE s.athlete_id = a.id) AS assessments"
+        " FROM athletes a ORDER BY a.created_at, a.id LIMIT ? OFFSET ?",
+        (limit, offset),
+    )
+    athletes = []
+    for row in rows:
+        athlete = dict(row)
+        athlete["assessments"] = athlete["assessments"] or 0
+        athlete["age"] = time.gmtime().tm_year - athlete["birth_year"] if athlete["birth_year"] else None
+        athletes.append(athlete)
+    return athletes
+
+
+def athlete_summary(db: Any, athlete_id: str,
+                    rolling_window: int = ATHLETE_ROLLING_WINDOW) -> List[Dict[str, Any]]:
+    """Per-sport aggregates of an athlete: one primary-key read each, plus the last few scores"""
+    summaries = []
+    for row in db.fetchall("SELECT * FROM athlete_stats WHERE athlete_id = ? ORDER BY sport", (athlete_id,)):
+        count, with_components = row["assessments"], row["component_count"]
+        recent = recent_scores(db, athlete_id, row["sport"], rolling_window)
+        summaries.append({
+            "sport": row["sport"],
+            "assessments": count,
+            "mean_score": row["score_sum"] / count,
+            "rolling_mean": sum(recent) / len(recent) if recent else None,
+            "ewma_score": row["ewma_score"],
+            "best_score": row["best_score"],
+            "best_at": row["best_at"],
+            "last_score": row["last_score"],
+            "last_at": row["last_at"],
+            "components": {
+                name: (row[f"{name}_sum"] / with_components if with_components else None) for name in COMPONENTS
+            },
+        })
+    return summaries
+
+
+def recent_scores(db: Any, athlete_id: str, sport: str, limit: int) -> List[float]:
+    """Newest clean scores first; walks the (athlete_id, created_at) index"""
+    sport_filter = "sport IS NULL" if sport == UNSPECIFIED_SPORT else "sport = ?"
+    params: Tuple[Any, ...] = (athlete_id,) if sport == UNSPECIFIED_SPORT else (athlete_id, sport)
+    rows = db.fetchall(
+        f"SELECT score FROM assessments WHERE athlete_id = ? AND {sport_filter} AND cheat_detected = 0"
+        " ORDER BY created_at DESC LIMIT ?",
+        params + (limit,),
+    )
+    return [row["score"] for row in rows]
+
+
+def athlete_history(db: Any, athlete_id: str, sport: Optional[str] = None, before: Optional[float] = None,
+                    limit: int = 50) -> List[Dict[str, Any]]:
+    """Assessments newest first; pass the last created_at as `before` for the next page"""
+    clauses, params = ["athlete_id = ?"], [athlete_id]
+    if sport is not None:
+        clauses.append("sport IS NULL" if sport == UNSPECIFIED_SPORT else "sport = ?")
+        if sport != UNSPECIFIED_SPORT:
+            params.append(sport)
+    if before is not None:
+        clauses.append("created_at < ?")
+        params.append(before)
+    rows = db.fetchall(
+        "SELECT id, video_id, sport, score, form_score, consistency_score, power_score, technique_score,"
+        f" cheat_detected, cheat_score, created_at FROM assessments WHERE {' AND '.join(clauses)}"
+        " ORDER BY created_at DESC, id DESC LIMIT ?",
+        tuple(params) + (limit,),
+    )
+    return [dict(row) for row in rows]
+
+
+def athlete_trend(db: Any, athlete_id: str, sport: Optional[str] = None, since_day: Optional[str] = None,
+                  window: int = 7) -> List[Dict[str, Any]]:
+    """
+    Daily points (mean, best, count) in date order, with `rolling` the mean of the last
+    `window` daily means. Without `sport`, days are combined across sports.
+    """
+    clauses, params = ["athlete_id = ?"], [athlete_id]
+    if sport is not None:
+        clauses.append("sport = ?")
+        params.append(sport)
+    if since_day is not None:
+        clauses.append("day >= ?")
+        params.append(since_day)
+    rows = db.fetchall(
+        "SELECT day, SUM(assessments) AS assessments, SUM(score_sum) AS score_sum, MAX(best_score) AS best_score"
+        f" FROM athlete_daily WHERE {' AND '.join(clauses)} GROUP BY day ORDER BY day",
+        tuple(params),
+    )
+    points: List[Dict[str, Any]] = []
+    window_sum = 0.0
+    for index, row in enumerate(rows):
+        mean = row["score_sum"] / row["assessments"]
+        window_sum += mean
+        if index >= window:
+            window_sum -= points[index - window]["score"]
+        points.append({
+            "date": row["day"],
+            "score": mean,
+            "best_score": row["best_score"],
+            "assessments": row["assessments"],
+            "rolling": window_sum / min(index + 1, window),
+        })
+    return points
+
+
+def athlete_names(db: Any, athlete_ids: Sequence[str]) -> Dict[str, Optional[str]]:
+    if not athlete_ids:
+        return {}
+    placeholders = ",".join("?" * len(athlete_ids))
+    rows = db.fetchall(f"SELECT id, name FROM athletes WHERE id IN ({placeholders})", tuple(athlete_ids))
+    return {row["id"]: row["name"] for row in rows}
+
+
+def changed_athlete_profiles(db: Any, since: float) -> List[Any]:
+    return db.fetchall("SELECT id, region, birth_year, updated_at FROM athletes WHERE updated_at > ?", (since,))
+
+
+def changed_leaderboard_entries(db: Any, since: float) -> List[Any]:
+    return db.fetchall(
+        "SELECT athlete_id, sport, score, achieved_at, updated_at FROM leaderboard_entries WHERE updated_at > ?",
+        (since,),
+    )
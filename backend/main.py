@@ -1,13 +1,48 @@
-from fastapi import FastAPI
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 
 # Support running from project root (absolute imports) and from backend/ (relative imports)
 try:
-    from backend.routes import auth, video_upload, results
+    from backend.routes import auth, video_upload, results, jobs, metrics
+    from backend.services import inference, rate_limit
+    from backend.services.artifacts import ARTIFACTS
+    from backend.services.metrics import HTTP_REQUEST_SECONDS, RATE_LIMITED
+    from backend.services.otp_store import OTP_STORE
+    from backend.services.worker_pool import INFERENCE_POOL
 except Exception:
-    from routes import auth, video_upload, results
+    from routes import auth, video_upload, results, jobs, metrics
+    from services import inference, rate_limit
+    from services.artifacts import ARTIFACTS
+    from services.metrics import HTTP_REQUEST_SECONDS, RATE_LIMITED
+    from services.otp_store import OTP_STORE
+    from services.worker_pool import INFERENCE_POOL
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Models load and warm up in the background so the API serves requests straight away;
+    # a failed attempt (e.g. a model file still being copied in) is retried with backoff
+    stop_warm_up = threading.Event()
+    threading.Thread(target=inference.warm_up_until_ready, args=(stop_warm_up,), name="model-warmup",
+                     daemon=True).start()
+    # Pick up replaced model/normalization files without a restart
+    ARTIFACTS.start_watcher()
+    # Expired OTPs are also dropped on each store call; the sweep catches idle periods
+    OTP_STORE.start_sweeper()
+    yield
+    stop_warm_up.set()
+    OTP_STORE.stop_sweeper()
+    ARTIFACTS.stop_watcher()
+    INFERENCE_POOL.shutdown()
+
 
-app = FastAPI(title="Sports Talent Assessment API")
+app = FastAPI(title="Sports Talent Assessment API", lifespan=lifespan)
 
 # Enable CORS for local dev
 app.add_middleware(
@@ -18,11 +53,92 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    # Labelled by route template, not raw path, so ids in URLs don't explode the series count
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status),
+        )
+
+
+def _admit_upload(request: Request) -> str:
+    ip = rate_limit.client_ip(request)
+    rate_limit.UPLOAD_IP_LIMITER.hit(ip)
+    declared = request.headers.get("content-length")
+    nbytes = int(declared) if declared and declared.isdigit() else rate_limit.UPLOAD_ASSUMED_BYTES
+    try:
+        return rate_limit.UPLOAD_ADMISSION.admit(nbytes)
+    except rate_limit.RateLimited:
+        # Turned away for server capacity: the attempt does not count against the client's IP
+        rate_limit.UPLOAD_IP_LIMITER.refund(ip)
+        raise
+
+
+@app.middleware("http")
+async def admit_uploads(request: Request, call_next):
+    # Runs before the multipart body is read, so a rejected upload never reaches memory or disk
+    if request.method != "POST" or request.url.path.rstrip("/") != "/upload_video":
+        return await call_next(request)
+    # No room for another inference job: turn the upload away before spending any of its limits
+    if not INFERENCE_POOL.has_capacity():
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Server is busy processing other videos. Please try again shortly."},
+            headers={"Retry-After": str(video_upload.RETRY_AFTER_SECONDS)},
+        )
+    try:
+        if rate_limit.SHARED:
+            ticket = await run_in_threadpool(_admit_upload, request)
+        else:
+            ticket = _admit_upload(request)
+    except rate_limit.RateLimited as exc:
+        RATE_LIMITED.inc(scope=exc.scope)
+        return JSONResponse(
+            status_code=429,
+            content={"detail": "Too many uploads right now. Please try again shortly."},
+            headers={"Retry-After": exc.retry_after_header},
+        )
+    # An async upload hands the ticket to its background job, which releases it when done
+    request.state.upload_ticket = ticket
+    try:
+        return await call_next(request)
+    finally:
+        await video_upload.release_upload_ticket(request.state.upload_ticket)
+
+
 # Include API routes
 app.include_router(auth.router)
 app.include_router(video_upload.router)
 app.include_router(results.router)
+app.include_router(jobs.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Sports Talent Assessment API"}
+
+
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving"""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: models are loaded and warmed up; 503 until then"""
+    state = dict(inference.WARM_STATE)
+    ready = state["warmed_up"]
+    return JSONResponse(status_code=200 if ready else 503, content={"ready": ready, **state})
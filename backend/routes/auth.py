@@ -1,16 +1,24 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import random
 import string
 from datetime import datetime, timedelta
 import jwt
-from typing import Dict, Optional
+from typing import Optional
+
+# Support absolute (run from project root) and relative (run from backend/) imports
+try:
+    from backend.services.metrics import RATE_LIMITED
+    from backend.services.otp_store import OTP_STORE, OTP_STORE_BACKEND, MISSING, EXPIRED, LOCKED, INVALID
+    from backend.services.rate_limit import OTP_IP_LIMITER, OTP_PHONE_LIMITER, SHARED, RateLimited, client_ip
+except Exception:
+    from services.metrics import RATE_LIMITED
+    from services.otp_store import OTP_STORE, OTP_STORE_BACKEND, MISSING, EXPIRED, LOCKED, INVALID
+    from services.rate_limit import OTP_IP_LIMITER, OTP_PHONE_LIMITER, SHARED, RateLimited, client_ip
 
 router = APIRouter()
 
-# In-memory storage for OTPs (in production, use Redis or database)
-otp_storage: Dict[str, Dict] = {}
-
 # JWT secret key (in production, use environment variable)
 SECRET_KEY = "your-secret-key-here"
 ALGORITHM = "HS256"
@@ -38,8 +46,42 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def _limit_otp_requests(phone_number: str, http_request: Request) -> None:
+    """Spend the caller's IP and phone number tokens, or raise 429 with Retry-After"""
+    ip = client_ip(http_request)
+    try:
+        OTP_IP_LIMITER.hit(ip)
+        try:
+            OTP_PHONE_LIMITER.hit(phone_number)
+        except RateLimited:
+            # Turned away for the phone number: the attempt does not count against the IP
+            OTP_IP_LIMITER.refund(ip)
+            raise
+    except RateLimited as exc:
+        RATE_LIMITED.inc(scope=exc.scope)
+        raise HTTPException(
+            status_code=429,
+            detail="Too many OTP requests. Please try again later.",
+            headers={"Retry-After": exc.retry_after_header},
+        )
+
+
+async def _check_otp_rate(phone_number: str, http_request: Request) -> None:
+    # The shared backend touches SQLite, so keep it off the event loop
+    if SHARED:
+        await run_in_threadpool(_limit_otp_requests, phone_number, http_request)
+    else:
+        _limit_otp_requests(phone_number, http_request)
+
+
+async def _otp_store_call(method, *args):
+    # The sqlite store waits on the database write lock, so keep it off the event loop too
+    if OTP_STORE_BACKEND == "sqlite":
+        return await run_in_threadpool(method, *args)
+    return method(*args)
+
 @router.post("/send-otp")
-async def send_otp(request: PhoneNumberRequest):
+async def send_otp(request: PhoneNumberRequest, http_request: Request):
     """Send OTP to phone number"""
     phone_number = request.phone_number
     
@@ -50,15 +92,13 @@ async def send_otp(request: PhoneNumberRequest):
             detail="Invalid phone number. Please enter a 10-digit number."
         )
     
+    await _check_otp_rate(phone_number, http_request)
+    
     # Generate OTP
     otp = generate_otp()
     
-    # Store OTP with expiration time (5 minutes)
-    otp_storage[phone_number] = {
-        "otp": otp,
-        "expires_at": datetime.utcnow() + timedelta(minutes=5),
-        "attempts": 0
-    }
+    # Store OTP with expiration time (OTP_TTL_SECONDS, 5 minutes by default)
+    await _otp_store_call(OTP_STORE.put, phone_number, otp)
     
     # In production, integrate with SMS service like Twilio, AWS SNS, etc.
     # For now, we'll just return the OTP in the response for testing
@@ -76,37 +116,27 @@ async def verify_otp(request: OTPVerificationRequest):
     phone_number = request.phone_number
     otp = request.otp
     
-    # Check if OTP exists
-    if phone_number not in otp_storage:
+    # Check and count the attempt atomically; used, expired and locked-out codes are removed
+    result = await _otp_store_call(OTP_STORE.verify, phone_number, otp)
+    if result.status == MISSING:
         raise HTTPException(
             status_code=400,
             detail="OTP not found. Please request a new OTP."
         )
-    
-    otp_data = otp_storage[phone_number]
-    
-    # Check if OTP has expired
-    if datetime.utcnow() > otp_data["expires_at"]:
-        del otp_storage[phone_number]
+    if result.status == EXPIRED:
         raise HTTPException(
             status_code=400,
             detail="OTP has expired. Please request a new OTP."
         )
-    
-    # Check attempts limit
-    if otp_data["attempts"] >= 3:
-        del otp_storage[phone_number]
+    if result.status == LOCKED:
         raise HTTPException(
             status_code=400,
             detail="Too many failed attempts. Please request a new OTP."
         )
-    
-    # Verify OTP
-    if otp_data["otp"] != otp:
-        otp_data["attempts"] += 1
+    if result.status == INVALID:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid OTP. {3 - otp_data['attempts']} attempts remaining."
+            detail=f"Invalid OTP. {result.attempts_left} attempts remaining."
         )
     
     # OTP is valid, create access token
@@ -115,9 +145,6 @@ async def verify_otp(request: OTPVerificationRequest):
         data={"sub": phone_number}, expires_delta=access_token_expires
     )
     
-    # Remove OTP from storage
-    del otp_storage[phone_number]
-    
     return {
         "message": "OTP verified successfully",
         "access_token": access_token,
@@ -126,7 +153,7 @@ async def verify_otp(request: OTPVerificationRequest):
     }
 
 @router.post("/resend-otp")
-async def resend_otp(request: PhoneNumberRequest):
+async def resend_otp(request: PhoneNumberRequest, http_request: Request):
     """Resend OTP to phone number"""
     phone_number = request.phone_number
     
@@ -137,15 +164,13 @@ async def resend_otp(request: PhoneNumberRequest):
             detail="Invalid phone number. Please enter a 10-digit number."
         )
     
+    await _check_otp_rate(phone_number, http_request)
+    
     # Generate new OTP
     otp = generate_otp()
     
-    # Store new OTP
-    otp_storage[phone_number] = {
-        "otp": otp,
-        "expires_at": datetime.utcnow() + timedelta(minutes=5),
-        "attempts": 0
-    }
+    # Store new OTP, replacing the previous one
+    await _otp_store_call(OTP_STORE.put, phone_number, otp)
     
     # In production, send SMS
     print(f"New OTP for {phone_number}: {otp}")
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+
+# Support absolute (run from project root) and relative (run from backend/) imports
+try:
+    from backend.services.jobs import JOB_STORE, DONE, FAILED
+except Exception:
+    from services.jobs import JOB_STORE, DONE, FAILED
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def _get_job(job_id: str):
+    job = JOB_STORE.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}")
+def job_status(job_id: str):
+    """Report whether an async upload is queued, running, done or failed"""
+    job = _get_job(job_id)
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+
+@router.get("/{job_id}/result")
+def job_result(job_id: str):
+    """Return the same flat result a synchronous upload would have returned"""
+    job = _get_job(job_id)
+    if job["status"] == DONE:
+        return job["result"]
+    if job["status"] == FAILED:
+        raise HTTPException(status_code=422, detail=job["error"])
+    # Not finished yet: tell the client to keep polling
+    return JSONResponse(status_code=202, content={"job_id": job["job_id"], "status": job["status"]})
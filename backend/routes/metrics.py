@@ -0,0 +1,59 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+# Support absolute (run from project root) and relative (run from backend/) imports
+try:
+    from backend.database.connection import WRITER
+    from backend.services import inference
+    from backend.services.metrics import REGISTRY
+    from backend.services.otp_store import OTP_STORE
+    from backend.services.rate_limit import UPLOAD_ADMISSION
+    from backend.services.result_cache import RESULT_CACHE
+    from backend.services.worker_pool import INFERENCE_POOL
+    from backend.services.workspace import WORKSPACE
+except Exception:
+    from database.connection import WRITER
+    from services import inference
+    from services.metrics import REGISTRY
+    from services.otp_store import OTP_STORE
+    from services.rate_limit import UPLOAD_ADMISSION
+    from services.result_cache import RESULT_CACHE
+    from services.worker_pool import INFERENCE_POOL
+    from services.workspace import WORKSPACE
+
+router = APIRouter(tags=["metrics"])
+
+# Gauges mirroring other components, read only when /metrics is scraped
+REGISTRY.gauge("inference_active_jobs", "Inference jobs queued or running",
+               callback=lambda: INFERENCE_POOL.pending)
+REGISTRY.gauge("inference_pool_capacity", "Inference jobs accepted before uploads get 503",
+               callback=lambda: INFERENCE_POOL.capacity)
+REGISTRY.gauge("inference_batch_mean_size", "Mean micro-batch size per batcher", ("batcher",),
+               callback=lambda: {
+                   ("pose",): inference.POSE_BATCHER.stats()["mean_batch_size"],
+                   ("cheat",): inference.CHEAT_BATCHER.stats()["mean_batch_size"],
+               })
+REGISTRY.gauge("models_ready", "1 once models are loaded and warmed up",
+               callback=lambda: float(bool(inference.WARM_STATE["warmed_up"])))
+REGISTRY.gauge("result_cache_hit_ratio", "Share of result cache lookups that hit",
+               callback=lambda: RESULT_CACHE.stats()["hit_ratio"])
+REGISTRY.gauge("result_cache_entries", "Results held in the in-memory cache tier",
+               callback=lambda: RESULT_CACHE.stats()["entries"])
+REGISTRY.gauge("feature_cache_entries", "Clips whose biomechanics features are cached",
+               callback=lambda: len(inference.pose_features._cache))
+REGISTRY.gauge("workspace_bytes", "Bytes of uploaded video held in scratch files",
+               callback=lambda: WORKSPACE.used_bytes)
+REGISTRY.gauge("db_write_failed_groups", "Queued write groups dropped after failing on their own",
+               callback=lambda: WRITER.failed_groups)
+REGISTRY.gauge("otp_store_size", "OTPs currently stored",
+               callback=lambda: len(OTP_STORE))
+REGISTRY.gauge("upload_in_flight", "Uploads admitted and not yet answered",
+               callback=lambda: UPLOAD_ADMISSION.stats()["in_flight"])
+REGISTRY.gauge("upload_bytes_in_flight", "Declared bytes of the uploads in flight",
+               callback=lambda: UPLOAD_ADMISSION.stats()["bytes"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus text exposition of this process's metrics"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
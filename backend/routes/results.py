@@ -1,34 +1,146 @@
-from fastapi import APIRouter
-from typing import Dict, Any, List
+import time
 
-# Simple in-memory state for demo purposes
-LATEST_RESULT: Dict[str, Any] | None = None
-LEADERBOARD: List[Dict[str, Any]] = [
-    {"rank": 1, "name": "Alex Runner", "score": 92, "color": "#10B981"},
-    {"rank": 2, "name": "Jamie Jumper", "score": 88, "color": "#2563EB"},
-    {"rank": 3, "name": "Sam Sprinter", "score": 85, "color": "#F59E0B"},
-]
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Dict, Any, List, Optional
+
+try:
+    from backend.database.connection import DBSession, get_db, get_fresh_db
+    from backend.database.models import (
+        athlete_history, athlete_names, athlete_summary, athlete_trend, latest_assessment, list_athletes,
+    )
+    from backend.services import inference
+    from backend.services.leaderboard import LEADERBOARD
+except Exception:
+    from database.connection import DBSession, get_db, get_fresh_db
+    from database.models import (
+        athlete_history, athlete_names, athlete_summary, athlete_trend, latest_assessment, list_athletes,
+    )
+    from services import inference
+    from services.leaderboard import LEADERBOARD
+
+# Podium colours shown by the mobile client; everyone else gets the default
+PODIUM_COLORS = {1: "#10B981", 2: "#2563EB", 3: "#F59E0B"}
+DEFAULT_COLOR = "#64748B"
 
 router = APIRouter(prefix="/results", tags=["results"])
 
 @router.get("/athletes")
-def list_athletes():
-    return {
-        "athletes": [
-            {"id": 1, "name": "Alex Runner", "sport": "Sprinting"},
-            {"id": 2, "name": "Jamie Jumper", "sport": "Long Jump"},
-        ]
-    }
+def get_athletes(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: DBSession = Depends(get_fresh_db),
+):
+    return {"athletes": list_athletes(db, limit, offset)}
+
+
+@router.get("/athletes/{athlete_id}/summary")
+def get_athlete_summary(athlete_id: str, db: DBSession = Depends(get_fresh_db)):
+    """Running aggregates per sport: means, personal best, latest and per-component averages"""
+    return {"athlete_id": athlete_id, "sports": athlete_summary(db, athlete_id)}
+
+
+@router.get("/athletes/{athlete_id}/history")
+def get_athlete_history(
+    athlete_id: str,
+    sport: Optional[str] = None,
+    before: Optional[float] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: DBSession = Depends(get_fresh_db),
+):
+    """Assessments newest first; page with `before` set to the last item's created_at"""
+    items = athlete_history(db, athlete_id, sport, before, limit)
+    next_before = items[-1]["created_at"] if len(items) == limit else None
+    return {"athlete_id": athlete_id, "items": items, "next_before": next_before}
+
+
+@router.get("/athletes/{athlete_id}/trend")
+def get_athlete_trend(
+    athlete_id: str,
+    sport: Optional[str] = None,
+    days: int = Query(90, ge=1, le=3650),
+    window: int = Query(7, ge=1, le=90),
+    db: DBSession = Depends(get_fresh_db),
+):
+    """Daily score points for charts ({date, score, best_score, assessments, rolling})"""
+    since_day = time.strftime("%Y-%m-%d", time.gmtime(time.time() - (days - 1) * 86400))
+    return {"athlete_id": athlete_id, "points": athlete_trend(db, athlete_id, sport, since_day, window)}
 
 
 @router.get("/latest")
-def latest_result():
-    # Return last uploaded inference result
-    return LATEST_RESULT or {"score": 0.0, "cheat_detected": 0}
+def latest_result(athlete_id: Optional[str] = None, db: DBSession = Depends(get_fresh_db)):
+    # Return the last uploaded inference result, overall or for one athlete, including rows
+    # this worker has queued but not yet written
+    return latest_assessment(db, athlete_id) or {"score": 0.0, "cheat_detected": 0}
+
+
+def _decorate(db: DBSession, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Add names and the fields the mobile client reads to a page of leaderboard entries"""
+    names = athlete_names(db, sorted({item["athlete_id"] for item in items}))
+    for item in items:
+        item["name"] = names.get(item["athlete_id"]) or item["athlete_id"]
+        item["best_score"] = item["score"]
+        # The client parses score as an integer
+        item["score"] = int(round(item["score"]))
+        item["color"] = PODIUM_COLORS.get(item["rank"], DEFAULT_COLOR)
+    return items
 
 
 @router.get("/leaderboard")
-def get_leaderboard():
-    return {"items": LEADERBOARD}
+def get_leaderboard(
+    sport: Optional[str] = None,
+    region: Optional[str] = None,
+    age_band: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=200),
+    db: DBSession = Depends(get_db),
+):
+    """One page of best scores in a (sport, region, age band) partition; omitted filters mean all"""
+    LEADERBOARD.sync(db)
+    total, items = LEADERBOARD.top(sport, region, age_band, offset, limit)
+    return {"items": _decorate(db, items), "total": total, "offset": offset, "limit": limit}
+
+
+@router.get("/leaderboard/rank/{athlete_id}")
+def get_leaderboard_rank(
+    athlete_id: str,
+    sport: str,
+    region: Optional[str] = None,
+    age_band: Optional[str] = None,
+    radius: int = Query(0, ge=0, le=50),
+    db: DBSession = Depends(get_db),
+):
+    """An athlete's rank in a partition, with `radius` neighbours either side"""
+    LEADERBOARD.sync(db)
+    ranked = LEADERBOARD.rank(athlete_id, sport, region, age_band)
+    if ranked is None:
+        raise HTTPException(status_code=404, detail="Athlete is not ranked in this leaderboard")
+    rank, total = ranked
+    response: Dict[str, Any] = {"athlete_id": athlete_id, "rank": rank, "total": total}
+    if radius:
+        _, neighbours = LEADERBOARD.around(rank, radius, sport, region, age_band)
+        response["neighbours"] = _decorate(db, neighbours)
+    return response
+
+
+@router.get("/leaderboard/around/{rank}")
+def get_leaderboard_around(
+    rank: int,
+    sport: Optional[str] = None,
+    region: Optional[str] = None,
+    age_band: Optional[str] = None,
+    radius: int = Query(5, ge=0, le=50),
+    db: DBSession = Depends(get_db),
+):
+    """Entries within `radius` places of a rank"""
+    LEADERBOARD.sync(db)
+    total, items = LEADERBOARD.around(max(1, rank), radius, sport, region, age_band)
+    return {"items": _decorate(db, items), "total": total}
 
 
+@router.post("/rescore/{video_id}")
+def rescore_video(video_id: str):
+    """Re-run scoring on the stored landmarks of an earlier upload, without decoding it again"""
+    result = inference.rescore(video_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="No stored landmarks for this video")
+    return {"video_id": video_id, **result}
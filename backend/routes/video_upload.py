@@ -1,32 +1,282 @@
-from fastapi import APIRouter, UploadFile, File
+import asyncio
+import os
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Set
+
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 
 # Support absolute (run from project root) and relative (run from backend/) imports
 try:
+    from backend.database.connection import WRITER
+    from backend.database.models import (
+        UNSPECIFIED_SPORT, assessment_statements, athlete_statement, landmark_statement, leaderboard_statement,
+    )
     from backend.services import inference
+    from backend.services.jobs import JOB_STORE, DONE, QUEUED
+    from backend.services.landmark_store import LANDMARK_STORE
+    from backend.services.leaderboard import LEADERBOARD
+    from backend.services import rate_limit
+    from backend.services.metrics import INFERENCE_VIDEOS, record_timings, server_timing
+    from backend.services.result_cache import RESULT_CACHE, cache_key
+    from backend.services.worker_pool import INFERENCE_POOL, PoolSaturated
+    from backend.services.workspace import WORKSPACE, ScratchFile, WorkspaceQuotaExceeded
 except Exception:
+    from database.connection import WRITER
+    from database.models import (
+        UNSPECIFIED_SPORT, assessment_statements, athlete_statement, landmark_statement, leaderboard_statement,
+    )
     from services import inference
-from backend.routes.results import LATEST_RESULT
+    from services.jobs import JOB_STORE, DONE, QUEUED
+    from services.landmark_store import LANDMARK_STORE
+    from services.leaderboard import LEADERBOARD
+    from services import rate_limit
+    from services.metrics import INFERENCE_VIDEOS, record_timings, server_timing
+    from services.result_cache import RESULT_CACHE, cache_key
+    from services.worker_pool import INFERENCE_POOL, PoolSaturated
+    from services.workspace import WORKSPACE, ScratchFile, WorkspaceQuotaExceeded
 
 router = APIRouter()
 
-@router.post("/upload_video/")
-async def upload_video(file: UploadFile = File(...)):
-    contents = await file.read()
-    result = inference.process_video(contents)
-    response = {
+# Uploads are copied to disk in chunks of this size so a full clip never sits in memory
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Seconds clients are asked to wait before retrying when the server is saturated
+RETRY_AFTER_SECONDS = 5
+# How often a background job's watcher checks whether a worker has started it
+JOB_START_POLL_SECONDS = 0.1
+
+# Keep references to running job watchers so they aren't garbage collected
+_background_jobs: Set["asyncio.Task[None]"] = set()
+
+
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Server is busy processing other videos. Please try again shortly.",
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+    )
+
+
+async def _spool_upload(file: UploadFile, scratch: ScratchFile) -> None:
+    """Stream the upload into the request's scratch file"""
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            scratch.write(chunk)
+        scratch.close()
+    except (WorkspaceQuotaExceeded, OSError):
+        # Over quota, or the scratch filesystem itself filled up (ENOSPC)
+        raise _busy()
+
+
+def _build_response(result: Dict[str, Any], video_id: Optional[str] = None) -> Dict[str, Any]:
+    """Flatten a process_video result into the response the clients expect"""
+    return {
+        "video_id": video_id,
         "score": result.get("score", 0.0),
         "cheat_detected": result.get("cheat_detected", 0),
+        "cheat_score": result.get("cheat_score"),
         "analysis": result.get("analysis", {}),
         "video_info": result.get("video_info", {})
     }
+
+
+def _publish(result: Dict[str, Any], video_id: str, athlete_id: Optional[str], sport: Optional[str],
+             region: Optional[str] = None, birth_year: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Build the response, rank it and queue it for storage as an assessment (batched, off the
+    request). A region or birth year given with the upload updates the athlete's profile,
+    which places their scores in that region's and age band's leaderboards.
+    """
+    response = _build_response(result, video_id)
+    now = time.time()
+    statements = assessment_statements(response, athlete_id, sport, _result_version(result), now)
+    if athlete_id and (region or birth_year):
+        statements.append(athlete_statement(athlete_id, sport=sport, region=region, birth_year=birth_year))
+        LEADERBOARD.update_profile(athlete_id, region, birth_year)
+    # Only clean, attributed scores compete
+    if athlete_id and not response["cheat_detected"]:
+        LEADERBOARD.record(athlete_id, sport, response["score"], now)
+        statements.append(leaderboard_statement(athlete_id, sport or UNSPECIFIED_SPORT, response["score"],
+                                                video_id, now))
+    if LANDMARK_STORE.enabled and response["video_info"].get("sampled_frames"):
+        statements.append(landmark_statement(video_id, response["video_info"], sport, LANDMARK_STORE.root))
+    WRITER.add_many(statements)
+    return response
+
+
+def _result_version(result: Dict[str, Any]) -> str:
+    """Pipeline version the result was scored with (results cached before it was recorded: the current one)"""
+    return result.get("pipeline_version") or inference.pipeline_version()
+
+
+def _store_result(video_id: str, sport: Optional[str], result: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Record a fresh result's stage timings in the metrics, then cache it without them, under
+    the version it was scored with (artifacts may have been reloaded since the lookup)
+    """
+    timings = result.pop("timings_ms", None) or {}
+    record_timings(timings, result.get("video_info", {}).get("sampled_frames", 0))
+    INFERENCE_VIDEOS.inc(outcome="ok")
+    RESULT_CACHE.put(cache_key(video_id, _result_version(result), sport), result)
+    return timings
+
+
+async def release_upload_ticket(ticket: Optional[str]) -> None:
+    """Return an upload's admission ticket (see main.admit_uploads) once its work is over"""
+    if ticket is None:
+        return
+    if rate_limit.SHARED:
+        await run_in_threadpool(rate_limit.UPLOAD_ADMISSION.release, ticket)
+    else:
+        rate_limit.UPLOAD_ADMISSION.release(ticket)
+
+
+def _release_job_resources(scratch: ScratchFile, ticket: Optional[str]) -> None:
+    scratch.cleanup()
+    if ticket is not None:
+        rate_limit.UPLOAD_ADMISSION.release(ticket)
+
+
+def _submit_job(request: Request, scratch: ScratchFile, sport: Optional[str], video_id: str) -> Future:
+    """
+    Queue the spooled clip for analysis. The job takes over the scratch file and the upload's
+    admission ticket and frees them when it actually finishes: a request that times out
+    must not delete a clip a worker is still decoding.
+    """
+    future = INFERENCE_POOL.submit(inference.process_video, scratch.path, sport, video_id)
+    ticket = getattr(request.state, "upload_ticket", None)
+    request.state.upload_ticket = None
+    future.add_done_callback(lambda _: _release_job_resources(scratch, ticket))
+    return future
+
+
+async def _run_job(job_id: str, future: Future, video_id: str, athlete_id: Optional[str], sport: Optional[str],
+                   region: Optional[str] = None, birth_year: Optional[int] = None) -> None:
+    """Follow a background job, marking it running once a worker picks it up, and record its outcome"""
+    timeout = INFERENCE_POOL.timeout if INFERENCE_POOL.timeout > 0 else None
+    deadline = None if timeout is None else time.monotonic() + timeout
+    waiter = asyncio.wrap_future(future)
     try:
-        # Assign atomically to module variable, handling both import styles
+        # Status polls may land on another worker, so the job record is updated here rather than on poll
+        while not (future.running() or future.done()):
+            await asyncio.wait({waiter}, timeout=JOB_START_POLL_SECONDS)
+        if not future.done():
+            JOB_STORE.mark_running(job_id)
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        result = await asyncio.wait_for(waiter, remaining)
+        _store_result(video_id, sport, result)
+        JOB_STORE.mark_done(job_id, _publish(result, video_id, athlete_id, sport, region, birth_year))
+    except asyncio.TimeoutError:
+        INFERENCE_VIDEOS.inc(outcome="timeout")
+        JOB_STORE.mark_failed(job_id, "Video analysis timed out")
+    except Exception as exc:
+        INFERENCE_VIDEOS.inc(outcome="failed")
+        JOB_STORE.mark_failed(job_id, f"Video analysis failed: {exc}")
+
+
+@router.post("/upload_video/")
+async def upload_video(
+    request: Request,
+    response: Response,
+    file: UploadFile = File(...),
+    sport: Optional[str] = Form(None),
+    athlete_id: Optional[str] = Form(None),
+    region: Optional[str] = Form(None, max_length=64),
+    birth_year: Optional[int] = Form(None, ge=1900, le=2100),
+    mode: str = Query("sync", pattern="^(sync|async)$"),
+):
+    """Analyse a clip; with mode=async return a job id at once and poll /jobs/{job_id}
+
+    `sport` picks the frame sampling strategy used for the clip; `athlete_id` attributes the
+    stored assessment to an athlete, and `region` / `birth_year` (optional) update that
+    athlete's profile for the regional and age-band leaderboards. Synchronous responses carry
+    a Server-Timing header with the time spent in each pipeline stage.
+    """
+    # main.admit_uploads already turned this away before the body was read if the pool was
+    # full then; FastAPI has parsed the form by now, but jobs may have arrived meanwhile and
+    # this avoids spooling a second copy of the clip for nothing
+    if not INFERENCE_POOL.has_capacity():
+        raise _busy()
+    suffix = os.path.splitext(file.filename or "")[1] or ".mp4"
+
+    if mode == "async":
+        scratch = WORKSPACE.create(suffix)
         try:
-            from backend.routes import results as results_module  # type: ignore
-        except Exception:
-            from routes import results as results_module  # type: ignore
-        results_module.LATEST_RESULT = response  # type: ignore[arg-type]
-    except Exception:
-        pass
+            await _spool_upload(file, scratch)
+            video_id = scratch.digest
+            key = cache_key(video_id, inference.pipeline_version(), sport)
+            cached = RESULT_CACHE.get(key)
+            if cached is not None:
+                INFERENCE_VIDEOS.inc(outcome="cached")
+                scratch.cleanup()
+                job_id = JOB_STORE.create()
+                JOB_STORE.mark_done(job_id, _publish(cached, video_id, athlete_id, sport, region, birth_year))
+                return JSONResponse(status_code=202, content={"job_id": job_id, "status": DONE})
+            # From here the job owns the clip and the admission ticket, past the 202 and any timeout
+            future = _submit_job(request, scratch, sport, video_id)
+        except PoolSaturated:
+            scratch.cleanup()
+            raise _busy()
+        except BaseException:
+            scratch.cleanup()
+            raise
+        job_id = JOB_STORE.create()
+        task = asyncio.create_task(_run_job(job_id, future, video_id, athlete_id, sport, region, birth_year))
+        _background_jobs.add(task)
+        task.add_done_callback(_background_jobs.discard)
+        return JSONResponse(status_code=202, content={"job_id": job_id, "status": QUEUED})
+
+    scratch = WORKSPACE.create(suffix)
+    submitted = False
+    try:
+        await _spool_upload(file, scratch)
+        # Re-uploads of the same clip are answered from the cache without decoding
+        video_id = scratch.digest
+        key = cache_key(video_id, inference.pipeline_version(), sport)
+        result = RESULT_CACHE.get(key)
+        if result is None:
+            try:
+                future = _submit_job(request, scratch, sport, video_id)
+            except PoolSaturated:
+                raise _busy()
+            submitted = True
+            timeout = INFERENCE_POOL.timeout if INFERENCE_POOL.timeout > 0 else None
+            try:
+                result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+            except asyncio.TimeoutError:
+                INFERENCE_VIDEOS.inc(outcome="timeout")
+                raise HTTPException(status_code=504, detail="Video analysis timed out")
+            except Exception:
+                INFERENCE_VIDEOS.inc(outcome="failed")
+                raise
+            response.headers["Server-Timing"] = server_timing(_store_result(video_id, sport, result))
+        else:
+            INFERENCE_VIDEOS.inc(outcome="cached")
+            response.headers["Server-Timing"] = "cache;desc=hit"
+    finally:
+        # Once submitted, the job cleans up after itself
+        if not submitted:
+            scratch.cleanup()
     # Return flat JSON to match mobile client expectations
-    return response
+    return _publish(result, video_id, athlete_id, sport, region, birth_year)
+
+
+@router.get("/inference/stats")
+def inference_stats():
+    """Worker pool occupancy and pose-model batching statistics"""
+    return {
+        "pool": {
+            "kind": INFERENCE_POOL.kind,
+            "workers": INFERENCE_POOL.workers,
+            "capacity": INFERENCE_POOL.capacity,
+            "pending": INFERENCE_POOL.pending,
+        },
+        "pose_batching": inference.POSE_BATCHER.stats(),
+        "cheat_batching": inference.CHEAT_BATCHER.stats(),
+        "result_cache": RESULT_CACHE.stats(),
+    }
@@ -0,0 +1,213 @@
+import json
+import os
+import pickle
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    from backend.services.tflite_pool import InterpreterPool
+except Exception:
+    from services.tflite_pool import InterpreterPool
+
+# Model and normalization artifacts are loaded once into an immutable snapshot. A watcher
+# thread polls their mtimes and swaps in a freshly loaded snapshot when one changes, so
+# requests never touch the filesystem and artifacts can be replaced without a restart.
+MODEL_ARTIFACT_DIRS = [
+    path for path in os.environ.get("MODEL_ARTIFACT_DIRS", "").split(os.pathsep) if path
+] or [
+    os.path.join("ml_models", "saved_models"),
+    os.path.join("..", "ml_models", "saved_models"),
+]
+# Seconds between mtime checks; 0 disables hot reload
+ARTIFACT_RELOAD_INTERVAL = float(os.environ.get("ARTIFACT_RELOAD_INTERVAL", "5"))
+
+POSE_TFLITE = "pose_model.tflite"
+POSE_H5 = "pose_model.h5"
+CHEAT_DETECTOR = "cheat_detector.pkl"
+NORM_STATS = "landmark_norm.json"
+ARTIFACT_FILES = (POSE_TFLITE, POSE_H5, CHEAT_DETECTOR, NORM_STATS)
+
+# (path, size, mtime_ns) of the file an artifact was loaded from
+Fingerprint = Tuple[str, int, int]
+
+
+class Artifacts:
+    """One consistent set of loaded artifacts; never mutated once published"""
+
+    def __init__(self, pose_model: Any = None, cheat_detector: Any = None,
+                 norm: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+                 fingerprints: Optional[Dict[str, Fingerprint]] = None):
+        # ("tflite" | "keras", model) or None
+        self.pose_model = pose_model
+        self.cheat_detector = cheat_detector
+        # (mean, std_safe), both float32 (1, 33, 3) and ready to broadcast over time
+        self.norm = norm
+        self.fingerprints = dict(fingerprints or {})
+        self.version = "|".join(
+            f"{name}:{size}:{mtime}" for name, (_, size, mtime) in sorted(self.fingerprints.items())
+        )
+
+
+def _fingerprint(name: str) -> Optional[Fingerprint]:
+    """First copy of an artifact found in MODEL_ARTIFACT_DIRS"""
+    for directory in MODEL_ARTIFACT_DIRS:
+        path = os.path.join(directory, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        return path, stat.st_size, stat.st_mtime_ns
+    return None
+
+
+_tf: Any = None
+_tf_imported = False
+
+
+def _tensorflow() -> Any:
+    """TensorFlow, imported the first time a model is loaded; raises if it is not installed"""
+    global _tf, _tf_imported
+    if not _tf_imported:
+        try:
+            import tensorflow as tf  # type: ignore
+            _tf = tf
+        except Exception:
+            _tf = None
+        _tf_imported = True
+    if _tf is None:
+        raise RuntimeError("TensorFlow is not installed")
+    return _tf
+
+
+def _load_tflite(path: str) -> Any:
+    interpreters = InterpreterPool(_tensorflow(), path)
+    interpreters.warm_up()
+    return ("tflite", interpreters)
+
+
+def _load_keras(path: str) -> Any:
+    return ("keras", _tensorflow().keras.models.load_model(path))
+
+
+def _load_cheat_detector(path: str) -> Any:
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _load_norm_stats(path: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    with open(path, "r") as f:
+        data = json.load(f)
+    mean = np.asarray(data.get("mean", []), dtype=np.float32)
+    std = np.asarray(data.get("std", []), dtype=np.float32)
+    if not (mean.size and std.size):
+        return None
+    std_safe = np.where(std == 0, 1.0, std).astype(np.float32)
+    return mean.reshape(1, 33, 3), std_safe.reshape(1, 33, 3)
+
+
+_LOADERS = {
+    POSE_TFLITE: _load_tflite,
+    POSE_H5: _load_keras,
+    CHEAT_DETECTOR: _load_cheat_detector,
+    NORM_STATS: _load_norm_stats,
+}
+
+
+class ArtifactRegistry:
+    """Holds the current Artifacts snapshot and reloads the files that changed"""
+
+    def __init__(self, reload_interval: float = ARTIFACT_RELOAD_INTERVAL):
+        self.reload_interval = reload_interval
+        self._current = Artifacts()
+        # Loaded object per artifact file, reused while its fingerprint is unchanged
+        self._loaded: Dict[str, Any] = {}
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self.loaded = False
+        self.reloads = 0
+
+    @property
+    def current(self) -> Artifacts:
+        """
+        The latest snapshot; read it once per request so all artifacts come from one set.
+        Loads synchronously if nothing has loaded them yet (worker processes, the CLI).
+        """
+        if not self.loaded:
+            self.reload()
+        # Started on first use, but not again after an explicit stop_watcher()
+        if self._watcher is None and not self._stop.is_set() and self.reload_interval > 0:
+            self.start_watcher()
+        return self._current
+
+    def reload(self) -> bool:
+        """Load artifacts whose files changed and publish a new snapshot; True if it changed"""
+        with self._reload_lock:
+            previous = self._current.fingerprints
+            fingerprints: Dict[str, Fingerprint] = {}
+            loaded: Dict[str, Any] = {}
+            for name in ARTIFACT_FILES:
+                fingerprint = _fingerprint(name)
+                if fingerprint is None:
+                    continue
+                if fingerprint == previous.get(name):
+                    fingerprints[name] = fingerprint
+                    loaded[name] = self._loaded.get(name)
+                    continue
+                try:
+                    loaded[name] = _LOADERS[name](fingerprint[0])
+                except Exception:
+                    # Half-written or unreadable: keep what was loaded before until the file changes again
+                    loaded[name] = self._loaded.get(name)
+                fingerprints[name] = fingerprint
+            if fingerprints == previous:
+                self.loaded = True
+                return False
+            self._loaded = loaded
+            self._current = Artifacts(
+                pose_model=loaded.get(POSE_TFLITE) or loaded.get(POSE_H5),
+                cheat_detector=loaded.get(CHEAT_DETECTOR),
+                norm=loaded.get(NORM_STATS),
+                fingerprints=fingerprints,
+            )
+            self.loaded = True
+            self.reloads += 1
+            return True
+
+    def replace(self, **components: Any) -> Artifacts:
+        """Publish a snapshot with some components swapped in by hand (benchmarks, tests)"""
+        with self._reload_lock:
+            current = self._current
+            values = {
+                "pose_model": current.pose_model,
+                "cheat_detector": current.cheat_detector,
+                "norm": current.norm,
+            }
+            values.update(components)
+            self._current = Artifacts(fingerprints=current.fingerprints, **values)
+            return self._current
+
+    def start_watcher(self) -> None:
+        with self._reload_lock:
+            if self._watcher is not None or self.reload_interval <= 0:
+                return
+            self._stop.clear()
+            self._watcher = threading.Thread(target=self._watch, name="artifact-watcher", daemon=True)
+            self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        self._stop.set()
+        with self._reload_lock:
+            self._watcher = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.reload_interval):
+            try:
+                self.reload()
+            except Exception:
+                pass
+
+
+ARTIFACTS = ArtifactRegistry()
@@ -0,0 +1,134 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# MediaPipe Pose landmark indices
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+LEFT_ELBOW, RIGHT_ELBOW = 13, 14
+LEFT_WRIST, RIGHT_WRIST = 15, 16
+LEFT_HIP, RIGHT_HIP = 23, 24
+LEFT_KNEE, RIGHT_KNEE = 25, 26
+LEFT_ANKLE, RIGHT_ANKLE = 27, 28
+
+# Joint angles as (name, a, vertex, c): the angle at `vertex` between the segments to a and c
+JOINTS: Tuple[Tuple[str, int, int, int], ...] = (
+    ("left_knee", LEFT_HIP, LEFT_KNEE, LEFT_ANKLE),
+    ("right_knee", RIGHT_HIP, RIGHT_KNEE, RIGHT_ANKLE),
+    ("left_hip", LEFT_SHOULDER, LEFT_HIP, LEFT_KNEE),
+    ("right_hip", RIGHT_SHOULDER, RIGHT_HIP, RIGHT_KNEE),
+    ("left_elbow", LEFT_SHOULDER, LEFT_ELBOW, LEFT_WRIST),
+    ("right_elbow", RIGHT_SHOULDER, RIGHT_ELBOW, RIGHT_WRIST),
+    ("left_shoulder", LEFT_HIP, LEFT_SHOULDER, LEFT_ELBOW),
+    ("right_shoulder", RIGHT_HIP, RIGHT_SHOULDER, RIGHT_ELBOW),
+)
+JOINT_NAMES = tuple(name for name, _, _, _ in JOINTS)
+# Column pairs (left, right) in the angle matrix
+JOINT_PAIRS = tuple((i, i + 1) for i in range(0, len(JOINTS), 2))
+
+_A = np.array([a for _, a, _, _ in JOINTS])
+_B = np.array([b for _, _, b, _ in JOINTS])
+_C = np.array([c for _, _, _, c in JOINTS])
+
+# Videos whose features are kept, keyed by a digest of the landmark tensor
+FEATURE_CACHE_SIZE = int(os.environ.get("FEATURE_CACHE_SIZE", "64"))
+
+
+class PoseFeatures:
+    """
+    Biomechanics derived from one (T, 33, 3) landmark tensor. Angles are in degrees,
+    derivatives are per second, and NaN marks frames where the inputs were not detected.
+    """
+
+    def __init__(self, landmarks: np.ndarray, fps: float):
+        self.fps = fps if fps and fps > 0 else 30.0
+        dt = 1.0 / self.fps
+        # The tensor the features came from, for scorers that read raw positions
+        self.landmarks = landmarks
+
+        # (T, 33) landmark detected; (T,) any landmark detected
+        self.detected = ~np.all(landmarks == 0, axis=2)
+        self.frame_valid = self.detected.any(axis=1)
+
+        # Joint angles on the image plane; MediaPipe's z is too noisy to help
+        a = landmarks[:, _A, :2]
+        b = landmarks[:, _B, :2]
+        c = landmarks[:, _C, :2]
+        ba, bc = a - b, c - b
+        norms = np.linalg.norm(ba, axis=2) * np.linalg.norm(bc, axis=2)
+        complete = self.detected[:, _A] & self.detected[:, _B] & self.detected[:, _C] & (norms > 0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cosine = np.einsum("tjk,tjk->tj", ba, bc) / norms
+        angles = np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+        self.angles = np.where(complete, angles, np.nan)
+
+        # Centre of mass as the mean of the detected landmarks
+        self.com = centres_of_mass(landmarks, self.detected)
+
+        if landmarks.shape[0] >= 2:
+            self.angular_velocity = np.gradient(self.angles, dt, axis=0)
+            self.angular_acceleration = np.gradient(self.angular_velocity, dt, axis=0)
+            self.com_velocity = np.gradient(self.com, dt, axis=0)
+        else:
+            self.angular_velocity = np.full_like(self.angles, np.nan)
+            self.angular_acceleration = np.full_like(self.angles, np.nan)
+            self.com_velocity = np.full_like(self.com, np.nan)
+
+    def angle(self, name: str) -> np.ndarray:
+        return self.angles[:, JOINT_NAMES.index(name)]
+
+
+def centres_of_mass(landmarks: np.ndarray, detected: Optional[np.ndarray] = None) -> np.ndarray:
+    """Mean of the detected landmarks in each frame, shape (T, 3); NaN where nothing was detected"""
+    if detected is None:
+        detected = ~np.all(landmarks == 0, axis=2)
+    counts = detected.sum(axis=1)
+    sums = np.where(detected[..., None], landmarks, 0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts[:, None]
+
+
+_cache: "OrderedDict[str, PoseFeatures]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _fingerprint(landmarks: np.ndarray, fps: float) -> str:
+    digest = hashlib.blake2b(np.ascontiguousarray(landmarks).tobytes(), digest_size=16)
+    digest.update(f"{landmarks.shape}{landmarks.dtype}{fps}".encode())
+    return digest.hexdigest()
+
+
+def compute_features(landmarks: np.ndarray, fps: float) -> PoseFeatures:
+    """Features for a clip, computed once and reused while the clip stays in the LRU cache"""
+    if FEATURE_CACHE_SIZE <= 0:
+        return PoseFeatures(landmarks, fps)
+    key = _fingerprint(landmarks, fps)
+    with _cache_lock:
+        features = _cache.get(key)
+        if features is not None:
+            _cache.move_to_end(key)
+            return features
+    features = PoseFeatures(landmarks, fps)
+    with _cache_lock:
+        _cache[key] = features
+        while len(_cache) > FEATURE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return features
+
+
+def summarize(features: PoseFeatures) -> Dict[str, Dict[str, Optional[float]]]:
+    """Per-joint range of motion and peak angular velocity for API responses"""
+    summary: Dict[str, Dict[str, Optional[float]]] = {}
+    for index, name in enumerate(JOINT_NAMES):
+        angles = features.angles[:, index]
+        valid = angles[~np.isnan(angles)]
+        velocity = np.abs(features.angular_velocity[:, index])
+        velocity = velocity[~np.isnan(velocity)]
+        summary[name] = {
+            "range_of_motion": float(valid.max() - valid.min()) if valid.size else None,
+            "peak_angular_velocity": float(velocity.max()) if velocity.size else None,
+        }
+    return summary
@@ -1,91 +1,335 @@
+import logging
 import os
-import pickle
-from typing import Any, Dict, List, Tuple
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
 try:
     import cv2  # type: ignore
 except Exception:
     cv2 = None  # OpenCV optional for stub
 
 try:
-    import tensorflow as tf  # type: ignore
+    from backend.services import features as pose_features
+    from backend.services.artifacts import ARTIFACTS, Artifacts
+    from backend.services.landmark_store import LANDMARK_STORE
+    from backend.services.workspace import WORKSPACE
 except Exception:
-    tf = None
+    from services import features as pose_features
+    from services.artifacts import ARTIFACTS, Artifacts
+    from services.landmark_store import LANDMARK_STORE
+    from services.workspace import WORKSPACE
 
 # Safe import of preprocessing function with fallback
 extract_pose_landmarks = None
+extract_clip_pipelined = None
+POSE_POOL = None
 try:
     # Try absolute import first (when running from project root)
-    from ml_models.utils.preprocessing import extract_pose_landmarks as _extract
+    from ml_models.utils.preprocessing import (
+        extract_pose_landmarks as _extract, POSE_POOL, extract_clip_pipelined, warm_up_estimators
+    )
     extract_pose_landmarks = _extract
 except Exception:
     try:
         # Fallback: try importing from parent directory
         import sys
-        import os
         sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
-        from ml_models.utils.preprocessing import extract_pose_landmarks as _extract
+        from ml_models.utils.preprocessing import (
+            extract_pose_landmarks as _extract, POSE_POOL, extract_clip_pipelined, warm_up_estimators
+        )
         extract_pose_landmarks = _extract
     except Exception:
         def extract_pose_landmarks(_frame: Any):
             return np.zeros((33, 3), dtype=float)
 
 
-def _load_models():
-    pose_model = None
-    cheat_detector = None
-    
-    # Try different possible paths for models
-    possible_tflite_paths = [
-        os.path.join("ml_models", "saved_models", "pose_model.tflite"),
-        os.path.join("..", "ml_models", "saved_models", "pose_model.tflite")
-    ]
-    possible_h5_paths = [
-        os.path.join("ml_models", "saved_models", "pose_model.h5"),
-        os.path.join("..", "ml_models", "saved_models", "pose_model.h5")
-    ]
-    possible_cheat_paths = [
-        os.path.join("ml_models", "saved_models", "cheat_detector.pkl"),
-        os.path.join("..", "ml_models", "saved_models", "cheat_detector.pkl")
-    ]
-    
-    # Prefer TFLite model if present
-    for tflite_path in possible_tflite_paths:
-        if os.path.exists(tflite_path) and tf is not None:
-            try:
-                interpreter = tf.lite.Interpreter(model_path=tflite_path)
-                interpreter.allocate_tensors()
-                pose_model = ("tflite", interpreter)
-                break
-            except Exception:
-                continue
-    
-    # Try H5 model if TFLite not found
-    if pose_model is None:
-        for h5_path in possible_h5_paths:
-            if os.path.exists(h5_path) and tf is not None:
+def _extract_landmarks(frames: Iterator[np.ndarray],
+                       capacity: int) -> Tuple[np.ndarray, np.ndarray, Dict[str, float]]:
+    """
+    Pose landmarks (T, 33, 3), visibility (T, 33) and per-stage timings for one clip. Frames
+    are decoded on one thread and run through pooled estimators on others (see
+    PIPELINE_POSE_WORKERS) into a float32 buffer preallocated for `capacity` frames.
+    """
+    if POSE_POOL is None:
+        start = time.perf_counter()
+        pose_seconds = 0.0
+        coords = []
+        for frame in frames:
+            pose_start = time.perf_counter()
+            coords.append(extract_pose_landmarks(frame))
+            pose_seconds += time.perf_counter() - pose_start
+        landmarks = np.asarray(coords, dtype=np.float32).reshape(-1, 33, 3)
+        timings = {"pose_ms": pose_seconds * 1000, "extract_wall_ms": (time.perf_counter() - start) * 1000}
+        return landmarks, np.zeros(landmarks.shape[:2], dtype=np.float32), timings
+    buffer, timings = extract_clip_pipelined(frames, capacity)
+    return buffer.landmarks, buffer.visibilities, timings
+
+
+# Pose-model calls from concurrent uploads are coalesced into one batched predict/invoke
+POSE_BATCH_MAX_SIZE = int(os.environ.get("POSE_BATCH_MAX_SIZE", "8"))
+POSE_BATCH_MAX_WAIT_MS = float(os.environ.get("POSE_BATCH_MAX_WAIT_MS", "5"))
+# Seconds a caller waits for its batched result before giving up on it
+POSE_BATCH_RESULT_TIMEOUT = float(os.environ.get("POSE_BATCH_RESULT_TIMEOUT", "30"))
+
+
+class MicroBatcher:
+    """
+    Collects single items submitted from many threads and runs them through `fn` as one
+    batch, once `max_batch` items are waiting or the oldest has waited `max_wait_ms`.
+    `fn` maps a list of N items to N per-item results.
+    """
+
+    def __init__(self, fn: Callable[[List[Any]], Sequence[Any]], max_batch: int, max_wait_ms: float, name: str,
+                 result_timeout: float = POSE_BATCH_RESULT_TIMEOUT):
+        self._fn = fn
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.name = name
+        self.result_timeout = result_timeout
+        self._queue: "queue.Queue[Tuple[Any, Future]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.batch_sizes: Dict[int, int] = {}
+
+    def submit(self, item: Any) -> Future:
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((item, future))
+        return future
+
+    def __call__(self, item: Any) -> Any:
+        """
+        Run one item through the batched function and wait for its result; raises
+        concurrent.futures.TimeoutError after `result_timeout` seconds (0 waits forever)
+        """
+        return self.submit(item).result(self.result_timeout if self.result_timeout > 0 else None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+                "batch_sizes": dict(sorted(self.batch_sizes.items())),
+                "queued": self._queue.qsize(),
+            }
+
+    def _ensure_worker(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name=f"{self.name}-batcher", daemon=True)
+                self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
                 try:
-                    pose_model = ("keras", tf.keras.models.load_model(h5_path))
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
                     break
-                except Exception:
-                    continue
-
-    # Load cheat detector
-    for cheat_path in possible_cheat_paths:
-        if os.path.exists(cheat_path):
+            # One bad batch must not take the worker, and every later caller, down with it
             try:
-                with open(cheat_path, "rb") as f:
-                    cheat_detector = pickle.load(f)
-                break
-            except Exception:
-                continue
-
-    return pose_model, cheat_detector
-
-
-POSE_MODEL, CHEAT_DETECTOR = _load_models()
+                self._run(batch)
+            except Exception as exc:
+                logger.exception("%s batcher failed on a batch of %d", self.name, len(batch))
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+
+    def _run(self, batch: List[Tuple[Any, Future]]) -> None:
+        try:
+            outputs = list(self._fn([item for item, _ in batch]))
+        except Exception as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        if len(outputs) != len(batch):
+            error = RuntimeError(f"{self.name} batch of {len(batch)} returned {len(outputs)} results")
+            for _, future in batch:
+                future.set_exception(error)
+            return
+        with self._lock:
+            self.batches += 1
+            self.items += len(batch)
+            self.batch_sizes[len(batch)] = self.batch_sizes.get(len(batch), 0) + 1
+        for (_, future), output in zip(batch, outputs):
+            future.set_result(output)
+
+
+def _by_snapshot(items: List[Tuple[Artifacts, Any]]) -> List[Tuple[Artifacts, List[int]]]:
+    """Positions of the batch items grouped by the artifact snapshot they were submitted with"""
+    groups: Dict[int, Tuple[Artifacts, List[int]]] = {}
+    for index, (artifacts, _) in enumerate(items):
+        groups.setdefault(id(artifacts), (artifacts, []))[1].append(index)
+    return list(groups.values())
+
+
+def _predict_pose_batch(items: List[Tuple[Artifacts, np.ndarray]]) -> np.ndarray:
+    """
+    Mean model output for each (snapshot, (120, 33, 3) window) item; the windows of each
+    snapshot run as one (N, 120, 33, 3) batch through that snapshot's model
+    """
+    outputs = np.empty(len(items), dtype=np.float32)
+    for artifacts, indices in _by_snapshot(items):
+        batch = np.stack([items[i][1] for i in indices])
+        kind, model = artifacts.pose_model
+        if kind == "keras":
+            predictions = model.predict(batch, verbose=0)
+        else:
+            predictions = model.predict(batch)
+        predictions = np.asarray(predictions, dtype=np.float32).reshape(batch.shape[0], -1)
+        outputs[indices] = predictions.mean(axis=1)
+    return outputs
+
+
+POSE_BATCHER = MicroBatcher(_predict_pose_batch, POSE_BATCH_MAX_SIZE, POSE_BATCH_MAX_WAIT_MS, "pose")
+
+# Cheat detection scores each real frame (padding excluded) of every in-flight clip in one call.
+# Per-frame anomaly scores are sigmoid(-decision_function / temperature), averaged over the
+# clip; the clip is flagged when that average reaches the threshold. The temperature is a fixed
+# scale, not fitted to held-out scores, so the result ranks frames but is not a probability.
+CHEAT_SCORE_THRESHOLD = float(os.environ.get("CHEAT_SCORE_THRESHOLD", "0.5"))
+CHEAT_SCORE_TEMPERATURE = float(os.environ.get("CHEAT_SCORE_TEMPERATURE", "0.05"))
+
+
+def _cheat_features(landmarks_array: np.ndarray, valid_frames: np.ndarray) -> np.ndarray:
+    """One row per real frame of the window: its 99 normalized landmark coordinates"""
+    rows = landmarks_array[valid_frames[:landmarks_array.shape[0]]]
+    return np.ascontiguousarray(rows.reshape(-1, 33 * 3), dtype=np.float32)
+
+
+def _score_cheat_batch(items: List[Tuple[Artifacts, np.ndarray]]) -> List[Tuple[int, float]]:
+    """(flag, anomaly score in [0, 1]) per (snapshot, frame rows) item; one detector pass per snapshot"""
+    results: List[Tuple[int, float]] = [(0, 0.0)] * len(items)
+    for artifacts, indices in _by_snapshot(items):
+        clips = [items[i][1] for i in indices]
+        rows = np.concatenate(clips)
+        detector = artifacts.cheat_detector
+        if hasattr(detector, "decision_function"):
+            decision = np.asarray(detector.decision_function(rows), dtype=np.float64)
+            temperature = CHEAT_SCORE_TEMPERATURE if CHEAT_SCORE_TEMPERATURE > 0 else 1.0
+            frame_scores = 1.0 / (1.0 + np.exp(np.clip(decision / temperature, -50, 50)))
+        else:
+            frame_scores = (np.asarray(detector.predict(rows)) == -1).astype(np.float64)
+        for index, scores in zip(indices, np.split(frame_scores, np.cumsum([clip.shape[0] for clip in clips])[:-1])):
+            score = float(scores.mean())
+            results[index] = (int(score >= CHEAT_SCORE_THRESHOLD), score)
+    return results
+
+
+CHEAT_BATCHER = MicroBatcher(_score_cheat_batch, POSE_BATCH_MAX_SIZE, POSE_BATCH_MAX_WAIT_MS, "cheat")
+
+
+# Number of frames the pose model consumes per clip
+TARGET_LEN = 120
+
+# How frames are picked from a clip before pose estimation. Everything past the model
+# window used to be decoded and then thrown away, so the strategies stop early or skip
+# unwanted frames with cap.grab(), which demuxes without decoding.
+#   "head"    - frames from the start until the window is full (same frames as decoding all)
+#   "fps"     - resample to `target_fps`, then stop once the window is full
+#   "uniform" - spread the window evenly over the whole clip
+#   "all"     - decode every frame
+DEFAULT_DECODE_STRATEGY: Dict[str, Any] = {
+    "mode": os.environ.get("DECODE_STRATEGY", "head"),
+    "target_fps": float(os.environ.get("DECODE_TARGET_FPS", "30")),
+}
+
+# Per-sport overrides, keyed by the normalised sport name
+SPORT_DECODE_STRATEGIES: Dict[str, Dict[str, Any]] = {
+    # Short explosive efforts: keep the start of the clip at a steady rate
+    "vertical_jump": {"mode": "fps", "target_fps": 60.0},
+    "long_jump": {"mode": "fps", "target_fps": 60.0},
+    "sprinting": {"mode": "fps", "target_fps": 30.0},
+    # Long or repetitive tests: cover the whole clip
+    "shuttle_run": {"mode": "uniform"},
+    "situps": {"mode": "uniform"},
+}
+
+
+def get_decode_strategy(sport: Optional[str] = None) -> Dict[str, Any]:
+    """Decode strategy for a sport, falling back to the default"""
+    key = (sport or "").strip().lower().replace("-", "_").replace(" ", "_")
+    return {**DEFAULT_DECODE_STRATEGY, **SPORT_DECODE_STRATEGIES.get(key, {})}
+
+
+def _iter_frames(cap: Any, strategy: Dict[str, Any], total_frames: int, fps: float) -> Iterator[np.ndarray]:
+    """Yield the frames selected by `strategy`, grabbing past the ones it skips"""
+    mode = strategy.get("mode", "head")
+    if mode == "all":
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                return
+            yield frame
+
+    if mode == "uniform" and total_frames > TARGET_LEN:
+        wanted = np.unique(np.linspace(0, total_frames - 1, TARGET_LEN).round().astype(int))
+        index = 0
+        for target in wanted:
+            while index < target:
+                if not cap.grab():
+                    return
+                index += 1
+            ret, frame = cap.read()
+            if not ret:
+                return
+            index += 1
+            yield frame
+        return
+
+    # "head", "fps", and "uniform" on clips no longer than the window
+    step = 1.0
+    target_fps = float(strategy.get("target_fps") or 0)
+    if mode == "fps" and fps > target_fps > 0:
+        step = fps / target_fps
+    emitted = 0
+    index = 0
+    next_pick = 0.0
+    while emitted < TARGET_LEN:
+        if index + 1e-6 >= next_pick:
+            ret, frame = cap.read()
+            if not ret:
+                return
+            emitted += 1
+            next_pick += step
+            yield frame
+        elif not cap.grab():
+            return
+        index += 1
+
+
+def _expected_frames(strategy: Dict[str, Any], total_frames: int) -> int:
+    """How many frames the strategy will yield, used to size the landmark buffer up front"""
+    if strategy.get("mode") == "all":
+        return total_frames if total_frames > 0 else TARGET_LEN
+    return min(TARGET_LEN, total_frames) if total_frames > 0 else TARGET_LEN
+
+
+def _sample_fps(strategy: Dict[str, Any], fps: float, duration: float, sampled: int) -> float:
+    """Effective frame rate of the sampled sequence"""
+    mode = strategy.get("mode", "head")
+    target_fps = float(strategy.get("target_fps") or 0)
+    if mode == "uniform" and duration > 0 and sampled >= TARGET_LEN:
+        return sampled / duration
+    if mode == "fps" and fps > target_fps > 0:
+        return target_fps
+    return fps
 
 
 def _pad_or_truncate(sequence: np.ndarray, target_len: int) -> np.ndarray:
@@ -99,34 +343,34 @@ def _pad_or_truncate(sequence: np.ndarray, target_len: int) -> np.ndarray:
     return np.concatenate([sequence, padding], axis=0)
 
 
-def _normalize(sequence: np.ndarray, mean_std: Tuple[np.ndarray, np.ndarray] | None) -> np.ndarray:
-    if mean_std is None:
+def _normalize(sequence: np.ndarray, norm: Tuple[np.ndarray, np.ndarray] | None) -> np.ndarray:
+    """Standardize with precomputed (mean, std_safe) arrays that broadcast over time"""
+    if norm is None:
         return sequence
-    mean, std = mean_std
-    std_safe = np.where(std == 0, 1.0, std)
+    mean, std_safe = norm
     return (sequence - mean) / std_safe
 
 
-def _load_norm_stats() -> Tuple[np.ndarray, np.ndarray] | None:
-    try:
-        import json
-        for path in [
-            os.path.join("ml_models", "saved_models", "landmark_norm.json"),
-            os.path.join("..", "ml_models", "saved_models", "landmark_norm.json"),
-        ]:
-            if os.path.exists(path):
-                with open(path, "r") as f:
-                    data = json.load(f)
-                    mean = np.asarray(data.get("mean", []), dtype=np.float32)
-                    std = np.asarray(data.get("std", []), dtype=np.float32)
-                    if mean.size and std.size:
-                        return mean, std
-    except Exception:
-        return None
-    return None
+# Bump when a change to decoding, scoring or the response makes previously cached results stale
+PIPELINE_VERSION = "2"
+
+
+def pipeline_version(artifacts: Optional[Artifacts] = None) -> str:
+    """PIPELINE_VERSION plus the size and mtime of every model/normalization artifact in the snapshot"""
+    return f"{PIPELINE_VERSION}|{(artifacts or ARTIFACTS.current).version}"
+
+
+# A clip can be handed over as raw bytes, a path to a file on disk or a binary file object
+VideoSource = Union[bytes, str, "os.PathLike[str]", BinaryIO]
 
 
-def process_video(video_bytes: bytes) -> Dict[str, Any]:
+def process_video(video: VideoSource, sport: Optional[str] = None,
+                  landmark_key: Optional[str] = None) -> Dict[str, Any]:
+    """Analyse a clip given as raw bytes, a file path or a binary file object
+
+    `sport` selects the frame sampling strategy (see SPORT_DECODE_STRATEGIES). When
+    `landmark_key` is given the extracted landmarks are kept in LANDMARK_STORE under it.
+    """
     # If OpenCV unavailable, return deterministic stubbed result
     if cv2 is None:
         return {
@@ -142,35 +386,83 @@ def process_video(video_bytes: bytes) -> Dict[str, Any]:
             }
         }
 
-    temp_file = "temp_video.mp4"
-    with open(temp_file, "wb") as f:
-        f.write(video_bytes)
+    # Files already on disk are decoded in place; anything else is spooled first
+    if isinstance(video, (str, os.PathLike)):
+        return _process_video_file(os.fspath(video), sport, landmark_key)
+
+    # Each call gets its own scratch file, removed even if decoding fails
+    with WORKSPACE.scratch_file() as scratch:
+        if isinstance(video, (bytes, bytearray, memoryview)):
+            scratch.write(video)
+        else:
+            scratch.write_from(video)
+        scratch.close()
+        return _process_video_file(scratch.path, sport, landmark_key)
 
-    cap = cv2.VideoCapture(temp_file)
-    landmarks_list: List[np.ndarray] = []
-    frame_count = 0
+
+def _process_video_file(video_path: str, sport: Optional[str] = None,
+                        landmark_key: Optional[str] = None) -> Dict[str, Any]:
+    cap = cv2.VideoCapture(video_path)
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
     
     # Get video properties
     fps = cap.get(cv2.CAP_PROP_FPS)
     duration = total_frames / fps if fps > 0 else 0
+    strategy = get_decode_strategy(sport)
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        landmarks = extract_pose_landmarks(frame)
-        landmarks_list.append(landmarks)
-        frame_count += 1
+    try:
+        # Shapes (T, 33, 3) and (T, 33)
+        landmarks_array, visibility, timings = _extract_landmarks(
+            _iter_frames(cap, strategy, total_frames, fps), _expected_frames(strategy, total_frames)
+        )
+    finally:
+        cap.release()
+    sampled_frames = landmarks_array.shape[0]
+
+    video_info = {
+        # Container frame count when known, otherwise what was actually decoded
+        "frame_count": total_frames if total_frames > 0 else sampled_frames,
+        "duration": duration,
+        "fps": fps,
+        "sampled_frames": sampled_frames,
+        "sample_fps": _sample_fps(strategy, fps, duration, sampled_frames),
+        "decode_strategy": strategy["mode"],
+        "mean_visibility": float(visibility.mean()) if sampled_frames else 0.0
+    }
 
-    cap.release()
-    if os.path.exists(temp_file):
+    # Keep the landmarks so scoring changes can be replayed without decoding again
+    if landmark_key and sampled_frames and LANDMARK_STORE.enabled:
         try:
-            os.remove(temp_file)
+            LANDMARK_STORE.save(landmark_key, landmarks_array, visibility, video_info, sport)
         except Exception:
             pass
 
-    if len(landmarks_list) == 0:
+    with _timed(timings, "scoring"):
+        result = score_landmarks(landmarks_array, video_info, timings)
+    result["timings_ms"] = timings
+    return result
+
+
+@contextmanager
+def _timed(timings: Optional[Dict[str, float]], stage: str) -> Iterator[None]:
+    """Record the wall time of a block as timings[f"{stage}_ms"] when timings is given"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[f"{stage}_ms"] = (time.perf_counter() - start) * 1000
+
+
+def score_landmarks(landmarks_array: np.ndarray, video_info: Dict[str, Any],
+                    timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Everything after pose extraction: normalization, analysis, model, cheat detection and
+    the final score, for a (T, 33, 3) landmark array and the clip's video_info. Per-stage
+    wall times are added to `timings` if given.
+    """
+    sampled_frames = landmarks_array.shape[0]
+    if sampled_frames == 0:
         return {
             "score": 0.0, 
             "cheat_detected": 0,
@@ -184,57 +476,50 @@ def process_video(video_bytes: bytes) -> Dict[str, Any]:
             }
         }
 
-    # Shape (T, 33, 3)
-    landmarks_array = np.array(landmarks_list, dtype=np.float32)
+    frame_count = video_info.get("frame_count", sampled_frames)
+    duration = video_info.get("duration", 0)
 
-    # Optional normalization
-    stats = _load_norm_stats()
-    if stats is not None:
-        # Broadcast over time dimension
-        mean, std = stats
-        try:
-            landmarks_array = _normalize(landmarks_array, (mean.reshape(1, 33, 3), std.reshape(1, 33, 3)))
-        except Exception:
-            pass
+    # Biomechanics come from the raw landmarks, over the same window the model sees
+    with _timed(timings, "features"):
+        features = pose_features.compute_features(
+            _pad_or_truncate(landmarks_array, TARGET_LEN), video_info.get("sample_fps", 0.0)
+        )
+
+    # One snapshot for the whole clip: it goes to the batchers with the clip and its version
+    # is returned with the result, so a reload mid-request cannot mix artifact versions
+    artifacts = ARTIFACTS.current
 
-    # Pad/Truncate to fixed length expected by model (e.g., 120 frames)
-    TARGET_LEN = 120
-    landmarks_array = _pad_or_truncate(landmarks_array, TARGET_LEN)
+    with _timed(timings, "normalize"):
+        # Optional normalization
+        landmarks_array = _normalize(landmarks_array, artifacts.norm)
+
+        # Pad/Truncate to fixed length expected by model (e.g., 120 frames)
+        landmarks_array = _pad_or_truncate(landmarks_array, TARGET_LEN)
 
     # Enhanced analysis
-    analysis_results = _analyze_performance(landmarks_array, frame_count, duration)
+    with _timed(timings, "analysis"):
+        analysis_results = _analyze_performance(landmarks_array, frame_count, duration, features)
     
     # Predict performance
     avg_score = 0.5
-    if POSE_MODEL is not None and tf is not None:
-        kind, model = POSE_MODEL
-        try:
-            if kind == "keras":
-                # Ensure batch dimension
-                batch = np.expand_dims(landmarks_array, axis=0)
-                predictions = model.predict(batch, verbose=0)
-                avg_score = float(np.mean(predictions))
-            elif kind == "tflite":
-                interpreter = model
-                input_details = interpreter.get_input_details()
-                output_details = interpreter.get_output_details()
-                # naive single-batch run
-                interpreter.resize_tensor_input(input_details[0]['index'], (1,) + landmarks_array.shape)
-                interpreter.allocate_tensors()
-                interpreter.set_tensor(input_details[0]['index'], np.expand_dims(landmarks_array, 0).astype(np.float32))
-                interpreter.invoke()
-                output_data = interpreter.get_tensor(output_details[0]['index'])
-                avg_score = float(np.mean(output_data))
-        except Exception:
-            avg_score = 0.5
+    with _timed(timings, "model"):
+        if artifacts.pose_model is not None:
+            try:
+                # Batched with whatever other uploads are in flight
+                avg_score = float(POSE_BATCHER((artifacts, landmarks_array.astype(np.float32, copy=False))))
+            except Exception:
+                avg_score = 0.5
 
     cheat_detected = 0
-    if CHEAT_DETECTOR is not None:
-        try:
-            preds = CHEAT_DETECTOR.predict(landmarks_array)
-            cheat_detected = int(np.any(preds == -1))
-        except Exception:
-            cheat_detected = 0
+    cheat_score = None
+    with _timed(timings, "cheat"):
+        if artifacts.cheat_detector is not None:
+            cheat_frames = _cheat_features(landmarks_array, features.frame_valid)
+            if cheat_frames.shape[0]:
+                try:
+                    cheat_detected, cheat_score = CHEAT_BATCHER((artifacts, cheat_frames))
+                except Exception:
+                    cheat_detected, cheat_score = 0, None
 
     # Calculate final score with enhanced analysis
     final_score = _calculate_final_score(avg_score, analysis_results, cheat_detected)
@@ -242,23 +527,92 @@ def process_video(video_bytes: bytes) -> Dict[str, Any]:
     return {
         "score": float(final_score), 
         "cheat_detected": cheat_detected,
+        "cheat_score": cheat_score,
         "analysis": analysis_results,
-        "video_info": {
-            "frame_count": frame_count,
-            "duration": duration,
-            "fps": fps
-        }
+        "video_info": dict(video_info),
+        "pipeline_version": pipeline_version(artifacts)
     }
 
 
-def _analyze_performance(landmarks_array: np.ndarray, frame_count: int, duration: float) -> Dict[str, Any]:
+def rescore(landmark_key: str) -> Optional[Dict[str, Any]]:
+    """Score stored landmarks with the current pipeline; None if the key is not in the store"""
+    stored = LANDMARK_STORE.load(landmark_key)
+    if stored is None:
+        return None
+    landmarks_array, _visibility, meta = stored
+    return score_landmarks(landmarks_array, meta.get("video_info", {}))
+
+
+# Startup progress reported by /readyz; written only by warm_up()
+WARM_STATE: Dict[str, Any] = {
+    "artifacts_loaded": False,
+    "pose_estimator_warm": False,
+    "warmed_up": False,
+    "attempts": 0,
+    "error": None,
+    "timings_ms": {},
+}
+# Seconds before retrying a failed warm-up, doubling per failure up to the maximum
+WARM_UP_RETRY_SECONDS = float(os.environ.get("WARM_UP_RETRY_SECONDS", "1"))
+WARM_UP_RETRY_MAX_SECONDS = float(os.environ.get("WARM_UP_RETRY_MAX_SECONDS", "60"))
+
+
+def warm_up() -> Dict[str, Any]:
+    """
+    Load the artifacts, build a pose estimator and push one synthetic clip through scoring,
+    the pose model and the cheat detector so the first real upload pays no setup cost
+    """
+    timings = WARM_STATE["timings_ms"]
+    WARM_STATE["attempts"] += 1
+    try:
+        start = time.perf_counter()
+        artifacts = ARTIFACTS.current
+        timings["artifacts"] = (time.perf_counter() - start) * 1000
+        WARM_STATE["artifacts_loaded"] = True
+
+        if POSE_POOL is not None:
+            start = time.perf_counter()
+            warm_up_estimators()
+            timings["pose_estimator"] = (time.perf_counter() - start) * 1000
+        WARM_STATE["pose_estimator_warm"] = True
+
+        start = time.perf_counter()
+        clip = np.full((TARGET_LEN, 33, 3), 0.5, dtype=np.float32)
+        score_landmarks(clip, {"frame_count": TARGET_LEN, "duration": TARGET_LEN / 30.0, "sample_fps": 30.0})
+        timings["scoring"] = (time.perf_counter() - start) * 1000
+        WARM_STATE["pose_model"] = artifacts.pose_model is not None
+        WARM_STATE["cheat_detector"] = artifacts.cheat_detector is not None
+        WARM_STATE["warmed_up"] = True
+        WARM_STATE["error"] = None
+    except Exception as exc:
+        WARM_STATE["error"] = str(exc)
+    return WARM_STATE
+
+
+def warm_up_until_ready(stop: Optional[threading.Event] = None) -> Dict[str, Any]:
+    """Repeat warm_up() with exponential backoff until it succeeds or `stop` is set"""
+    stop = stop or threading.Event()
+    delay = WARM_UP_RETRY_SECONDS
+    while not warm_up()["warmed_up"]:
+        if stop.wait(delay):
+            break
+        delay = min(delay * 2, WARM_UP_RETRY_MAX_SECONDS)
+    return WARM_STATE
+
+
+def _analyze_performance(landmarks_array: np.ndarray, frame_count: int, duration: float,
+                         features: Optional[pose_features.PoseFeatures] = None) -> Dict[str, Any]:
     """Enhanced performance analysis based on pose landmarks"""
+    # Joint angles and derivatives are computed once per clip and shared by the scorers
+    if features is None:
+        fps = frame_count / duration if duration > 0 else 0.0
+        features = pose_features.compute_features(landmarks_array, fps)
     
     # Basic pose analysis
-    form_score = _analyze_form(landmarks_array)
-    consistency_score = _analyze_consistency(landmarks_array)
-    power_score = _analyze_power(landmarks_array)
-    technique_score = _analyze_technique(landmarks_array)
+    form_score = _analyze_form(features)
+    consistency_score = _analyze_consistency(features)
+    power_score = _analyze_power(features)
+    technique_score = _analyze_technique(features)
     
     # Overall rating
     overall_score = (form_score + consistency_score + power_score + technique_score) / 4
@@ -273,106 +627,101 @@ def _analyze_performance(landmarks_array: np.ndarray, frame_count: int, duration
         "power_score": float(power_score),
         "technique_score": float(technique_score),
         "overall_rating": overall_rating,
-        "recommendations": recommendations
+        "recommendations": recommendations,
+        "joint_metrics": pose_features.summarize(features)
     }
 
 
-def _analyze_form(landmarks_array: np.ndarray) -> float:
+def _analyze_form(features: pose_features.PoseFeatures) -> float:
     """Analyze body form and posture"""
-    if landmarks_array.shape[0] == 0:
+    if features.landmarks.shape[0] == 0:
         return 0.0
     
-    # Calculate average joint angles and posture
+    # Shoulder alignment on every frame where both shoulders were detected
     # This is a simplified analysis - in reality, you'd calculate actual joint angles
-    form_scores = []
-    
-    for frame in landmarks_array:
-        if np.all(frame == 0):  # Skip empty frames
-            continue
-            
-        # Analyze shoulder alignment
-        left_shoulder = frame[11]  # Left shoulder
-        right_shoulder = frame[12]  # Right shoulder
-        
-        if np.all(left_shoulder != 0) and np.all(right_shoulder != 0):
-            shoulder_alignment = 1.0 - abs(left_shoulder[1] - right_shoulder[1]) / 100.0
-            form_scores.append(max(0, min(1, shoulder_alignment)))
-    
-    return np.mean(form_scores) * 100 if form_scores else 50.0
+    left_shoulder = features.landmarks[:, pose_features.LEFT_SHOULDER]
+    right_shoulder = features.landmarks[:, pose_features.RIGHT_SHOULDER]
+    detected = features.detected[:, pose_features.LEFT_SHOULDER] & features.detected[:, pose_features.RIGHT_SHOULDER]
+    if not detected.any():
+        return 50.0
+
+    shoulder_alignment = 1.0 - np.abs(left_shoulder[detected, 1] - right_shoulder[detected, 1]) / 100.0
+    return np.mean(np.clip(shoulder_alignment, 0, 1)) * 100
 
 
-def _analyze_consistency(landmarks_array: np.ndarray) -> float:
+def _analyze_consistency(features: pose_features.PoseFeatures) -> float:
     """Analyze movement consistency"""
-    if landmarks_array.shape[0] < 2:
+    if features.landmarks.shape[0] < 2:
         return 50.0
     
     # Calculate variance in key points over time
-    key_points = [11, 12, 23, 24]  # Shoulders and hips
+    key_points = [pose_features.LEFT_SHOULDER, pose_features.RIGHT_SHOULDER,
+                  pose_features.LEFT_HIP, pose_features.RIGHT_HIP]
     variances = []
     
     for point_idx in key_points:
-        if point_idx < landmarks_array.shape[1]:
-            point_data = landmarks_array[:, point_idx, :2]  # x, y coordinates
-            valid_frames = point_data[~np.all(point_data == 0, axis=1)]
-            
-            if len(valid_frames) > 1:
-                variance = np.var(valid_frames, axis=0).mean()
-                consistency = max(0, 1 - variance / 1000)  # Normalize variance
-                variances.append(consistency)
+        valid_frames = features.landmarks[features.detected[:, point_idx], point_idx, :2]  # x, y coordinates
+        if len(valid_frames) > 1:
+            variance = np.var(valid_frames, axis=0).mean()
+            consistency = max(0, 1 - variance / 1000)  # Normalize variance
+            variances.append(consistency)
     
     return np.mean(variances) * 100 if variances else 50.0
 
 
-def _analyze_power(landmarks_array: np.ndarray) -> float:
+# Centre-of-mass speed (landmark units per second) per power point. Matches the old
+# per-frame scale of 10 points per unit at 30 fps, now independent of the sample rate.
+POWER_SPEED_SCALE = 3.0
+
+
+def _analyze_power(features: pose_features.PoseFeatures) -> float:
     """Analyze power and explosiveness"""
-    if landmarks_array.shape[0] < 2:
+    if features.com.shape[0] < 2:
         return 50.0
-    
-    # Calculate movement velocity and acceleration
-    velocities = []
-    
-    for i in range(1, landmarks_array.shape[0]):
-        prev_frame = landmarks_array[i-1]
-        curr_frame = landmarks_array[i]
-        
-        # Calculate center of mass movement
-        prev_com = np.mean(prev_frame[~np.all(prev_frame == 0, axis=1)], axis=0)
-        curr_com = np.mean(curr_frame[~np.all(curr_frame == 0, axis=1)], axis=0)
-        
-        if not (np.all(prev_com == 0) or np.all(curr_com == 0)):
-            velocity = np.linalg.norm(curr_com - prev_com)
-            velocities.append(velocity)
-    
-    if velocities:
-        avg_velocity = np.mean(velocities)
-        power_score = min(100, max(0, avg_velocity * 10))  # Scale to 0-100
-        return power_score
-    
-    return 50.0
 
+    # Movement of the center of mass, only between consecutive frames that both have detections
+    valid = features.frame_valid[:-1] & features.frame_valid[1:]
+    if not valid.any():
+        return 50.0
 
-def _analyze_technique(landmarks_array: np.ndarray) -> float:
-    """Analyze technical execution"""
-    if landmarks_array.shape[0] == 0:
+    displacements = np.linalg.norm(features.com[1:][valid] - features.com[:-1][valid], axis=1)
+    # Per second at the rate the frames were sampled, so a 60 fps clip is not scored half as fast
+    avg_speed = np.mean(displacements) * features.fps
+    power_score = min(100, max(0, avg_speed / POWER_SPEED_SCALE))  # Scale to 0-100
+    return power_score
+
+
+# Angular acceleration (deg/s^2) at which movement smoothness scores one half
+SMOOTHNESS_SCALE = 5000.0
+
+
+def _analyze_technique(features: pose_features.PoseFeatures) -> float:
+    """Analyze technical execution from joint range-of-motion symmetry and smoothness"""
+    if not features.frame_valid.any():
         return 50.0
-    
-    # Analyze joint angles and movement patterns
-    technique_scores = []
-    
-    for frame in landmarks_array:
-        if np.all(frame == 0):
+
+    # Left and right joints should move through a similar range over the clip
+    measured = ~np.isnan(features.angles)
+    highest = np.where(measured, features.angles, -np.inf).max(axis=0)
+    lowest = np.where(measured, features.angles, np.inf).min(axis=0)
+    ranges = np.where(measured.any(axis=0), highest - lowest, np.nan)
+    symmetry = []
+    for left, right in pose_features.JOINT_PAIRS:
+        # A joint that was never measured on one side says nothing about symmetry
+        if np.isnan(ranges[left]) or np.isnan(ranges[right]):
             continue
-            
-        # Check for proper joint alignment
-        # This is simplified - real analysis would calculate actual joint angles
-        valid_points = frame[~np.all(frame == 0, axis=1)]
-        
-        if len(valid_points) > 5:  # Minimum points for analysis
-            # Calculate some basic technique metrics
-            technique_score = 60.0 + np.random.normal(0, 10)  # Placeholder
-            technique_scores.append(max(0, min(100, technique_score)))
-    
-    return np.mean(technique_scores) if technique_scores else 50.0
+        widest = max(ranges[left], ranges[right])
+        symmetry.append(1.0 - abs(ranges[left] - ranges[right]) / widest if widest > 0 else 1.0)
+
+    # Controlled movement has low angular acceleration (jerky tracking or flailing is penalised)
+    acceleration = np.abs(features.angular_acceleration)
+    acceleration = acceleration[~np.isnan(acceleration)]
+    smoothness = 1.0 / (1.0 + acceleration.mean() / SMOOTHNESS_SCALE) if acceleration.size else None
+
+    parts = [np.mean(symmetry)] if symmetry else []
+    if smoothness is not None:
+        parts.append(smoothness)
+    return float(np.mean(parts) * 100) if parts else 50.0
 
 
 def _get_overall_rating(score: float) -> str:
@@ -0,0 +1,151 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+# Pose landmarks of every analysed upload, so scoring changes can be replayed without decoding
+# video again. Each clip is a float16 (T, 33, 4) .npy of x, y, z, visibility (memory-mapped on
+# read) plus a JSON sidecar with its video_info, sport and when it was stored.
+# Set LANDMARK_STORE_DIR to an empty string to disable; the default is under backend/data.
+LANDMARK_STORE_DIR = os.environ.get(
+    "LANDMARK_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "landmarks"),
+)
+# Retention: clips older than this many days are deleted, then the oldest until the store
+# fits in LANDMARK_STORE_MAX_BYTES (0 disables either limit)
+LANDMARK_STORE_MAX_AGE_DAYS = float(os.environ.get("LANDMARK_STORE_MAX_AGE_DAYS", "90"))
+LANDMARK_STORE_MAX_BYTES = int(os.environ.get("LANDMARK_STORE_MAX_BYTES", str(2 * 1024 ** 3)))
+# Seconds between retention passes, run by whichever save comes due. Workers sharing the
+# directory each prune on their own schedule, so the store can overshoot by what is saved
+# in between.
+LANDMARK_STORE_PRUNE_SECONDS = float(os.environ.get("LANDMARK_STORE_PRUNE_SECONDS", "300"))
+FORMAT_VERSION = 1
+
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{16,128}$")
+
+
+class LandmarkStore:
+    """Content-addressed on-disk store of landmark tensors keyed by video digest"""
+
+    def __init__(self, root: Optional[str] = LANDMARK_STORE_DIR,
+                 max_age_days: float = LANDMARK_STORE_MAX_AGE_DAYS,
+                 max_bytes: int = LANDMARK_STORE_MAX_BYTES,
+                 prune_seconds: float = LANDMARK_STORE_PRUNE_SECONDS):
+        self.root = root or None
+        self.max_age = max_age_days * 24 * 3600
+        self.max_bytes = max_bytes
+        self.prune_seconds = prune_seconds
+        self._last_prune = 0.0
+        self._prune_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.root is not None
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        if not _KEY_PATTERN.match(key):
+            raise ValueError(f"invalid landmark key: {key!r}")
+        directory = os.path.join(self.root, key[:2])
+        return os.path.join(directory, f"{key}.npy"), os.path.join(directory, f"{key}.json")
+
+    def save(self, key: str, landmarks: np.ndarray, visibility: np.ndarray,
+             video_info: Dict[str, Any], sport: Optional[str] = None) -> None:
+        """Store a clip's landmarks; files are written to temp names then renamed into place"""
+        if not self.enabled:
+            return
+        array_path, meta_path = self._paths(key)
+        directory = os.path.dirname(array_path)
+        os.makedirs(directory, exist_ok=True)
+        packed = np.concatenate([landmarks, visibility[..., None]], axis=2).astype(np.float16)
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "shape": list(packed.shape),
+            "sport": sport,
+            "video_info": video_info,
+            "stored_at": time.time(),
+        }
+        fd, tmp_array = tempfile.mkstemp(dir=directory, suffix=".npy.tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, packed)
+        fd, tmp_meta = tempfile.mkstemp(dir=directory, suffix=".json.tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_array, array_path)
+        os.replace(tmp_meta, meta_path)
+        self._maybe_prune()
+
+    def load(self, key: str) -> Optional[Tuple[np.ndarray, np.ndarray, Dict[str, Any]]]:
+        """(landmarks (T, 33, 3), visibility (T, 33), metadata) as float32, or None if unknown"""
+        if not self.enabled or not _KEY_PATTERN.match(key):
+            return None
+        array_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            packed = np.load(array_path, mmap_mode="r")
+        except FileNotFoundError:
+            return None
+        return (
+            np.asarray(packed[..., :3], dtype=np.float32),
+            np.asarray(packed[..., 3], dtype=np.float32),
+            meta,
+        )
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Delete clips past the age limit, then the oldest until under the size limit; returns how many"""
+        if not self.enabled:
+            return 0
+        now = time.time() if now is None else now
+        clips = []
+        for key in self.keys():
+            array_path, meta_path = self._paths(key)
+            try:
+                stat = os.stat(array_path)
+                clips.append((stat.st_mtime, stat.st_size + os.path.getsize(meta_path), key))
+            except FileNotFoundError:
+                continue
+        clips.sort()
+        total = sum(size for _, size, _ in clips)
+        removed = 0
+        for stored_at, size, key in clips:
+            expired = self.max_age > 0 and now - stored_at > self.max_age
+            oversized = self.max_bytes > 0 and total > self.max_bytes
+            if not (expired or oversized):
+                break
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            total -= size
+            removed += 1
+        return removed
+
+    def _maybe_prune(self) -> None:
+        if self.max_age <= 0 and self.max_bytes <= 0:
+            return
+        now = time.time()
+        with self._prune_lock:
+            if now - self._last_prune < self.prune_seconds:
+                return
+            self._last_prune = now
+        self.prune(now)
+
+    def keys(self) -> Iterator[str]:
+        if not self.enabled or not os.path.isdir(self.root):
+            return
+        for shard in sorted(os.listdir(self.root)):
+            directory = os.path.join(self.root, shard)
+            if not os.path.isdir(directory):
+                continue
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(".json") and _KEY_PATTERN.match(name[:-5]):
+                    yield name[:-5]
+
+
+LANDMARK_STORE = LandmarkStore()
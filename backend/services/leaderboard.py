@@ -0,0 +1,294 @@
+import os
+import random
+import threading
+import time
+from itertools import product
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+# Support absolute (run from project root) and relative (run from backend/) imports
+try:
+    from backend.database.models import UNSPECIFIED_SPORT, changed_athlete_profiles, changed_leaderboard_entries
+except Exception:
+    from database.models import UNSPECIFIED_SPORT, changed_athlete_profiles, changed_leaderboard_entries
+
+# Ranked boards of each athlete's best clean score per sport. Every (sport, region, age band)
+# partition, and its "all" roll-ups, is an indexable skip list, so recording a score, finding
+# an athlete's rank and reading a page are O(log n) instead of a sort per request. Scores are
+# persisted in the leaderboard_entries table; each process rebuilds its boards from there and
+# picks up other workers' writes every LEADERBOARD_SYNC_INTERVAL seconds.
+LEADERBOARD_SYNC_INTERVAL = float(os.environ.get("LEADERBOARD_SYNC_INTERVAL", "5"))
+# Upper age limits of the junior bands ("u12", "u14", ...); older athletes are "senior"
+LEADERBOARD_AGE_BANDS = tuple(
+    int(limit) for limit in os.environ.get("LEADERBOARD_AGE_BANDS", "12,14,16,18,20").split(",") if limit
+)
+# Rows written by another worker may commit a little after their updated_at timestamp
+_SYNC_OVERLAP_S = 5.0
+
+ALL = "all"
+UNKNOWN = "unknown"
+
+# Sort key of a board entry: best score first, then whoever got there first
+EntryKey = Tuple[float, float, str, str]  # (-score, achieved_at, athlete_id, sport)
+Partition = Tuple[str, str, str]  # (sport, region, age_band)
+
+_MAX_LEVEL = 32
+
+
+class _End:
+    """Sentinel that sorts after every key"""
+
+    def __lt__(self, other: Any) -> bool:
+        return False
+
+    def __le__(self, other: Any) -> bool:
+        return False
+
+    def __gt__(self, other: Any) -> bool:
+        return True
+
+    def __ge__(self, other: Any) -> bool:
+        return True
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key: Any, levels: int):
+        self.key = key
+        self.next: List["_Node"] = [None] * levels  # type: ignore[list-item]
+        # Number of level-0 steps each forward link skips
+        self.width: List[int] = [1] * levels
+
+
+_NIL = _Node(_End(), 0)
+
+
+class IndexableSkipList:
+    """Sorted set of unique keys with O(log n) insert, remove, rank and positional access"""
+
+    def __init__(self):
+        self.head = _Node(None, _MAX_LEVEL)
+        self.head.next = [_NIL] * _MAX_LEVEL
+        self.size = 0
+        # Levels in use; searches start here rather than at _MAX_LEVEL
+        self.levels = 1
+
+    def __len__(self) -> int:
+        return self.size
+
+    def insert(self, key: Any) -> None:
+        levels = 1
+        while levels < _MAX_LEVEL and random.random() < 0.5:
+            levels += 1
+        for level in range(self.levels, levels):
+            self.head.width[level] = self.size + 1
+        self.levels = max(self.levels, levels)
+        chain: List[_Node] = [self.head] * self.levels
+        steps_at_level = [0] * self.levels
+        node = self.head
+        for level in reversed(range(self.levels)):
+            while node.next[level].key <= key:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+        new = _Node(key, levels)
+        steps = 0
+        for level in range(levels):
+            previous = chain[level]
+            new.next[level] = previous.next[level]
+            previous.next[level] = new
+            new.width[level] = previous.width[level] - steps
+            previous.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(levels, self.levels):
+            chain[level].width[level] += 1
+        self.size += 1
+
+    def remove(self, key: Any) -> None:
+        chain: List[_Node] = [self.head] * self.levels
+        node = self.head
+        for level in reversed(range(self.levels)):
+            while node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+        target = chain[0].next[0]
+        if target is _NIL or target.key != key:
+            raise KeyError(key)
+        for level in range(len(target.next)):
+            previous = chain[level]
+            previous.width[level] += target.width[level] - 1
+            previous.next[level] = target.next[level]
+        for level in range(len(target.next), self.levels):
+            chain[level].width[level] -= 1
+        self.size -= 1
+
+    def rank(self, key: Any) -> Optional[int]:
+        """0-based position of `key`, or None when it is not in the list"""
+        node = self.head
+        position = 0
+        for level in reversed(range(self.levels)):
+            while node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+        candidate = node.next[0]
+        return position if candidate is not _NIL and candidate.key == key else None
+
+    def iter_from(self, index: int) -> Iterator[Any]:
+        """Keys in order starting at 0-based position `index`"""
+        if index >= self.size:
+            return
+        node = self.head
+        remaining = max(0, index) + 1
+        for level in reversed(range(self.levels)):
+            while node.width[level] <= remaining and node.next[level] is not _NIL:
+                remaining -= node.width[level]
+                node = node.next[level]
+        while node is not _NIL:
+            yield node.key
+            node = node.next[0]
+
+    def __getitem__(self, index: int) -> Any:
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        return next(self.iter_from(index))
+
+
+def age_band(birth_year: Optional[int], year: Optional[int] = None) -> str:
+    if not birth_year:
+        return UNKNOWN
+    age = (year or time.gmtime().tm_year) - int(birth_year)
+    for limit in LEADERBOARD_AGE_BANDS:
+        if age < limit:
+            return f"u{limit}"
+    return "senior"
+
+
+class Leaderboard:
+    """In-memory boards for every partition, kept in step with leaderboard_entries"""
+
+    def __init__(self, sync_interval: float = LEADERBOARD_SYNC_INTERVAL):
+        self.sync_interval = sync_interval
+        self._boards: Dict[Partition, IndexableSkipList] = {}
+        # (athlete_id, sport) -> (key, region, age band) of the athlete's current best
+        self._entries: Dict[Tuple[str, str], Tuple[EntryKey, str, str]] = {}
+        self._sports: Dict[str, Set[str]] = {}
+        # athlete_id -> (region, age band), from the athletes table
+        self._profiles: Dict[str, Tuple[str, str]] = {}
+        self._lock = threading.RLock()
+        self._watermark = 0.0
+        self._synced_at: Optional[float] = None
+
+    @staticmethod
+    def _partitions(sport: str, region: str, band: str) -> Iterator[Partition]:
+        return product((sport, ALL), (region, ALL), (band, ALL))
+
+    def _place(self, athlete_id: str, sport: str, key: EntryKey, region: str, band: str) -> None:
+        previous = self._entries.get((athlete_id, sport))
+        if previous is not None:
+            old_key, old_region, old_band = previous
+            for partition in self._partitions(sport, old_region, old_band):
+                self._boards[partition].remove(old_key)
+        for partition in self._partitions(sport, region, band):
+            board = self._boards.get(partition)
+            if board is None:
+                board = self._boards[partition] = IndexableSkipList()
+            board.insert(key)
+        self._entries[(athlete_id, sport)] = (key, region, band)
+        self._sports.setdefault(athlete_id, set()).add(sport)
+
+    def record(self, athlete_id: str, sport: Optional[str], score: float,
+               achieved_at: Optional[float] = None) -> bool:
+        """Offer a score; returns True when it became the athlete's best for the sport"""
+        sport = sport or UNSPECIFIED_SPORT
+        key = (-float(score), achieved_at or time.time(), athlete_id, sport)
+        with self._lock:
+            current = self._entries.get((athlete_id, sport))
+            if current is not None and current[0] <= key:
+                return False
+            region, band = self._profiles.get(athlete_id, (UNKNOWN, UNKNOWN))
+            self._place(athlete_id, sport, key, region, band)
+            return True
+
+    def set_profile(self, athlete_id: str, region: Optional[str], birth_year: Optional[int]) -> None:
+        """Move the athlete's entries when their region or age band changes"""
+        self._set_profile(athlete_id, (region or UNKNOWN, age_band(birth_year)))
+
+    def update_profile(self, athlete_id: str, region: Optional[str] = None,
+                       birth_year: Optional[int] = None) -> None:
+        """Like set_profile, but a missing region or birth year keeps the athlete's current one"""
+        with self._lock:
+            current_region, current_band = self._profiles.get(athlete_id, (UNKNOWN, UNKNOWN))
+            self._set_profile(athlete_id, (region or current_region,
+                                           age_band(birth_year) if birth_year else current_band))
+
+    def _set_profile(self, athlete_id: str, profile: Tuple[str, str]) -> None:
+        with self._lock:
+            if self._profiles.get(athlete_id, (UNKNOWN, UNKNOWN)) == profile:
+                self._profiles[athlete_id] = profile
+                return
+            self._profiles[athlete_id] = profile
+            for sport in self._sports.get(athlete_id, ()):
+                key = self._entries[(athlete_id, sport)][0]
+                self._place(athlete_id, sport, key, *profile)
+
+    def sync(self, db: Any, force: bool = False) -> None:
+        """Apply rows changed since the last sync (all rows the first time)"""
+        now = time.time()
+        if not force and self._synced_at is not None and now - self._synced_at < self.sync_interval:
+            return
+        since = self._watermark - _SYNC_OVERLAP_S if self._synced_at is not None else float("-inf")
+        profiles = changed_athlete_profiles(db, since)
+        entries = changed_leaderboard_entries(db, since)
+        with self._lock:
+            for row in profiles:
+                self.set_profile(row["id"], row["region"], row["birth_year"])
+            for row in entries:
+                self.record(row["athlete_id"], row["sport"], row["score"], row["achieved_at"])
+            latest = [row["updated_at"] for row in profiles] + [row["updated_at"] for row in entries]
+            self._watermark = max([self._watermark] + latest)
+            self._synced_at = now
+
+    def _board(self, sport: Optional[str], region: Optional[str], band: Optional[str]) -> Optional[IndexableSkipList]:
+        return self._boards.get((sport or ALL, region or ALL, band or ALL))
+
+    @staticmethod
+    def _item(rank: int, key: EntryKey) -> Dict[str, Any]:
+        return {"rank": rank + 1, "athlete_id": key[2], "sport": key[3], "score": -key[0], "achieved_at": key[1]}
+
+    def top(self, sport: Optional[str] = None, region: Optional[str] = None, band: Optional[str] = None,
+            offset: int = 0, limit: int = 20) -> Tuple[int, List[Dict[str, Any]]]:
+        """(entries in the partition, one page of ranked entries)"""
+        with self._lock:
+            board = self._board(sport, region, band)
+            if board is None:
+                return 0, []
+            page = []
+            for rank, key in enumerate(board.iter_from(offset), offset):
+                if len(page) >= limit:
+                    break
+                page.append(self._item(rank, key))
+            return len(board), page
+
+    def rank(self, athlete_id: str, sport: Optional[str], region: Optional[str] = None,
+             band: Optional[str] = None) -> Optional[Tuple[int, int]]:
+        """(1-based rank, entries in the partition) of the athlete's best, or None if unranked there"""
+        with self._lock:
+            entry = self._entries.get((athlete_id, sport or UNSPECIFIED_SPORT))
+            board = self._board(sport, region, band)
+            if entry is None or board is None:
+                return None
+            position = board.rank(entry[0])
+            return (position + 1, len(board)) if position is not None else None
+
+    def around(self, rank: int, radius: int = 5, sport: Optional[str] = None, region: Optional[str] = None,
+               band: Optional[str] = None) -> Tuple[int, List[Dict[str, Any]]]:
+        """Entries within `radius` places of the 1-based `rank`"""
+        start = max(0, rank - 1 - radius)
+        return self.top(sport, region, band, offset=start, limit=rank - 1 + radius + 1 - start)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"partitions": len(self._boards), "entries": len(self._entries)}
+
+
+LEADERBOARD = Leaderboard()
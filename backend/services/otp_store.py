@@ -0,0 +1,248 @@
+import abc
+import heapq
+import hmac
+import os
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Support absolute (run from project root) and relative (run from backend/) imports
+try:
+    from backend.database.connection import POOL, ConnectionPool
+except Exception:
+    from database.connection import POOL, ConnectionPool
+
+# One-time passwords for phone login. "memory" keeps them in this process; "sqlite" keeps
+# them in the application database so send and verify may land on different workers.
+# Expired codes are dropped a few at a time on every call and by a background sweep, and
+# the store never holds more than OTP_STORE_CAPACITY codes (the oldest go first).
+OTP_STORE_BACKEND = os.environ.get("OTP_STORE_BACKEND", "memory")
+OTP_TTL_SECONDS = float(os.environ.get("OTP_TTL_SECONDS", "300"))
+OTP_MAX_ATTEMPTS = int(os.environ.get("OTP_MAX_ATTEMPTS", "3"))
+OTP_STORE_CAPACITY = int(os.environ.get("OTP_STORE_CAPACITY", "100000"))
+# Expired codes removed per store call, so cleanup cost is spread over requests
+OTP_CLEANUP_BATCH = int(os.environ.get("OTP_CLEANUP_BATCH", "32"))
+# Seconds between background sweeps of expired codes; 0 disables the sweeper
+OTP_SWEEP_INTERVAL = float(os.environ.get("OTP_SWEEP_INTERVAL", "60"))
+
+# Outcomes of OTPStore.verify
+VERIFIED = "verified"
+MISSING = "missing"
+EXPIRED = "expired"
+LOCKED = "locked"
+INVALID = "invalid"
+
+
+class VerifyResult(NamedTuple):
+    status: str
+    attempts_left: int = 0
+
+
+def _check(code: str, expires_at: float, attempts: int, otp: str, now: float,
+           max_attempts: int) -> Tuple[VerifyResult, bool]:
+    """Outcome of one verify attempt against a stored code, and whether the code is spent"""
+    if now > expires_at:
+        return VerifyResult(EXPIRED), True
+    if attempts >= max_attempts:
+        return VerifyResult(LOCKED), True
+    if hmac.compare_digest(code.encode(), otp.encode()):
+        return VerifyResult(VERIFIED), True
+    return VerifyResult(INVALID, max_attempts - attempts - 1), False
+
+
+class OTPStore(abc.ABC):
+    """Interface shared by the backends; verify is atomic per phone number"""
+
+    def __init__(self, ttl: float = OTP_TTL_SECONDS, max_attempts: int = OTP_MAX_ATTEMPTS,
+                 capacity: int = OTP_STORE_CAPACITY, sweep_interval: float = OTP_SWEEP_INTERVAL):
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+        self.capacity = max(1, capacity)
+        self.sweep_interval = sweep_interval
+        self._stop = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+        self._sweeper_lock = threading.Lock()
+
+    @abc.abstractmethod
+    def put(self, phone_number: str, code: str, ttl: Optional[float] = None) -> None:
+        """Store a new code for the number, replacing any earlier one and resetting attempts"""
+
+    @abc.abstractmethod
+    def verify(self, phone_number: str, otp: str) -> VerifyResult:
+        """Check a code; counts failed attempts and removes the code once it is used up"""
+
+    @abc.abstractmethod
+    def cleanup(self, limit: Optional[int] = None) -> int:
+        """Remove expired codes (at most `limit`); returns how many were removed"""
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """Number of codes currently stored"""
+
+    def start_sweeper(self) -> None:
+        with self._sweeper_lock:
+            if self._sweeper is not None or self.sweep_interval <= 0:
+                return
+            self._stop.clear()
+            self._sweeper = threading.Thread(target=self._sweep, name="otp-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def stop_sweeper(self) -> None:
+        self._stop.set()
+        with self._sweeper_lock:
+            self._sweeper = None
+
+    def _sweep(self) -> None:
+        while not self._stop.wait(self.sweep_interval):
+            try:
+                self.cleanup()
+            except Exception:
+                pass
+
+
+class MemoryOTPStore(OTPStore):
+    """Codes in a dict, with a min-heap of expiry times for cleanup in expiry order"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # phone -> (code, expires_at, attempts, generation)
+        self._codes: Dict[str, Tuple[str, float, int, int]] = {}
+        # (expires_at, phone, generation); entries for replaced codes are skipped when popped
+        self._expiry: List[Tuple[float, str, int]] = []
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _pop_oldest(self, now: Optional[float]) -> bool:
+        """Drop the heap's earliest live code, if it expired before `now` (always when None)"""
+        while self._expiry:
+            expires_at, phone, generation = self._expiry[0]
+            current = self._codes.get(phone)
+            if current is None or current[3] != generation:
+                heapq.heappop(self._expiry)
+                continue
+            if now is not None and expires_at >= now:
+                return False
+            heapq.heappop(self._expiry)
+            del self._codes[phone]
+            return True
+        return False
+
+    def _cleanup_locked(self, now: float, limit: Optional[int]) -> int:
+        removed = 0
+        while (limit is None or removed < limit) and self._pop_oldest(now):
+            removed += 1
+        # Resends leave stale heap entries behind; rebuild when they dominate
+        if len(self._expiry) > 2 * len(self._codes) + 1024:
+            self._expiry = [(entry[1], phone, entry[3]) for phone, entry in self._codes.items()]
+            heapq.heapify(self._expiry)
+        return removed
+
+    def put(self, phone_number: str, code: str, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._cleanup_locked(now, OTP_CLEANUP_BATCH)
+            if phone_number not in self._codes:
+                while len(self._codes) >= self.capacity and self._pop_oldest(None):
+                    pass
+            self._generation += 1
+            self._codes[phone_number] = (code, expires_at, 0, self._generation)
+            heapq.heappush(self._expiry, (expires_at, phone_number, self._generation))
+
+    def verify(self, phone_number: str, otp: str) -> VerifyResult:
+        now = time.time()
+        with self._lock:
+            entry = self._codes.get(phone_number)
+            if entry is None:
+                result = VerifyResult(MISSING)
+            else:
+                code, expires_at, attempts, generation = entry
+                result, spent = _check(code, expires_at, attempts, otp, now, self.max_attempts)
+                if spent:
+                    del self._codes[phone_number]
+                else:
+                    self._codes[phone_number] = (code, expires_at, attempts + 1, generation)
+            # After the lookup, so the caller's own expired code is reported as expired
+            self._cleanup_locked(now, OTP_CLEANUP_BATCH)
+            return result
+
+    def cleanup(self, limit: Optional[int] = None) -> int:
+        with self._lock:
+            return self._cleanup_locked(time.time(), limit)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+
+class SQLiteOTPStore(OTPStore):
+    """Codes in the otp_codes table; verify runs under the database write lock"""
+
+    def __init__(self, pool: ConnectionPool = POOL, **kwargs):
+        super().__init__(**kwargs)
+        self.pool = pool
+
+    @staticmethod
+    def _delete_expired(conn, now: float, limit: int) -> int:
+        return conn.execute(
+            "DELETE FROM otp_codes WHERE phone_number IN"
+            " (SELECT phone_number FROM otp_codes WHERE expires_at < ? ORDER BY expires_at LIMIT ?)",
+            (now, limit),
+        ).rowcount
+
+    def put(self, phone_number: str, code: str, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self.pool.connection(immediate=True) as conn:
+            self._delete_expired(conn, now, OTP_CLEANUP_BATCH)
+            # A resend replaces the number's row; only a new number can push the table over capacity
+            new = conn.execute(
+                "SELECT 1 FROM otp_codes WHERE phone_number = ?", (phone_number,)
+            ).fetchone() is None
+            if new:
+                excess = conn.execute("SELECT COUNT(*) FROM otp_codes").fetchone()[0] - self.capacity + 1
+                if excess > 0:
+                    conn.execute(
+                        "DELETE FROM otp_codes WHERE phone_number IN"
+                        " (SELECT phone_number FROM otp_codes ORDER BY expires_at LIMIT ?)",
+                        (excess,),
+                    )
+            conn.execute(
+                "INSERT OR REPLACE INTO otp_codes (phone_number, code, expires_at, attempts) VALUES (?, ?, ?, 0)",
+                (phone_number, code, expires_at),
+            )
+
+    def verify(self, phone_number: str, otp: str) -> VerifyResult:
+        now = time.time()
+        with self.pool.connection(immediate=True) as conn:
+            row = conn.execute(
+                "SELECT code, expires_at, attempts FROM otp_codes WHERE phone_number = ?", (phone_number,)
+            ).fetchone()
+            if row is None:
+                return VerifyResult(MISSING)
+            result, spent = _check(row["code"], row["expires_at"], row["attempts"], otp, now, self.max_attempts)
+            if spent:
+                conn.execute("DELETE FROM otp_codes WHERE phone_number = ?", (phone_number,))
+            else:
+                conn.execute("UPDATE otp_codes SET attempts = attempts + 1 WHERE phone_number = ?", (phone_number,))
+            return result
+
+    def cleanup(self, limit: Optional[int] = None) -> int:
+        with self.pool.connection(immediate=True) as conn:
+            if limit is None:
+                return conn.execute("DELETE FROM otp_codes WHERE expires_at < ?", (time.time(),)).rowcount
+            return self._delete_expired(conn, time.time(), limit)
+
+    def __len__(self) -> int:
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM otp_codes").fetchone()[0]
+
+
+def create_otp_store(backend: str = OTP_STORE_BACKEND) -> OTPStore:
+    if backend == "sqlite":
+        return SQLiteOTPStore()
+    if backend == "memory":
+        return MemoryOTPStore()
+    raise ValueError(f"Unknown OTP_STORE_BACKEND {backend!r}; expected 'memory' or 'sqlite'")
+
+
+OTP_STORE = create_otp_store()
@@ -0,0 +1,221 @@
+import math
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+# Support absolute (run from project root) and relative (run from backend/) imports
+try:
+    from backend.database.connection import POOL, ConnectionPool
+except Exception:
+    from database.connection import POOL, ConnectionPool
+
+# Token buckets for abusable routes and a global budget for uploads in flight. With
+# RATE_LIMIT_BACKEND=sqlite the buckets and the upload budget live in the application
+# database and are shared by every worker on the host; "memory" limits each process alone.
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "memory")
+# "<requests>/<seconds>": the bucket holds <requests> tokens and refills over <seconds>; "0/1" disables
+OTP_PHONE_LIMIT = os.environ.get("OTP_PHONE_LIMIT", "5/600")
+OTP_IP_LIMIT = os.environ.get("OTP_IP_LIMIT", "30/600")
+UPLOAD_IP_LIMIT = os.environ.get("UPLOAD_IP_LIMIT", "30/60")
+# Uploads being received or analysed at once, and the bytes they may hold between them
+UPLOAD_MAX_IN_FLIGHT = int(os.environ.get("UPLOAD_MAX_IN_FLIGHT", "16"))
+UPLOAD_MAX_BYTES_IN_FLIGHT = int(os.environ.get("UPLOAD_MAX_BYTES_IN_FLIGHT_MB", "1024")) * 1024 * 1024
+# Charged for uploads that do not send Content-Length
+UPLOAD_ASSUMED_BYTES = int(os.environ.get("UPLOAD_ASSUMED_MB", "64")) * 1024 * 1024
+# Shared tickets expire after this long, so a crashed worker cannot hold budget forever
+UPLOAD_TICKET_LEASE = float(os.environ.get("UPLOAD_TICKET_LEASE", "900"))
+# Keys (phones, IPs) tracked in memory across all limiters; least recently used go first
+RATE_LIMIT_MAX_KEYS = int(os.environ.get("RATE_LIMIT_MAX_KEYS", "100000"))
+# Honour the first X-Forwarded-For address; only enable behind a trusted proxy
+RATE_LIMIT_TRUST_PROXY = os.environ.get("RATE_LIMIT_TRUST_PROXY", "0") == "1"
+
+
+class RateLimited(Exception):
+    """Raised when a request must wait; `retry_after` is in seconds"""
+
+    def __init__(self, scope: str, retry_after: float):
+        super().__init__(f"{scope} rate limit exceeded; retry in {retry_after:.1f}s")
+        self.scope = scope
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+def parse_limit(limit: str) -> Tuple[float, float]:
+    """"5/600" -> (burst 5, refill rate 5/600 tokens per second)"""
+    count, _, seconds = limit.partition("/")
+    burst = float(count)
+    return burst, burst / float(seconds or 1)
+
+
+def _refill(tokens: float, updated_at: float, now: float, burst: float, rate: float) -> float:
+    return min(burst, tokens + max(0.0, now - updated_at) * rate)
+
+
+class MemoryBuckets:
+    """Per-key (tokens, updated_at, full_at), least recently used first"""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max(1, max_keys)
+        self._buckets: "OrderedDict[str, Tuple[float, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, burst: float, rate: float, cost: float, now: float) -> float:
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.pop(key, (burst, now, now))
+            tokens = _refill(tokens, updated_at, now, burst, rate)
+            wait = 0.0 if tokens >= cost else (cost - tokens) / rate
+            if not wait:
+                # A negative cost is a refund, which cannot overfill the bucket
+                tokens = min(burst, tokens - cost)
+            self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+            # Buckets that have refilled completely are the same as absent ones, so the
+            # least recently used are dropped once full (or when over the key limit)
+            while self._buckets:
+                oldest, (_, _, full_at) = next(iter(self._buckets.items()))
+                if len(self._buckets) <= self.max_keys and now < full_at:
+                    break
+                del self._buckets[oldest]
+            return wait
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SQLiteBuckets:
+    """Buckets in the rate_buckets table; each take is one write transaction"""
+
+    def __init__(self, pool: ConnectionPool = POOL):
+        self.pool = pool
+        self._takes = 0
+
+    def take(self, key: str, burst: float, rate: float, cost: float, now: float) -> float:
+        self._takes += 1
+        with self.pool.connection(immediate=True) as conn:
+            row = conn.execute("SELECT tokens, updated_at FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+            tokens = _refill(row["tokens"], row["updated_at"], now, burst, rate) if row else burst
+            wait = 0.0 if tokens >= cost else (cost - tokens) / rate
+            if not wait:
+                tokens = min(burst, tokens - cost)
+            conn.execute("INSERT OR REPLACE INTO rate_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                         (key, tokens, now))
+            # Drop refilled buckets of this limiter now and then
+            if self._takes % 256 == 0:
+                scope = key.partition(":")[0]
+                conn.execute("DELETE FROM rate_buckets WHERE key >= ? AND key < ? AND updated_at < ?",
+                             (f"{scope}:", f"{scope};", now - burst / rate))
+            return wait
+
+    def __len__(self) -> int:
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM rate_buckets").fetchone()[0]
+
+
+class RateLimiter:
+    """A token bucket per key, e.g. per phone number or client IP"""
+
+    def __init__(self, scope: str, limit: str, buckets):
+        self.scope = scope
+        self.burst, self.rate = parse_limit(limit)
+        self.buckets = buckets
+
+    def hit(self, key: str, cost: float = 1.0) -> None:
+        """Spend tokens for `key` or raise RateLimited"""
+        if self.rate <= 0:
+            return
+        wait = self.buckets.take(f"{self.scope}:{key}", self.burst, self.rate, cost, time.time())
+        if wait:
+            raise RateLimited(self.scope, wait)
+
+    def refund(self, key: str, cost: float = 1.0) -> None:
+        """Give back tokens spent on a request that was turned away for another reason"""
+        if self.rate <= 0:
+            return
+        self.buckets.take(f"{self.scope}:{key}", self.burst, self.rate, -cost, time.time())
+
+
+class UploadAdmission:
+    """
+    Caps uploads in flight and the bytes they declare. admit() returns a ticket to pass to
+    release() once the request is done; with a pool, tickets are rows shared by all workers.
+    """
+
+    def __init__(self, max_in_flight: int = UPLOAD_MAX_IN_FLIGHT, max_bytes: int = UPLOAD_MAX_BYTES_IN_FLIGHT,
+                 pool: Optional[ConnectionPool] = None, lease: float = UPLOAD_TICKET_LEASE,
+                 retry_after: float = 5.0):
+        self.max_in_flight = max_in_flight
+        self.max_bytes = max_bytes
+        self.pool = pool
+        self.lease = lease
+        self.retry_after = retry_after
+        self._tickets: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _fits(self, count: int, used: int, nbytes: int) -> bool:
+        # A single upload larger than the whole budget is still let through when nothing else runs
+        return count < self.max_in_flight and (count == 0 or used + nbytes <= self.max_bytes)
+
+    def admit(self, nbytes: int) -> str:
+        ticket = uuid.uuid4().hex
+        if self.pool is None:
+            with self._lock:
+                if not self._fits(len(self._tickets), sum(self._tickets.values()), nbytes):
+                    raise RateLimited("upload_admission", self.retry_after)
+                self._tickets[ticket] = nbytes
+            return ticket
+        now = time.time()
+        with self.pool.connection(immediate=True) as conn:
+            conn.execute("DELETE FROM upload_tickets WHERE expires_at < ?", (now,))
+            count, used = conn.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM upload_tickets").fetchone()
+            if not self._fits(count, used, nbytes):
+                raise RateLimited("upload_admission", self.retry_after)
+            conn.execute("INSERT INTO upload_tickets (id, bytes, expires_at) VALUES (?, ?, ?)",
+                         (ticket, nbytes, now + self.lease))
+        return ticket
+
+    def release(self, ticket: str) -> None:
+        if self.pool is None:
+            with self._lock:
+                self._tickets.pop(ticket, None)
+            return
+        with self.pool.connection() as conn:
+            conn.execute("DELETE FROM upload_tickets WHERE id = ?", (ticket,))
+
+    def stats(self) -> Dict[str, int]:
+        if self.pool is None:
+            with self._lock:
+                return {"in_flight": len(self._tickets), "bytes": sum(self._tickets.values())}
+        with self.pool.connection() as conn:
+            count, used = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM upload_tickets WHERE expires_at >= ?", (time.time(),)
+            ).fetchone()
+        return {"in_flight": count, "bytes": used}
+
+
+def client_ip(request) -> str:
+    if RATE_LIMIT_TRUST_PROXY:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _create_buckets(backend: str = RATE_LIMIT_BACKEND):
+    if backend == "sqlite":
+        return SQLiteBuckets()
+    if backend == "memory":
+        return MemoryBuckets()
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND {backend!r}; expected 'memory' or 'sqlite'")
+
+
+BUCKETS = _create_buckets()
+SHARED = RATE_LIMIT_BACKEND == "sqlite"
+OTP_PHONE_LIMITER = RateLimiter("otp_phone", OTP_PHONE_LIMIT, BUCKETS)
+OTP_IP_LIMITER = RateLimiter("otp_ip", OTP_IP_LIMIT, BUCKETS)
+UPLOAD_IP_LIMITER = RateLimiter("upload_ip", UPLOAD_IP_LIMIT, BUCKETS)
+UPLOAD_ADMISSION = UploadAdmission(pool=POOL if SHARED else None)
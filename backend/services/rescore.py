@@ -0,0 +1,63 @@
+"""
+Replay stored landmarks through the current scoring pipeline and model.
+
+    python -m backend.services.rescore --all --output rescored.jsonl
+    python -m backend.services.rescore <video_id> [<video_id> ...]
+
+Writes one JSON line per clip: the video id, its sport and the new result.
+"""
+import argparse
+import json
+import sys
+from typing import Iterable, Iterator, Dict, Any
+
+try:
+    from backend.services import inference
+    from backend.services.landmark_store import LANDMARK_STORE
+except Exception:
+    from services import inference
+    from services.landmark_store import LANDMARK_STORE
+
+
+def rescore_all(video_ids: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Re-score each stored clip; ids without stored landmarks are reported as missing"""
+    for video_id in video_ids:
+        stored = LANDMARK_STORE.load(video_id)
+        if stored is None:
+            yield {"video_id": video_id, "error": "not found"}
+            continue
+        landmarks, _visibility, meta = stored
+        yield {
+            "video_id": video_id,
+            "sport": meta.get("sport"),
+            "result": inference.score_landmarks(landmarks, meta.get("video_info", {})),
+        }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("video_ids", nargs="*", help="video ids (content digests) to re-score")
+    parser.add_argument("--all", action="store_true", help="re-score every clip in the landmark store")
+    parser.add_argument("--output", help="JSON lines file to write instead of stdout")
+    args = parser.parse_args(argv)
+
+    if not LANDMARK_STORE.enabled:
+        parser.error("the landmark store is disabled (LANDMARK_STORE_DIR is empty)")
+    if not args.all and not args.video_ids:
+        parser.error("give video ids or --all")
+
+    video_ids = LANDMARK_STORE.keys() if args.all else args.video_ids
+    out = open(args.output, "w") if args.output else sys.stdout
+    missing = 0
+    try:
+        for row in rescore_all(video_ids):
+            missing += "error" in row
+            out.write(json.dumps(row) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Analysis results keyed by the uploaded video's content hash, so a re-uploaded clip is
+# answered without decoding it again. Memory tier is an LRU bounded by entry count, bytes
+# and age; setting RESULT_CACHE_DB adds a SQLite tier shared by workers and restarts.
+RESULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", "1024"))
+# Encoded size the memory tier may hold in total (0 for no limit)
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESULT_CACHE_TTL = float(os.environ.get("RESULT_CACHE_TTL", str(7 * 24 * 3600)))
+RESULT_CACHE_DB = os.environ.get("RESULT_CACHE_DB")
+
+
+def cache_key(video_digest: str, pipeline_version: str, sport: Optional[str] = None) -> str:
+    """Key for a clip analysed by a given pipeline/model version with a given sport setting"""
+    context = hashlib.blake2b(f"{pipeline_version}|{sport or ''}".encode(), digest_size=8).hexdigest()
+    return f"{video_digest}:{context}"
+
+
+class ResultCache:
+    """
+    Two-tier (memory LRU + optional SQLite) cache of process_video results. Both tiers hold
+    the JSON encoding, so every get returns a fresh dict the caller is free to modify.
+    """
+
+    def __init__(self, max_entries: int = RESULT_CACHE_SIZE, ttl: float = RESULT_CACHE_TTL,
+                 db_path: Optional[str] = RESULT_CACHE_DB, max_bytes: int = RESULT_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, encoded = entry
+                if now - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return json.loads(encoded)
+                self._forget(key)
+            stored = self._load(key, now)
+            if stored is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            encoded, stored_at = stored
+            self._remember(key, encoded, stored_at)
+            return json.loads(encoded)
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        encoded = json.dumps(value)
+        with self._lock:
+            self._remember(key, encoded, now)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, value, stored_at) VALUES (?, ?, ?)",
+                    (key, encoded, now),
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+            }
+
+    def _remember(self, key: str, encoded: str, stored_at: float) -> None:
+        self._forget(key)
+        if self.max_entries <= 0 or 0 < self.max_bytes < len(encoded):
+            return
+        self._entries[key] = (stored_at, encoded)
+        self._bytes += len(encoded)
+        while len(self._entries) > self.max_entries or 0 < self.max_bytes < self._bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def _forget(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+    def _load(self, key: str, now: float) -> Optional[Tuple[str, float]]:
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT value, stored_at FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if now - row[1] > self.ttl:
+            self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+            return None
+        return row[0], row[1]
+
+
+RESULT_CACHE = ResultCache()
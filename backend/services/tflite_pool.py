@@ -0,0 +1,118 @@
+import os
+import queue
+import threading
+from typing import Any, Dict, Sequence, Tuple
+
+import numpy as np
+
+# Interpreters are allocated once at fixed input shapes and lent to one worker at a time, so a
+# warm request is set_tensor + invoke with no arena reallocation and no shared mutable state.
+TFLITE_POOL_SIZE = int(os.environ.get("TFLITE_POOL_SIZE", str(os.cpu_count() or 1)))
+# Threads per interpreter; with several workers running, 1-2 usually beats more
+TFLITE_NUM_THREADS = int(os.environ.get("TFLITE_NUM_THREADS", "1"))
+# XNNPACK is TFLite's default CPU delegate; set to 0 to run the plain builtin kernels
+TFLITE_USE_XNNPACK = os.environ.get("TFLITE_USE_XNNPACK", "1") != "0"
+# Batch sizes to allocate interpreters for; match the largest to POSE_BATCH_MAX_SIZE
+TFLITE_BATCH_SIZES = tuple(
+    int(size) for size in os.environ.get("TFLITE_BATCH_SIZES", "1,8").split(",") if size.strip()
+)
+
+
+class _Slot:
+    """One allocated interpreter and the tensor indices it was allocated with"""
+
+    def __init__(self, interpreter: Any):
+        self.interpreter = interpreter
+        self.input_index = interpreter.get_input_details()[0]["index"]
+        self.output_index = interpreter.get_output_details()[0]["index"]
+
+
+class InterpreterPool:
+    """Pool of TFLite interpreters per batch size, each allocated exactly once"""
+
+    def __init__(self, tf_module: Any, model_path: str,
+                 input_shape: Tuple[int, ...] = (120, 33, 3),
+                 batch_sizes: Sequence[int] = TFLITE_BATCH_SIZES,
+                 size: int = TFLITE_POOL_SIZE,
+                 num_threads: int = TFLITE_NUM_THREADS,
+                 use_xnnpack: bool = TFLITE_USE_XNNPACK):
+        self._tf = tf_module
+        self.model_path = model_path
+        self.input_shape = tuple(input_shape)
+        self.batch_sizes = sorted({max(1, b) for b in batch_sizes}) or [1]
+        self.size = max(1, size)
+        self.num_threads = max(1, num_threads)
+        self.use_xnnpack = use_xnnpack
+        self._idle: Dict[int, "queue.LifoQueue[_Slot]"] = {b: queue.LifoQueue() for b in self.batch_sizes}
+        self._created: Dict[int, int] = {b: 0 for b in self.batch_sizes}
+        self._lock = threading.Lock()
+
+    def _create(self, batch_size: int) -> _Slot:
+        kwargs: Dict[str, Any] = {"model_path": self.model_path, "num_threads": self.num_threads}
+        if not self.use_xnnpack:
+            kwargs["experimental_op_resolver_type"] = (
+                self._tf.lite.experimental.OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+            )
+        interpreter = self._tf.lite.Interpreter(**kwargs)
+        input_details = interpreter.get_input_details()[0]
+        shape = (batch_size,) + self.input_shape
+        if tuple(input_details["shape"]) != shape:
+            interpreter.resize_tensor_input(input_details["index"], shape)
+        interpreter.allocate_tensors()
+        return _Slot(interpreter)
+
+    def _acquire(self, batch_size: int) -> _Slot:
+        idle = self._idle[batch_size]
+        try:
+            return idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            create = self._created[batch_size] < self.size
+            if create:
+                self._created[batch_size] += 1
+        if create:
+            try:
+                return self._create(batch_size)
+            except Exception:
+                with self._lock:
+                    self._created[batch_size] -= 1
+                raise
+        return idle.get()
+
+    def _release(self, batch_size: int, slot: _Slot) -> None:
+        self._idle[batch_size].put(slot)
+
+    def _fit(self, count: int) -> int:
+        """Smallest allocated batch size holding `count` items, else the largest"""
+        for batch_size in self.batch_sizes:
+            if batch_size >= count:
+                return batch_size
+        return self.batch_sizes[-1]
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """Run an (N, 120, 33, 3) batch, padding/splitting it onto the allocated batch sizes"""
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        outputs = []
+        start = 0
+        while start < batch.shape[0]:
+            batch_size = self._fit(batch.shape[0] - start)
+            chunk = batch[start:start + batch_size]
+            count = chunk.shape[0]
+            if count < batch_size:
+                padding = np.zeros((batch_size - count,) + chunk.shape[1:], dtype=np.float32)
+                chunk = np.concatenate([chunk, padding])
+            slot = self._acquire(batch_size)
+            try:
+                slot.interpreter.set_tensor(slot.input_index, chunk)
+                slot.interpreter.invoke()
+                outputs.append(slot.interpreter.get_tensor(slot.output_index)[:count].copy())
+            finally:
+                self._release(batch_size, slot)
+            start += count
+        return np.concatenate(outputs)
+
+    def warm_up(self) -> None:
+        """Allocate one interpreter per batch size and run it once"""
+        for batch_size in self.batch_sizes:
+            self.predict(np.zeros((batch_size,) + self.input_shape, dtype=np.float32))
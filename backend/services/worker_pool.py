@@ -0,0 +1,99 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+# Inference runs off the event loop. OpenCV, MediaPipe and TFLite do their heavy lifting in
+# native code that releases the GIL, so threads are the default; INFERENCE_POOL_KIND=process
+# gives each worker its own interpreter (and its own copy of the models).
+POOL_KIND = os.environ.get("INFERENCE_POOL_KIND", "thread")
+POOL_WORKERS = int(os.environ.get("INFERENCE_WORKERS", str(os.cpu_count() or 1)))
+# Jobs allowed to wait for a free worker before new ones are rejected
+POOL_QUEUE_SIZE = int(os.environ.get("INFERENCE_QUEUE_SIZE", str(POOL_WORKERS * 2)))
+JOB_TIMEOUT_SECONDS = float(os.environ.get("INFERENCE_JOB_TIMEOUT", "300"))
+
+
+class PoolSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+
+class JobTimeout(Exception):
+    """Raised when a job does not finish within its timeout"""
+
+
+class InferencePool:
+    """Bounded executor for CPU-heavy inference jobs with admission control"""
+
+    def __init__(self, kind: str = POOL_KIND, workers: int = POOL_WORKERS,
+                 queue_size: int = POOL_QUEUE_SIZE, timeout: float = JOB_TIMEOUT_SECONDS):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"unknown pool kind: {kind}")
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, queue_size)
+        self.timeout = timeout
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[Executor] = None
+
+    @property
+    def pending(self) -> int:
+        """Jobs currently running or waiting for a worker"""
+        return self._pending
+
+    def has_capacity(self) -> bool:
+        return self._pending < self.capacity
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    # spawn, not fork: forking after TensorFlow/MediaPipe have started threads can deadlock
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="inference"
+                    )
+            return self._executor
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Queue a job or raise PoolSaturated; the slot is held until the job really finishes"""
+        executor = self._get_executor()
+        with self._lock:
+            if self._pending >= self.capacity:
+                raise PoolSaturated(f"inference pool is full ({self.capacity} jobs)")
+            self._pending += 1
+        try:
+            future = executor.submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """Run a job on the pool and await its result without blocking the event loop"""
+        future = self.submit(fn, *args)
+        limit = self.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), limit if limit > 0 else None)
+        except asyncio.TimeoutError:
+            raise JobTimeout(f"inference job exceeded {limit:g}s")
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _release(self, _future: Optional[Future] = None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+
+INFERENCE_POOL = InferencePool()
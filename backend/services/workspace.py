@@ -0,0 +1,169 @@
+import atexit
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional, Set
+
+# Scratch space for uploaded clips. Each request gets its own file so concurrent
+# decodes never read each other's video; the total size of live files is capped.
+DEFAULT_QUOTA_MB = int(os.environ.get("VIDEO_WORKSPACE_QUOTA_MB", "2048"))
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class WorkspaceQuotaExceeded(Exception):
+    """Raised when a write would push the workspace past its disk quota"""
+
+
+def _free_bytes(path: str) -> Optional[int]:
+    """Free space on the filesystem holding `path`, or its nearest existing parent"""
+    while not os.path.exists(path) and os.path.dirname(path) != path:
+        path = os.path.dirname(path)
+    try:
+        return shutil.disk_usage(path).free
+    except OSError:
+        return None
+
+
+def _default_root(quota_bytes: int = 0) -> str:
+    """
+    Prefer tmpfs (/dev/shm) so scratch video stays off the real disk, unless it is too
+    small to hold the quota (Docker gives containers a 64 MB /dev/shm by default)
+    """
+    configured = os.environ.get("VIDEO_WORKSPACE_DIR")
+    if configured:
+        return configured
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK):
+        try:
+            big_enough = shutil.disk_usage(shm).total >= quota_bytes
+        except OSError:
+            big_enough = False
+        if big_enough:
+            return os.path.join(shm, "sports_videos")
+    return os.path.join(tempfile.gettempdir(), "sports_videos")
+
+
+class ScratchFile:
+    """A per-request file in the workspace; every byte written is charged to the quota"""
+
+    def __init__(self, workspace: "VideoWorkspace", path: str, fd: int):
+        self.workspace = workspace
+        self.path = path
+        self.size = 0
+        self._file: Optional[BinaryIO] = os.fdopen(fd, "wb")
+        # Content hash computed as the bytes stream in, used to key the result cache
+        self._hash = hashlib.blake2b(digest_size=32)
+        self._released = False
+
+    def write(self, data: bytes) -> None:
+        if self._file is None:
+            raise ValueError("scratch file is closed for writing")
+        self.workspace._reserve(len(data))
+        self.size += len(data)
+        self._file.write(data)
+        self._hash.update(data)
+
+    def write_from(self, source: BinaryIO) -> None:
+        """Copy a binary file object in chunks"""
+        while True:
+            chunk = source.read(COPY_CHUNK_SIZE)
+            if not chunk:
+                break
+            self.write(chunk)
+
+    @property
+    def digest(self) -> str:
+        """BLAKE2b hex digest of everything written so far"""
+        return self._hash.hexdigest()
+
+    def close(self) -> None:
+        """Flush and close the writer; the file stays on disk until cleanup()"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def cleanup(self) -> None:
+        """Close, delete the file and return its bytes to the quota (idempotent)"""
+        if self._released:
+            return
+        self._released = True
+        try:
+            self.close()
+        finally:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self.workspace._release(self)
+
+
+class VideoWorkspace:
+    """Hands out isolated scratch files for video decoding under a shared disk quota"""
+
+    def __init__(self, root: Optional[str] = None, quota_bytes: Optional[int] = None):
+        # 0 means no quota; free space on the filesystem is still checked on every write
+        self.quota_bytes = DEFAULT_QUOTA_MB * 1024 * 1024 if quota_bytes is None else quota_bytes
+        self.root = root or _default_root(self.quota_bytes)
+        self._used = 0
+        self._active: Set[ScratchFile] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def used_bytes(self) -> int:
+        return self._used
+
+    @property
+    def active_files(self) -> int:
+        return len(self._active)
+
+    def create(self, suffix: str = ".mp4") -> ScratchFile:
+        """Create a scratch file; the caller owns it and must call cleanup()"""
+        os.makedirs(self.root, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix="video_", suffix=suffix, dir=self.root)
+        scratch = ScratchFile(self, path, fd)
+        with self._lock:
+            self._active.add(scratch)
+        return scratch
+
+    @contextmanager
+    def scratch_file(self, suffix: str = ".mp4") -> Iterator[ScratchFile]:
+        """Scratch file that is removed when the block exits, including on errors"""
+        scratch = self.create(suffix)
+        try:
+            yield scratch
+        finally:
+            scratch.cleanup()
+
+    def cleanup_all(self) -> None:
+        for scratch in list(self._active):
+            scratch.cleanup()
+
+    def _reserve(self, nbytes: int) -> None:
+        with self._lock:
+            if self.quota_bytes > 0 and self._used + nbytes > self.quota_bytes:
+                raise WorkspaceQuotaExceeded(
+                    f"video workspace quota of {self.quota_bytes} bytes exceeded"
+                )
+            # The quota may be more than the filesystem can hold right now (a small tmpfs, a
+            # disk filled by something else); refuse here rather than fail with ENOSPC mid-write
+            free = _free_bytes(self.root)
+            if free is not None and nbytes > free:
+                raise WorkspaceQuotaExceeded(
+                    f"video workspace filesystem has {free} bytes free, {nbytes} needed"
+                )
+            self._used += nbytes
+
+    def _release(self, scratch: ScratchFile) -> None:
+        with self._lock:
+            if scratch in self._active:
+                self._active.discard(scratch)
+                self._used -= scratch.size
+
+
+WORKSPACE = VideoWorkspace()
+
+# Don't leave clips behind in tmpfs if the worker exits mid-request
+atexit.register(WORKSPACE.cleanup_all)
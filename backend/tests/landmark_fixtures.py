@@ -0,0 +1,42 @@
+"""Synthetic landmarks and per-frame reference scorers shared by the analysis tests"""
+import numpy as np
+
+
+def synthetic_landmarks(frames: int, seed: int = 0, missing: float = 0.0) -> np.ndarray:
+    """Random (T, 33, 3) landmarks in [0, 1] with a fraction of undetected (all-zero) frames"""
+    rng = np.random.default_rng(seed)
+    landmarks = rng.random((frames, 33, 3), dtype=np.float32)
+    if missing:
+        landmarks[rng.random(frames) < missing] = 0.0
+    return landmarks
+
+
+def reference_form(landmarks_array: np.ndarray) -> float:
+    """Shoulder alignment scored frame by frame"""
+    if landmarks_array.shape[0] == 0:
+        return 0.0
+    form_scores = []
+    for frame in landmarks_array:
+        if np.all(frame == 0):
+            continue
+        left_shoulder = frame[11]
+        right_shoulder = frame[12]
+        if np.all(left_shoulder != 0) and np.all(right_shoulder != 0):
+            shoulder_alignment = 1.0 - abs(left_shoulder[1] - right_shoulder[1]) / 100.0
+            form_scores.append(max(0, min(1, shoulder_alignment)))
+    return np.mean(form_scores) * 100 if form_scores else 50.0
+
+
+def reference_power(landmarks_array: np.ndarray, fps: float = 30.0) -> float:
+    """Center-of-mass speed over each pair of consecutive frames that both have detections"""
+    if landmarks_array.shape[0] < 2:
+        return 50.0
+    velocities = []
+    for prev_frame, curr_frame in zip(landmarks_array[:-1], landmarks_array[1:]):
+        prev_points = prev_frame[~np.all(prev_frame == 0, axis=1)]
+        curr_points = curr_frame[~np.all(curr_frame == 0, axis=1)]
+        if len(prev_points) and len(curr_points):
+            velocities.append(np.linalg.norm(curr_points.mean(axis=0) - prev_points.mean(axis=0)))
+    if velocities:
+        return min(100, max(0, np.mean(velocities) * fps / 3.0))
+    return 50.0
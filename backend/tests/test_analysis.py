@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from backend.services import features, inference
+from landmark_fixtures import reference_form, reference_power, synthetic_landmarks
+
+
+def _padded(frames: int) -> np.ndarray:
+    return inference._pad_or_truncate(synthetic_landmarks(frames, seed=3), inference.TARGET_LEN)
+
+
+def _no_shoulders() -> np.ndarray:
+    landmarks = synthetic_landmarks(40, seed=4)
+    landmarks[:, 11] = 0.0
+    return landmarks
+
+
+CASES = {
+    "empty": np.zeros((0, 33, 3), dtype=np.float32),
+    "single_frame": synthetic_landmarks(1, seed=1),
+    "all_detected": synthetic_landmarks(120, seed=2),
+    "missing_frames": synthetic_landmarks(500, seed=5, missing=0.2),
+    "padded": _padded(45),
+    "all_zero": np.zeros((120, 33, 3), dtype=np.float32),
+    "no_shoulders": _no_shoulders(),
+}
+
+
+@pytest.mark.parametrize("name", CASES)
+@pytest.mark.parametrize("vectorized, reference", [
+    (inference._analyze_form, reference_form),
+    (inference._analyze_power, reference_power),
+])
+def test_vectorized_scores_match_loops(name, vectorized, reference):
+    landmarks = CASES[name]
+    pose = features.PoseFeatures(landmarks, 30.0)
+    assert vectorized(pose) == pytest.approx(reference(landmarks), rel=1e-5, abs=1e-6)
+
+
+def test_power_ignores_undetected_frames():
+    clip = synthetic_landmarks(40, seed=6)
+    expected = inference._analyze_power(features.PoseFeatures(clip, 30.0))
+    # Padding after the clip adds no movement of its own
+    padded = inference._pad_or_truncate(clip, inference.TARGET_LEN)
+    assert inference._analyze_power(features.PoseFeatures(padded, 30.0)) == pytest.approx(expected)
+    assert expected > 0.0
+
+
+def test_technique_is_deterministic():
+    landmarks = synthetic_landmarks(120, seed=7)
+    first = inference._analyze_technique(features.PoseFeatures(landmarks, 30.0))
+    second = inference._analyze_technique(features.PoseFeatures(landmarks, 30.0))
+    assert first == second
+    assert 0.0 <= first <= 100.0
+
+
+def test_technique_ignores_joints_missing_on_one_side():
+    landmarks = synthetic_landmarks(120, seed=9)
+    landmarks[:, features.RIGHT_WRIST] = 0.0
+    score = inference._analyze_technique(features.PoseFeatures(landmarks, 30.0))
+    assert np.isfinite(score)
+    assert 0.0 <= score <= 100.0
+
+
+def test_technique_without_detections_is_neutral():
+    empty = np.zeros((120, 33, 3), dtype=np.float32)
+    assert inference._analyze_technique(features.PoseFeatures(empty, 30.0)) == 50.0
+
+
+def test_joint_angles():
+    landmarks = np.zeros((2, 33, 3), dtype=np.float32)
+    # Right angle at the left knee, straight right knee
+    landmarks[:, features.LEFT_HIP] = (0.5, 0.2, 0.0)
+    landmarks[:, features.LEFT_KNEE] = (0.5, 0.5, 0.0)
+    landmarks[:, features.LEFT_ANKLE] = (0.8, 0.5, 0.0)
+    landmarks[:, features.RIGHT_HIP] = (0.6, 0.2, 0.0)
+    landmarks[:, features.RIGHT_KNEE] = (0.6, 0.5, 0.0)
+    landmarks[:, features.RIGHT_ANKLE] = (0.6, 0.8, 0.0)
+    pose = features.PoseFeatures(landmarks, 30.0)
+    np.testing.assert_allclose(pose.angle("left_knee"), 90.0, atol=1e-4)
+    np.testing.assert_allclose(pose.angle("right_knee"), 180.0, atol=1e-3)
+    # Elbows were never detected
+    assert np.isnan(pose.angle("left_elbow")).all()
+    np.testing.assert_allclose(pose.angular_velocity[:, 0], 0.0, atol=1e-3)
+
+
+def test_features_are_cached_per_clip():
+    landmarks = synthetic_landmarks(120, seed=8)
+    assert features.compute_features(landmarks, 30.0) is features.compute_features(landmarks.copy(), 30.0)
+    assert features.compute_features(landmarks, 30.0) is not features.compute_features(landmarks, 60.0)
+
+
+def test_power_is_per_second():
+    def moving(frames: int) -> np.ndarray:
+        landmarks = np.full((frames, 33, 3), 0.2, dtype=np.float32)
+        landmarks[:, :, 0] += np.linspace(0.0, 0.5, frames, dtype=np.float32)[:, None]
+        return landmarks
+
+    # The same second of movement sampled at 30 and 60 fps
+    at_30 = inference._analyze_power(features.PoseFeatures(moving(31), 30.0))
+    at_60 = inference._analyze_power(features.PoseFeatures(moving(61), 60.0))
+    assert at_30 == pytest.approx(at_60, rel=1e-4)
+    assert at_30 > 0.0
@@ -0,0 +1,145 @@
+import time
+from concurrent.futures import Future
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.routes import video_upload
+from backend.services import rate_limit
+
+
+def test_async_upload_holds_its_ticket_until_the_job_ends(monkeypatch):
+    admission = rate_limit.UploadAdmission(max_in_flight=4)
+    monkeypatch.setattr(rate_limit, "SHARED", False)
+    monkeypatch.setattr(rate_limit, "UPLOAD_ADMISSION", admission)
+    future: Future = Future()
+    monkeypatch.setattr(video_upload.INFERENCE_POOL, "submit", lambda *args: future)
+
+    app = FastAPI()
+    app.middleware("http")(main.admit_uploads)
+    app.include_router(video_upload.router)
+    with TestClient(app) as client:
+        response = client.post("/upload_video/?mode=async", files={"file": ("clip.mp4", b"not really a video")})
+        assert response.status_code == 202
+        assert admission.stats()["in_flight"] == 1
+
+        future.set_exception(RuntimeError("decoder crashed"))
+        deadline = time.monotonic() + 5
+        while admission.stats()["in_flight"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert admission.stats()["in_flight"] == 0
+
+
+def test_full_pool_rejects_upload_in_middleware(monkeypatch):
+    monkeypatch.setattr(main.INFERENCE_POOL, "has_capacity", lambda: False)
+    app = FastAPI()
+    app.middleware("http")(main.admit_uploads)
+
+    @app.post("/upload_video/")
+    async def never_reached():
+        raise AssertionError("the route must not run")
+
+    response = TestClient(app).post("/upload_video/", files={"file": ("clip.mp4", b"x")})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(video_upload.RETRY_AFTER_SECONDS)
+
+
+def test_warm_up_is_retried_until_it_succeeds(monkeypatch):
+    from backend.services import inference
+
+    state = {"artifacts_loaded": False, "pose_estimator_warm": False, "warmed_up": False,
+             "attempts": 0, "error": None, "timings_ms": {}}
+    monkeypatch.setattr(inference, "WARM_STATE", state)
+    monkeypatch.setattr(inference, "POSE_POOL", None)
+    monkeypatch.setattr(inference, "WARM_UP_RETRY_SECONDS", 0.01)
+    failures = iter([RuntimeError("model file still being copied")])
+
+    def score_landmarks(*args):
+        for exc in failures:
+            raise exc
+
+    monkeypatch.setattr(inference, "score_landmarks", score_landmarks)
+    assert inference.warm_up_until_ready()["warmed_up"]
+    assert state["attempts"] == 2 and state["error"] is None
+
+
+def test_upload_profile_places_score_in_region_and_age_band(tmp_path, monkeypatch):
+    from backend.database import connection
+    from backend.routes import results
+    from backend.services.leaderboard import Leaderboard, age_band
+    from backend.services.result_cache import ResultCache
+
+    pool = connection.ConnectionPool(str(tmp_path / "app.db"), size=2, timeout=2)
+    writer = connection.BatchWriter(pool, interval_ms=60_000)
+    board = Leaderboard(sync_interval=0)
+    monkeypatch.setattr(connection, "POOL", pool)
+    monkeypatch.setattr(connection, "WRITER", writer)
+    monkeypatch.setattr(video_upload, "WRITER", writer)
+    monkeypatch.setattr(video_upload, "LEADERBOARD", board)
+    monkeypatch.setattr(results, "LEADERBOARD", board)
+    monkeypatch.setattr(video_upload, "RESULT_CACHE", ResultCache(db_path=None))
+    done: Future = Future()
+    done.set_result({"score": 71.0, "cheat_detected": 0, "analysis": {}, "video_info": {}})
+    monkeypatch.setattr(video_upload.INFERENCE_POOL, "submit", lambda *args: done)
+
+    app = FastAPI()
+    app.include_router(video_upload.router)
+    app.include_router(results.router)
+    client = TestClient(app)
+    response = client.post("/upload_video/", files={"file": ("clip.mp4", b"clip")},
+                           data={"athlete_id": "a1", "sport": "sprinting", "region": "north", "birth_year": "2011"})
+    assert response.status_code == 200
+    band = age_band(2011)
+    for params in ({"region": "north", "age_band": band}, {"region": "north"}, {"age_band": band}):
+        page = client.get("/results/leaderboard", params={"sport": "sprinting", **params}).json()
+        assert [item["athlete_id"] for item in page["items"]] == ["a1"]
+    assert client.get("/results/leaderboard", params={"region": "unknown"}).json()["total"] == 0
+    writer.flush()
+    with pool.connection() as conn:
+        row = conn.execute("SELECT region, birth_year FROM athletes WHERE id = 'a1'").fetchone()
+    assert (row["region"], row["birth_year"]) == ("north", 2011)
+    pool.close()
+
+
+def test_timed_out_sync_upload_keeps_its_clip_until_the_job_finishes(tmp_path, monkeypatch):
+    from backend.services.workspace import VideoWorkspace
+
+    space = VideoWorkspace(root=str(tmp_path / "ws"), quota_bytes=0)
+    monkeypatch.setattr(video_upload, "WORKSPACE", space)
+    monkeypatch.setattr(video_upload.INFERENCE_POOL, "timeout", 0.05)
+    future: Future = Future()
+    future.set_running_or_notify_cancel()  # a worker is decoding the clip
+    monkeypatch.setattr(video_upload.INFERENCE_POOL, "submit", lambda *args: future)
+
+    app = FastAPI()
+    app.include_router(video_upload.router)
+    response = TestClient(app).post("/upload_video/", files={"file": ("clip.mp4", b"a clip nobody cached")})
+    assert response.status_code == 504
+    assert space.active_files == 1 and space.used_bytes > 0
+
+    future.set_exception(RuntimeError("decoder gave up"))
+    assert space.active_files == 0 and space.used_bytes == 0
+
+
+def test_upload_rejected_for_capacity_does_not_spend_the_ip_token(monkeypatch):
+    admission = rate_limit.UploadAdmission(max_in_flight=1)
+    limiter = rate_limit.RateLimiter("upload_ip", "1/3600", rate_limit.MemoryBuckets())
+    monkeypatch.setattr(rate_limit, "SHARED", False)
+    monkeypatch.setattr(rate_limit, "UPLOAD_ADMISSION", admission)
+    monkeypatch.setattr(rate_limit, "UPLOAD_IP_LIMITER", limiter)
+    busy = admission.admit(0)
+
+    app = FastAPI()
+    app.middleware("http")(main.admit_uploads)
+
+    @app.post("/upload_video/")
+    async def accepted():
+        return {"ok": True}
+
+    client = TestClient(app)
+    response = client.post("/upload_video/", files={"file": ("clip.mp4", b"x")})
+    assert response.status_code == 429
+    admission.release(busy)
+    # The single token in the client's bucket is still there
+    assert client.post("/upload_video/", files={"file": ("clip.mp4", b"x")}).status_code == 200
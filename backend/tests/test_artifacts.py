@@ -0,0 +1,82 @@
+import json
+import os
+import pickle
+
+import numpy as np
+
+from backend.services import artifacts
+
+
+def _write_norm(directory, mean, std):
+    path = directory / artifacts.NORM_STATS
+    path.write_text(json.dumps({"mean": [mean] * 99, "std": [std] * 99}))
+    return path
+
+
+def test_loads_once_and_reloads_on_change(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, "MODEL_ARTIFACT_DIRS", [str(tmp_path)])
+    registry = artifacts.ArtifactRegistry(reload_interval=0)
+    path = _write_norm(tmp_path, 1.0, 0.0)
+
+    assert registry.reload()
+    first = registry.current
+    mean, std_safe = first.norm
+    assert mean.shape == std_safe.shape == (1, 33, 3)
+    np.testing.assert_array_equal(std_safe, 1.0)
+    assert not registry.reload()
+    assert registry.current is first
+
+    _write_norm(tmp_path, 2.0, 4.0)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+    assert registry.reload()
+    assert registry.current is not first
+    assert registry.current.version != first.version
+    np.testing.assert_array_equal(registry.current.norm[1], 4.0)
+
+
+def test_unreadable_file_keeps_previous_artifact(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, "MODEL_ARTIFACT_DIRS", [str(tmp_path)])
+    registry = artifacts.ArtifactRegistry(reload_interval=0)
+    path = tmp_path / artifacts.CHEAT_DETECTOR
+    path.write_bytes(pickle.dumps({"detector": 1}))
+    registry.reload()
+
+    path.write_bytes(b"truncated")
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+    registry.reload()
+    assert registry.current.cheat_detector == {"detector": 1}
+    # Not retried until the file changes again
+    assert not registry.reload()
+
+
+def test_watcher_restarts_after_stop(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, "MODEL_ARTIFACT_DIRS", [str(tmp_path)])
+    registry = artifacts.ArtifactRegistry(reload_interval=60)
+    registry.start_watcher()
+    first = registry._watcher
+    registry.stop_watcher()
+    first.join(timeout=5)
+    assert not first.is_alive()
+    # Reading the snapshot after a stop does not bring the watcher back by itself
+    registry.current
+    assert registry._watcher is None
+    registry.start_watcher()
+    assert registry._watcher is not None and registry._watcher.is_alive()
+    registry.stop_watcher()
+
+
+def test_batched_clips_use_the_snapshot_they_were_submitted_with():
+    from backend.services import inference
+
+    class Model:
+        def __init__(self, value):
+            self.value = value
+
+        def predict(self, batch):
+            return np.full((batch.shape[0], 1), self.value, dtype=np.float32)
+
+    old = artifacts.Artifacts(pose_model=("tflite", Model(0.25)))
+    new = artifacts.Artifacts(pose_model=("tflite", Model(0.75)))
+    window = np.zeros((inference.TARGET_LEN, 33, 3), dtype=np.float32)
+    outputs = inference._predict_pose_batch([(old, window), (new, window), (old, window)])
+    np.testing.assert_allclose(outputs, [0.25, 0.75, 0.25])
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from backend.services import features, inference
+from backend.services.artifacts import Artifacts
+
+
+class Detector:
+    """decision_function: fixed values per frame, read from the first coordinate"""
+
+    def decision_function(self, rows):
+        return rows[:, 0]
+
+
+class PredictOnly:
+    def predict(self, rows):
+        return np.where(rows[:, 0] < 0, -1, 1)
+
+
+def _rows(values):
+    rows = np.ones((len(values), 99), dtype=np.float32)
+    rows[:, 0] = values
+    return rows
+
+
+def test_clip_is_flagged_when_mean_frame_score_reaches_the_threshold():
+    artifacts = Artifacts(cheat_detector=Detector())
+    # One clearly anomalous frame among normal ones no longer flags the clip on its own
+    one_outlier = _rows([-1.0] + [1.0] * 9)
+    mostly_outliers = _rows([-1.0] * 6 + [1.0] * 4)
+    (flag_one, score_one), (flag_most, score_most) = inference._score_cheat_batch(
+        [(artifacts, one_outlier), (artifacts, mostly_outliers)]
+    )
+    assert (flag_one, flag_most) == (0, 1)
+    assert score_one == pytest.approx(0.1, abs=1e-6)
+    assert score_most == pytest.approx(0.6, abs=1e-6)
+
+
+def test_detectors_without_decision_function_score_the_fraction_of_outlier_frames():
+    artifacts = Artifacts(cheat_detector=PredictOnly())
+    [(flag, score)] = inference._score_cheat_batch([(artifacts, _rows([-1.0, -1.0, 1.0, 1.0]))])
+    assert (flag, score) == (1, 0.5)
+    [(flag, score)] = inference._score_cheat_batch([(artifacts, _rows([-1.0, 1.0, 1.0, 1.0]))])
+    assert (flag, score) == (0, 0.25)
+
+
+def test_padding_and_missed_detections_are_not_scored():
+    landmarks = np.full((40, 33, 3), 0.5, dtype=np.float32)
+    landmarks[10:15] = 0.0  # pose not detected
+    window = inference._pad_or_truncate(landmarks, inference.TARGET_LEN)
+    pose = features.PoseFeatures(window, 30.0)
+    rows = inference._cheat_features(window, pose.frame_valid)
+    assert rows.shape == (35, 99)
+    assert not np.all(rows == 0, axis=1).any()
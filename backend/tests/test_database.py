@@ -0,0 +1,94 @@
+import pytest
+
+from backend.database.connection import BatchWriter, ConnectionPool, DBSession, PoolTimeout
+from backend.database.models import (
+    assessment_statements, athlete_history, athlete_summary, athlete_trend, latest_assessment, list_athletes,
+)
+
+
+def _response(video_id, score):
+    return {"video_id": video_id, "score": score, "cheat_detected": 0, "cheat_score": 0.1,
+            "analysis": {"form_score": score}, "video_info": {}}
+
+
+def test_batched_writes_are_ordered_and_readable(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "app.db"), size=2)
+    writer = BatchWriter(pool, max_batch=100, interval_ms=10_000)
+    for i, athlete in enumerate(["a1", "a2", "a1"]):
+        writer.add_many(assessment_statements(_response(f"v{i}", 50.0 + i), athlete, "sprinting", "test",
+                                              created_at=1000.0 + i))
+    assert writer.flush() == 12 and writer.batches == 1
+
+    with pool.connection() as conn:
+        db = DBSession(conn)
+        assert latest_assessment(db)["video_id"] == "v2"
+        assert latest_assessment(db, "a2")["score"] == 51.0
+        assert latest_assessment(db, "nobody") is None
+        assert [athlete["id"] for athlete in list_athletes(db)] == ["a1", "a2"]
+    pool.close()
+
+
+def test_failed_transaction_rolls_back(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "app.db"), size=1)
+    try:
+        with pool.connection() as conn:
+            conn.execute("INSERT INTO athletes (id, created_at, updated_at) VALUES ('x', 0, 0)")
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM athletes").fetchone()[0] == 0
+    pool.close()
+
+
+def test_athlete_aggregates_are_maintained_on_write(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "app.db"), size=1)
+    writer = BatchWriter(pool)
+    day = 86400.0
+    for i, (score, cheat) in enumerate([(60.0, 0), (80.0, 0), (99.0, 1), (70.0, 0)]):
+        response = _response(f"v{i}", score)
+        response["cheat_detected"] = cheat
+        response["analysis"] = {"form_score": score, "consistency_score": 50.0, "power_score": 40.0,
+                                "technique_score": 30.0}
+        writer.add_many(assessment_statements(response, "a1", "sprinting", "test", created_at=day * (i // 2 + 1)))
+    writer.flush()
+
+    with pool.connection() as conn:
+        db = DBSession(conn)
+        [summary] = athlete_summary(db, "a1", rolling_window=2)
+        assert summary["assessments"] == 3 and summary["mean_score"] == 70.0
+        assert summary["best_score"] == 80.0 and summary["last_score"] == 70.0
+        assert summary["rolling_mean"] == 75.0
+        assert summary["components"]["form"] == 70.0 and summary["components"]["technique"] == 30.0
+        assert [point["score"] for point in athlete_trend(db, "a1", window=2)] == [70.0, 70.0]
+        assert [item["score"] for item in athlete_history(db, "a1", limit=2)] == [70.0, 99.0]
+        assert list_athletes(db)[0]["latest_score"] == 70.0
+    pool.close()
+
+
+def test_failed_group_does_not_drop_the_rest_of_the_batch(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "app.db"), size=1)
+    writer = BatchWriter(pool, interval_ms=10_000)
+    writer.add_many(assessment_statements(_response("good1", 50.0), "a1", "sprinting", "test"))
+    bad = assessment_statements(_response("bad", 60.0), "a2", "sprinting", "test")
+    sql, params = bad[1]
+    bad[1] = (sql, (*params[:3], None, *params[4:]))  # score is NOT NULL
+    writer.add_many(bad)
+    writer.add_many(assessment_statements(_response("good2", 70.0), "a3", "sprinting", "test"))
+    writer.flush()
+
+    assert writer.failed_groups == 1
+    with pool.connection() as conn:
+        videos = [row[0] for row in conn.execute("SELECT video_id FROM assessments ORDER BY id")]
+        assert videos == ["good1", "good2"]
+        assert conn.execute("SELECT COUNT(*) FROM athletes WHERE id = 'a2'").fetchone()[0] == 0
+    pool.close()
+
+
+def test_pool_gives_up_instead_of_waiting_forever(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "app.db"), size=1, timeout=0.05)
+    with pool.connection():
+        with pytest.raises(PoolTimeout):
+            with pool.connection():
+                pass
+    pool.close()
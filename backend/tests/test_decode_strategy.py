@@ -0,0 +1,134 @@
+import numpy as np
+import pytest
+
+from backend.services import inference
+
+
+class FakeCapture:
+    """cv2.VideoCapture over `count` numbered frames; counts decodes and grabs"""
+
+    def __init__(self, count: int, fps: float, report_count: bool = True):
+        self.count = count
+        self.fps = fps
+        self.report_count = report_count
+        self.position = 0
+        self.reads = 0
+        self.grabs = 0
+        self.released = False
+
+    def get(self, prop):
+        if prop == inference.cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.count if self.report_count else 0)
+        if prop == inference.cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        return 0.0
+
+    def read(self):
+        if self.position >= self.count:
+            return False, None
+        frame = np.full((2, 2, 3), self.position % 256, dtype=np.uint8)
+        frame[0, 0, 1] = self.position // 256
+        self.position += 1
+        self.reads += 1
+        return True, frame
+
+    def grab(self):
+        if self.position >= self.count:
+            return False
+        self.position += 1
+        self.grabs += 1
+        return True
+
+    def release(self):
+        self.released = True
+
+
+def _indices(frames) -> list:
+    return [int(frame[0, 0, 0]) + 256 * int(frame[0, 0, 1]) for frame in frames]
+
+
+def _sample(mode: str, count: int, fps: float, target_fps: float = 30.0):
+    strategy = {"mode": mode, "target_fps": target_fps}
+    cap = FakeCapture(count, fps)
+    picked = _indices(inference._iter_frames(cap, strategy, count, fps))
+    return strategy, cap, picked
+
+
+def test_head_stops_once_the_window_is_full():
+    strategy, cap, picked = _sample("head", 300, 30.0)
+    assert picked == list(range(inference.TARGET_LEN))
+    assert cap.reads == inference.TARGET_LEN and cap.grabs == 0
+    assert inference._expected_frames(strategy, 300) == inference.TARGET_LEN
+    assert inference._sample_fps(strategy, 30.0, 10.0, len(picked)) == 30.0
+
+
+def test_head_on_a_short_clip_takes_every_frame():
+    strategy, cap, picked = _sample("head", 50, 30.0)
+    assert picked == list(range(50))
+    assert inference._expected_frames(strategy, 50) == 50
+
+
+def test_fps_resamples_a_fast_source():
+    strategy, cap, picked = _sample("fps", 1000, 120.0)
+    assert picked == list(range(0, 4 * inference.TARGET_LEN, 4))
+    # Skipped frames are grabbed, not decoded
+    assert cap.reads == inference.TARGET_LEN
+    assert cap.grabs == 3 * (inference.TARGET_LEN - 1)
+    assert inference._sample_fps(strategy, 120.0, 1000 / 120.0, len(picked)) == 30.0
+
+
+def test_fps_keeps_every_frame_of_a_slow_source():
+    strategy, cap, picked = _sample("fps", 300, 24.0)
+    assert picked == list(range(inference.TARGET_LEN))
+    assert cap.grabs == 0
+    assert inference._sample_fps(strategy, 24.0, 300 / 24.0, len(picked)) == 24.0
+
+
+def test_uniform_spreads_the_window_over_the_clip():
+    strategy, cap, picked = _sample("uniform", 1000, 30.0)
+    assert len(picked) == inference.TARGET_LEN
+    assert picked[0] == 0 and picked[-1] == 999
+    assert picked == sorted(set(picked))
+    assert cap.reads == inference.TARGET_LEN
+    duration = 1000 / 30.0
+    assert inference._sample_fps(strategy, 30.0, duration, len(picked)) == pytest.approx(inference.TARGET_LEN / duration)
+
+
+def test_uniform_on_a_short_clip_takes_every_frame():
+    strategy, cap, picked = _sample("uniform", 80, 30.0)
+    assert picked == list(range(80))
+    assert inference._expected_frames(strategy, 80) == 80
+    # Nothing was skipped, so the source rate still applies
+    assert inference._sample_fps(strategy, 30.0, 80 / 30.0, len(picked)) == 30.0
+
+
+def test_all_decodes_every_frame():
+    strategy, cap, picked = _sample("all", 300, 30.0)
+    assert picked == list(range(300))
+    assert cap.grabs == 0
+    assert inference._expected_frames(strategy, 300) == 300
+
+
+@pytest.mark.parametrize("mode", ["head", "fps", "uniform", "all"])
+def test_unknown_frame_count_sizes_for_the_window(mode):
+    assert inference._expected_frames({"mode": mode}, 0) == inference.TARGET_LEN
+
+
+def test_process_video_reports_the_sampled_rate(monkeypatch):
+    cap = FakeCapture(600, 120.0)
+    monkeypatch.setattr(inference.cv2, "VideoCapture", lambda path: cap)
+    decoded = []
+
+    def extract(frames, capacity):
+        decoded.extend(_indices(frames))
+        landmarks = np.random.default_rng(0).random((len(decoded), 33, 3), dtype=np.float32)
+        return landmarks, np.ones(landmarks.shape[:2], np.float32), {}
+
+    monkeypatch.setattr(inference, "_extract_landmarks", extract)
+    result = inference._process_video_file("clip.mp4", "vertical_jump")
+    info = result["video_info"]
+    assert decoded == list(range(0, 600, 2))[:inference.TARGET_LEN]
+    assert info["decode_strategy"] == "fps"
+    assert info["sample_fps"] == 60.0
+    assert info["frame_count"] == 600 and info["sampled_frames"] == inference.TARGET_LEN
+    assert cap.released
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from ml_models.utils import preprocessing
+
+
+def _fake_extract_into(self, frame, coords_out, visibility_out):
+    # Encode the frame's fill value so the collected order can be checked
+    coords_out[:] = float(frame[0, 0, 0])
+    visibility_out[:] = 1.0
+    return True
+
+
+@pytest.mark.parametrize("workers", [0, 1, 3])
+def test_frames_are_collected_in_order(monkeypatch, workers):
+    monkeypatch.setattr(preprocessing.PoseEstimator, "extract_into", _fake_extract_into)
+    frames = (np.full((4, 4, 3), i, dtype=np.uint8) for i in range(50))
+    # Capacity deliberately short so the buffer has to grow
+    buffer, timings = preprocessing.extract_clip_pipelined(frames, 10, workers=workers, queue_depth=2)
+    assert buffer.length == 50
+    np.testing.assert_array_equal(buffer.landmarks[:, 0, 0], np.arange(50, dtype=np.float32))
+    assert {"decode_ms", "pose_ms", "extract_wall_ms"} <= set(timings)
+
+
+def test_decoder_errors_propagate(monkeypatch):
+    monkeypatch.setattr(preprocessing.PoseEstimator, "extract_into", _fake_extract_into)
+
+    def broken():
+        yield np.zeros((4, 4, 3), dtype=np.uint8)
+        raise IOError("corrupt stream")
+
+    with pytest.raises(IOError):
+        preprocessing.extract_clip_pipelined(broken(), 4, workers=2)
+
+
+def test_preprocessor_downscales_into_reused_rgb_buffer():
+    prepare = preprocessing.FramePreprocessor(max_side=64)
+    frame = np.zeros((90, 160, 3), dtype=np.uint8)
+    frame[..., 0] = 255  # blue in BGR
+    first = prepare(frame)
+    assert first.shape == (36, 64, 3)
+    assert (first[..., 2] == 255).all() and (first[..., 0] == 0).all()
+    assert prepare(frame) is first
+    # Frames already small enough are only converted
+    assert preprocessing.FramePreprocessor(max_side=640)(frame).shape == frame.shape
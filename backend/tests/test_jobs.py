@@ -0,0 +1,80 @@
+import time
+from concurrent.futures import Future
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.routes import jobs as jobs_routes
+from backend.routes import video_upload
+from backend.services import jobs
+from backend.services.workspace import VideoWorkspace
+
+
+@pytest.mark.parametrize("persisted", [False, True])
+def test_job_lifecycle_and_expiry(tmp_path, persisted):
+    db_path = str(tmp_path / "jobs.db") if persisted else None
+    store = jobs.JobStore(db_path=db_path, ttl=0.01)
+    job_id = store.create()
+    assert store.get(job_id)["status"] == jobs.QUEUED
+    store.mark_running(job_id)
+    assert store.get(job_id)["status"] == jobs.RUNNING
+    store.mark_done(job_id, {"score": 1.0})
+    assert store.get(job_id)["result"] == {"score": 1.0}
+    if persisted:
+        # Another worker sharing the database sees the finished job
+        assert jobs.JobStore(db_path=db_path).get(job_id)["status"] == jobs.DONE
+
+    time.sleep(0.02)
+    store.create()
+    assert store.get(job_id) is None
+
+
+def test_job_routes(monkeypatch):
+    store = jobs.JobStore(db_path=None)
+    monkeypatch.setattr(jobs_routes, "JOB_STORE", store)
+    app = FastAPI()
+    app.include_router(jobs_routes.router)
+    client = TestClient(app)
+
+    assert client.get("/jobs/missing").status_code == 404
+    pending, done, failed = store.create(), store.create(), store.create()
+    store.mark_done(done, {"score": 42.0})
+    store.mark_failed(failed, "Video analysis failed: bad clip")
+
+    assert client.get(f"/jobs/{pending}").json()["status"] == jobs.QUEUED
+    assert client.get(f"/jobs/{pending}/result").status_code == 202
+    assert client.get(f"/jobs/{done}/result").json() == {"score": 42.0}
+    response = client.get(f"/jobs/{failed}/result")
+    assert response.status_code == 422 and "bad clip" in response.json()["detail"]
+
+
+def _wait_for(condition, seconds=5.0):
+    deadline = time.monotonic() + seconds
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_async_job_is_marked_running_without_a_poll_and_keeps_its_clip_past_a_timeout(tmp_path, monkeypatch):
+    store = jobs.JobStore(db_path=None)
+    space = VideoWorkspace(root=str(tmp_path / "ws"), quota_bytes=0)
+    monkeypatch.setattr(video_upload, "JOB_STORE", store)
+    monkeypatch.setattr(video_upload, "WORKSPACE", space)
+    monkeypatch.setattr(video_upload, "JOB_START_POLL_SECONDS", 0.01)
+    monkeypatch.setattr(video_upload.INFERENCE_POOL, "timeout", 0.3)
+    future: Future = Future()
+    monkeypatch.setattr(video_upload.INFERENCE_POOL, "submit", lambda *args: future)
+
+    app = FastAPI()
+    app.include_router(video_upload.router)
+    with TestClient(app) as client:
+        job_id = client.post("/upload_video/?mode=async", files={"file": ("clip.mp4", b"an async clip")}).json()["job_id"]
+        assert store.get(job_id)["status"] == jobs.QUEUED
+        future.set_running_or_notify_cancel()
+        assert _wait_for(lambda: store.get(job_id)["status"] == jobs.RUNNING)
+        assert _wait_for(lambda: store.get(job_id)["status"] == jobs.FAILED)
+        # Timed out, but the worker still has the clip
+        assert space.active_files == 1
+        future.set_exception(RuntimeError("decoder gave up"))
+        assert space.active_files == 0
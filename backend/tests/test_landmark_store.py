@@ -0,0 +1,68 @@
+import os
+import time
+
+import numpy as np
+
+from backend.services import inference
+from backend.services.landmark_store import LandmarkStore
+from landmark_fixtures import synthetic_landmarks
+
+KEY = "ab" * 32
+
+
+def test_round_trip(tmp_path):
+    store = LandmarkStore(str(tmp_path))
+    landmarks = synthetic_landmarks(90, seed=21)
+    visibility = np.linspace(0, 1, 90 * 33, dtype=np.float32).reshape(90, 33)
+    store.save(KEY, landmarks, visibility, {"sample_fps": 30.0, "frame_count": 90}, "sprinting")
+
+    loaded, loaded_visibility, meta = store.load(KEY)
+    assert loaded.dtype == np.float32 and loaded.shape == landmarks.shape
+    np.testing.assert_allclose(loaded, landmarks, atol=1e-3)
+    np.testing.assert_allclose(loaded_visibility, visibility, atol=1e-3)
+    assert meta["sport"] == "sprinting"
+    assert list(store.keys()) == [KEY]
+    assert store.load("cd" * 32) is None
+    assert store.load("../not-a-key") is None
+
+
+def test_rescore_is_deterministic(tmp_path):
+    store = LandmarkStore(str(tmp_path))
+    store.save(KEY, synthetic_landmarks(120, seed=22), np.ones((120, 33), np.float32),
+               {"sample_fps": 30.0, "frame_count": 120, "duration": 4.0})
+    landmarks, _, meta = store.load(KEY)
+    first = inference.score_landmarks(landmarks, meta["video_info"])
+    assert first == inference.score_landmarks(landmarks.copy(), meta["video_info"])
+    assert first["video_info"]["frame_count"] == 120
+
+
+def _save(store, key, seed, age=0.0):
+    store.save(key, synthetic_landmarks(30, seed=seed), np.ones((30, 33), np.float32), {"sample_fps": 30.0})
+    stored_at = time.time() - age
+    for path in store._paths(key):
+        os.utime(path, (stored_at, stored_at))
+
+
+def test_prune_drops_expired_then_oldest_clips(tmp_path):
+    store = LandmarkStore(str(tmp_path), max_age_days=1, max_bytes=0, prune_seconds=3600)
+    old, older, fresh = "01" * 32, "02" * 32, "03" * 32
+    _save(store, older, 1, age=3 * 86400)
+    _save(store, old, 2, age=2 * 86400)
+    _save(store, fresh, 3)
+    assert store.prune() == 2
+    assert list(store.keys()) == [fresh]
+
+    clip_bytes = sum(os.path.getsize(path) for path in store._paths(fresh))
+    # Room for two clips (sidecars differ by a few bytes), not three
+    store.max_age, store.max_bytes = 0, 2 * clip_bytes + 64
+    _save(store, old, 2, age=60)
+    _save(store, older, 1, age=120)
+    assert store.prune() == 1
+    assert sorted(store.keys()) == [old, fresh]
+
+
+def test_save_prunes_when_due(tmp_path):
+    store = LandmarkStore(str(tmp_path), max_age_days=1, max_bytes=0, prune_seconds=0)
+    _save(store, "01" * 32, 1, age=2 * 86400)
+    _save(store, "02" * 32, 2)
+    assert list(store.keys()) == ["02" * 32]
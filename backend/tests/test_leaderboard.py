@@ -0,0 +1,64 @@
+import random
+
+from backend.database.connection import BatchWriter, ConnectionPool, DBSession
+from backend.database.models import athlete_statement, assessment_statements, leaderboard_statement
+from backend.services.leaderboard import ALL, IndexableSkipList, Leaderboard
+
+
+def test_skip_list_matches_sorted_list():
+    rng = random.Random(5)
+    skip_list, reference = IndexableSkipList(), []
+    for _ in range(2000):
+        key = rng.randrange(500)
+        if key in reference:
+            skip_list.remove(key)
+            reference.remove(key)
+        else:
+            skip_list.insert(key)
+            reference.append(key)
+        reference.sort()
+    assert len(skip_list) == len(reference)
+    assert list(skip_list.iter_from(0)) == reference
+    assert [skip_list[i] for i in range(0, len(reference), 7)] == reference[::7]
+    assert all(skip_list.rank(key) == i for i, key in enumerate(reference))
+    assert skip_list.rank(-1) is None and list(skip_list.iter_from(len(reference))) == []
+
+
+def test_best_score_ranking_and_partitions(tmp_path):
+    board = Leaderboard()
+    board.set_profile("a", "north", 2012)
+    assert board.record("a", "sprinting", 70.0, 1.0)
+    assert board.record("b", "sprinting", 80.0, 2.0)
+    assert board.record("c", "sprinting", 70.0, 3.0)
+    assert not board.record("a", "sprinting", 60.0, 4.0)
+
+    total, page = board.top("sprinting")
+    assert total == 3 and [item["athlete_id"] for item in page] == ["b", "a", "c"]
+    assert board.rank("c", "sprinting") == (3, 3)
+    assert board.rank("a", "sprinting", "north") == (1, 1)
+    assert [item["rank"] for item in board.around(2, 1, "sprinting")[1]] == [1, 2, 3]
+
+    # A better score and a changed region both move the athlete
+    assert board.record("c", "sprinting", 90.0, 5.0)
+    board.set_profile("c", "north", None)
+    assert board.rank("c", "sprinting") == (1, 3)
+    assert [item["athlete_id"] for item in board.top("sprinting", "north")[1]] == ["c", "a"]
+    assert board.top(ALL, ALL, ALL)[0] == 3
+
+
+def test_sync_rebuilds_from_database(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "app.db"), size=1)
+    writer = BatchWriter(pool)
+    for athlete, score in (("a", 50.0), ("b", 65.0), ("a", 75.0), ("a", 40.0)):
+        response = {"video_id": None, "score": score, "cheat_detected": 0, "analysis": {}}
+        writer.add_many(assessment_statements(response, athlete, "jumping", "test")
+                        + [leaderboard_statement(athlete, "jumping", score, None, score)])
+    writer.add(*athlete_statement("b", region="south", birth_year=2000))
+    writer.flush()
+
+    board = Leaderboard()
+    with pool.connection() as conn:
+        board.sync(DBSession(conn))
+    assert [item["score"] for item in board.top("jumping")[1]] == [75.0, 65.0]
+    assert board.rank("b", "jumping", "south", "senior") == (1, 1)
+    pool.close()
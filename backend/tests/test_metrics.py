@@ -0,0 +1,39 @@
+import pytest
+
+from backend.services import metrics
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = metrics.Registry()
+    histogram = registry.histogram("stage_seconds", "test", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, stage="pose")
+    text = registry.render()
+    assert 'stage_seconds_bucket{stage="pose",le="0.1"} 2' in text
+    assert 'stage_seconds_bucket{stage="pose",le="1.0"} 3' in text
+    assert 'stage_seconds_bucket{stage="pose",le="+Inf"} 4' in text
+    assert 'stage_seconds_count{stage="pose"} 4' in text
+
+
+def test_callback_gauge_and_server_timing():
+    registry = metrics.Registry()
+    registry.gauge("queue_depth", "test", callback=lambda: 7)
+    assert "queue_depth 7.0" in registry.render()
+    header = metrics.server_timing({"decode_ms": 12.34, "pose_ms": 100.0})
+    assert header == "decode;dur=12.3, pose;dur=100.0"
+
+
+def _exposed(metric, series):
+    """Value of one series in the metric's exposition lines, 0 if not exposed yet"""
+    for line in metric.samples():
+        name, value = line.rsplit(" ", 1)
+        if name == series:
+            return float(value)
+    return 0.0
+
+
+def test_pose_seconds_count_estimator_time_not_decode():
+    counter = metrics.INFERENCE_POSE_SECONDS
+    before = _exposed(counter, "inference_pose_seconds_total")
+    metrics.record_timings({"decode_ms": 400.0, "pose_ms": 100.0, "extract_wall_ms": 500.0}, frames=10)
+    assert _exposed(counter, "inference_pose_seconds_total") - before == pytest.approx(0.1)
@@ -0,0 +1,80 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.services.inference import MicroBatcher
+
+
+def _doubler(calls):
+    def fn(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+    return fn
+
+
+def test_full_batch_runs_without_waiting():
+    calls = []
+    batcher = MicroBatcher(_doubler(calls), max_batch=4, max_wait_ms=10_000, name="t")
+    futures = [batcher.submit(i) for i in range(4)]
+    assert [future.result(timeout=2) for future in futures] == [0, 2, 4, 6]
+    assert calls == [[0, 1, 2, 3]]
+
+
+def test_partial_batch_runs_after_max_wait():
+    calls = []
+    batcher = MicroBatcher(_doubler(calls), max_batch=8, max_wait_ms=50, name="t")
+    start = time.monotonic()
+    futures = [batcher.submit(i) for i in range(3)]
+    assert [future.result(timeout=2) for future in futures] == [0, 2, 4]
+    assert time.monotonic() - start >= 0.04
+    assert calls == [[0, 1, 2]]
+
+
+def test_results_go_back_to_their_callers():
+    batcher = MicroBatcher(_doubler([]), max_batch=8, max_wait_ms=20, name="t")
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(batcher, range(64)))
+    assert results == [i * 2 for i in range(64)]
+
+
+def test_errors_reach_every_caller_and_the_worker_survives():
+    def fail(items):
+        if items[0] == "boom":
+            raise ValueError("bad batch")
+        return items
+
+    batcher = MicroBatcher(fail, max_batch=2, max_wait_ms=10_000, name="t")
+    futures = [batcher.submit("boom"), batcher.submit("x")]
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result(timeout=2)
+    futures = [batcher.submit("a"), batcher.submit("b")]
+    assert [future.result(timeout=2) for future in futures] == ["a", "b"]
+
+
+def test_short_output_fails_the_batch_instead_of_hanging():
+    batcher = MicroBatcher(lambda items: items[:1], max_batch=2, max_wait_ms=10_000, name="t")
+    futures = [batcher.submit(1), batcher.submit(2)]
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=2)
+
+
+def test_call_gives_up_after_result_timeout():
+    release = threading.Event()
+    batcher = MicroBatcher(lambda items: release.wait() and items, max_batch=1, max_wait_ms=0, name="t",
+                           result_timeout=0.05)
+    with pytest.raises(TimeoutError):
+        batcher("slow")
+    release.set()
+
+
+def test_batch_size_stats():
+    batcher = MicroBatcher(_doubler([]), max_batch=3, max_wait_ms=10_000, name="t")
+    for future in [batcher.submit(i) for i in range(6)]:
+        future.result(timeout=2)
+    stats = batcher.stats()
+    assert stats["batches"] == 2 and stats["items"] == 6
+    assert stats["batch_sizes"] == {3: 2} and stats["mean_batch_size"] == 3.0
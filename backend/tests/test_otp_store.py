@@ -0,0 +1,62 @@
+import pytest
+
+from backend.database.connection import ConnectionPool
+from backend.services.otp_store import (
+    EXPIRED, INVALID, LOCKED, MISSING, VERIFIED, MemoryOTPStore, OTPStore, SQLiteOTPStore,
+)
+
+
+def _exercise(store, other):
+    store.put("9000000001", "123456")
+    assert other.verify("9000000001", "000000") == (INVALID, 2)
+    assert store.verify("9000000001", "111111") == (INVALID, 1)
+    assert other.verify("9000000001", "123456").status == VERIFIED
+    assert store.verify("9000000001", "123456").status == MISSING
+
+    store.put("9000000002", "222222")
+    for _ in range(3):
+        store.verify("9000000002", "000000")
+    assert other.verify("9000000002", "222222").status == LOCKED
+
+    store.put("9000000003", "333333", ttl=-1)
+    assert other.verify("9000000003", "333333").status == EXPIRED
+
+
+def test_memory_store_attempts_expiry_and_capacity():
+    store = MemoryOTPStore(capacity=3)
+    _exercise(store, store)
+
+    for i in range(5):
+        store.put(f"90000001{i:02d}", "000000", ttl=60 + i)
+    # The three codes expiring last survive
+    assert len(store) == 3 and store.verify("9000000100", "000000").status == MISSING
+    store.put("9000000200", "000000", ttl=-1)
+    assert store.cleanup() == 1 and len(store) == 2
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "app.db"), size=2)
+    store, other = SQLiteOTPStore(pool), SQLiteOTPStore(ConnectionPool(pool.path, size=1))
+    _exercise(store, other)
+    store.put("9000000005", "555555")
+    store.put("9000000004", "444444", ttl=-1)
+    assert other.cleanup() == 1 and len(store) == 1
+    pool.close()
+
+
+def test_sqlite_store_enforces_capacity_on_every_put(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "app.db"), size=1)
+    store = SQLiteOTPStore(pool, capacity=3)
+    for i in range(5):
+        store.put(f"90000001{i:02d}", "000000", ttl=60 + i)
+        assert len(store) == min(i + 1, 3)
+    assert store.verify("9000000101", "000000").status == MISSING
+    # Resending to a stored number replaces its code without evicting another
+    store.put("9000000104", "111111", ttl=120)
+    assert len(store) == 3 and store.verify("9000000102", "000000").status == VERIFIED
+    pool.close()
+
+
+def test_store_interface_is_abstract():
+    with pytest.raises(TypeError):
+        OTPStore()
@@ -0,0 +1,69 @@
+import pytest
+
+from backend.database.connection import ConnectionPool
+from backend.services.rate_limit import (
+    MemoryBuckets, RateLimited, RateLimiter, SQLiteBuckets, UploadAdmission, parse_limit,
+)
+
+
+@pytest.mark.parametrize("make_buckets", [lambda tmp: MemoryBuckets(), lambda tmp: SQLiteBuckets(
+    ConnectionPool(str(tmp / "app.db"), size=1))])
+def test_token_bucket_refills_at_its_rate(tmp_path, make_buckets):
+    buckets = make_buckets(tmp_path)
+    burst, rate = parse_limit("3/60")
+    assert [buckets.take("otp:1", burst, rate, 1, 100.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert buckets.take("otp:1", burst, rate, 1, 100.0) == pytest.approx(20.0)
+    assert buckets.take("otp:2", burst, rate, 1, 100.0) == 0.0
+    # One token back after 20 s
+    assert buckets.take("otp:1", burst, rate, 1, 120.0) == 0.0
+    assert buckets.take("otp:1", burst, rate, 1, 121.0) == pytest.approx(19.0)
+
+
+def test_memory_buckets_forget_full_and_excess_keys():
+    buckets = MemoryBuckets(max_keys=2)
+    for key in ("a", "b", "c"):
+        buckets.take(key, 2, 1, 1, 0.0)
+    assert len(buckets) == 2
+    buckets.take("d", 2, 1, 1, 10.0)
+    assert len(buckets) == 1
+
+    limiter = RateLimiter("x", "1/10", MemoryBuckets())
+    limiter.hit("k")
+    with pytest.raises(RateLimited) as excinfo:
+        limiter.hit("k")
+    assert excinfo.value.scope == "x" and excinfo.value.retry_after_header == "10"
+
+
+@pytest.mark.parametrize("shared", [False, True])
+def test_upload_admission_budget(tmp_path, shared):
+    pool = ConnectionPool(str(tmp_path / "app.db"), size=1) if shared else None
+    admission = UploadAdmission(max_in_flight=2, max_bytes=100, pool=pool)
+    first = admission.admit(500)  # oversized uploads still run alone
+    with pytest.raises(RateLimited):
+        admission.admit(1)
+    admission.release(first)
+    tickets = [admission.admit(60)]
+    with pytest.raises(RateLimited):
+        admission.admit(60)
+    tickets.append(admission.admit(40))
+    with pytest.raises(RateLimited):
+        admission.admit(0)
+    assert admission.stats() == {"in_flight": 2, "bytes": 100}
+    for ticket in tickets:
+        admission.release(ticket)
+    assert admission.stats() == {"in_flight": 0, "bytes": 0}
+
+
+def test_refund_returns_a_token_without_overfilling():
+    limiter = RateLimiter("x", "2/60", MemoryBuckets())
+    limiter.hit("k")
+    limiter.hit("k")
+    limiter.refund("k")
+    limiter.hit("k")
+    with pytest.raises(RateLimited):
+        limiter.hit("k")
+    fresh = RateLimiter("y", "1/60", MemoryBuckets())
+    fresh.refund("k")
+    fresh.hit("k")
+    with pytest.raises(RateLimited):
+        fresh.hit("k")
@@ -0,0 +1,72 @@
+import json
+import time
+
+import pytest
+
+from backend.services.result_cache import ResultCache, cache_key
+
+RESULT = {"score": 71.5, "analysis": {"recommendations": ["Keep going"]}}
+
+
+def test_get_returns_a_copy():
+    cache = ResultCache(db_path=None)
+    cache.put("clip", RESULT)
+    first = cache.get("clip")
+    first["score"] = 0.0
+    first["analysis"]["recommendations"].append("tampered")
+    assert cache.get("clip") == RESULT
+
+
+@pytest.mark.parametrize("persisted", [False, True])
+def test_entries_expire(tmp_path, persisted):
+    cache = ResultCache(ttl=0.01, db_path=str(tmp_path / "cache.db") if persisted else None)
+    cache.put("clip", RESULT)
+    assert cache.get("clip") == RESULT
+    time.sleep(0.02)
+    assert cache.get("clip") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_is_evicted():
+    cache = ResultCache(max_entries=2, db_path=None)
+    cache.put("a", {"score": 1})
+    cache.put("b", {"score": 2})
+    assert cache.get("a") == {"score": 1}
+    cache.put("c", {"score": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"score": 1} and cache.get("c") == {"score": 3}
+
+
+def test_byte_budget_evicts_and_skips_oversized_results():
+    size = len(json.dumps({"score": 1}))
+    cache = ResultCache(max_bytes=2 * size, db_path=None)
+    cache.put("a", {"score": 1})
+    cache.put("b", {"score": 2})
+    cache.put("c", {"score": 3})
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 2 * size
+    cache.put("big", {"score": 4, "padding": "x" * 1000})
+    assert cache.get("big") is None
+    assert cache.get("c") == {"score": 3}
+
+
+def test_sqlite_tier_is_shared_and_refills_memory(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    ResultCache(db_path=db_path).put("clip", RESULT)
+    other = ResultCache(db_path=db_path)
+    assert other.get("clip") == RESULT
+    assert other.get("clip") == RESULT
+    stats = other.stats()
+    assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1
+
+
+def test_keys_separate_versions_and_sports():
+    keys = {
+        cache_key("digest", "v1", "sprinting"),
+        cache_key("digest", "v2", "sprinting"),
+        cache_key("digest", "v1", "situps"),
+        cache_key("digest", "v1"),
+        cache_key("other", "v1", "sprinting"),
+    }
+    assert len(keys) == 5
+    assert cache_key("digest", "v1", "sprinting") == cache_key("digest", "v1", "sprinting")
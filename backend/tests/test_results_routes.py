@@ -0,0 +1,28 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.database import connection
+from backend.database.models import assessment_statements
+from backend.routes import results
+
+
+def test_read_routes_see_queued_writes_on_a_one_connection_pool(tmp_path, monkeypatch):
+    # A short pool timeout turns a deadlock into a failure instead of a hang
+    pool = connection.ConnectionPool(str(tmp_path / "app.db"), size=1, timeout=2)
+    writer = connection.BatchWriter(pool, interval_ms=60_000)
+    monkeypatch.setattr(connection, "POOL", pool)
+    monkeypatch.setattr(connection, "WRITER", writer)
+    response = {"video_id": "v1", "score": 64.0, "cheat_detected": 0, "analysis": {
+        "form_score": 60.0, "consistency_score": 50.0, "power_score": 40.0, "technique_score": 30.0}}
+    writer.add_many(assessment_statements(response, "a1", "sprinting", "test"))
+
+    app = FastAPI()
+    app.include_router(results.router)
+    client = TestClient(app)
+    assert client.get("/results/latest", params={"athlete_id": "a1"}).json()["score"] == 64.0
+    assert client.get("/results/athletes").json()["athletes"][0]["latest_score"] == 64.0
+    summary = client.get("/results/athletes/a1/summary").json()["sports"][0]
+    assert summary["best_score"] == 64.0 and summary["components"]["power"] == 40.0
+    assert client.get("/results/athletes/a1/history").json()["items"][0]["video_id"] == "v1"
+    assert client.get("/results/athletes/a1/trend").json()["points"][0]["score"] == 64.0
+    pool.close()
@@ -0,0 +1,143 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from backend.services.tflite_pool import InterpreterPool
+
+INPUT_SHAPE = (4, 3)
+
+
+class FakeInterpreter:
+    """tf.lite.Interpreter stand-in whose output is each sample's sum"""
+
+    created = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.shape = (1,) + INPUT_SHAPE
+        self.allocations = 0
+        self.invocations = 0
+        self.batches = []
+        self.busy = False
+        self.overlapped = False
+        self._input = None
+        self._output = None
+        FakeInterpreter.created.append(self)
+
+    def get_input_details(self):
+        return [{"index": 0, "shape": np.array(self.shape)}]
+
+    def get_output_details(self):
+        return [{"index": 1}]
+
+    def resize_tensor_input(self, index, shape):
+        self.shape = tuple(shape)
+
+    def allocate_tensors(self):
+        self.allocations += 1
+
+    def set_tensor(self, index, value):
+        assert value.shape == self.shape and value.dtype == np.float32
+        self._input = value
+
+    def invoke(self):
+        if self.busy:
+            self.overlapped = True
+        self.busy = True
+        time.sleep(0.002)
+        self.invocations += 1
+        self.batches.append(self._input.shape[0])
+        self._output = self._input.reshape(self._input.shape[0], -1).sum(axis=1, keepdims=True)
+        self.busy = False
+
+    def get_tensor(self, index):
+        return self._output
+
+
+FAKE_TF = SimpleNamespace(lite=SimpleNamespace(
+    Interpreter=FakeInterpreter,
+    experimental=SimpleNamespace(OpResolverType=SimpleNamespace(BUILTIN_WITHOUT_DEFAULT_DELEGATES="builtin")),
+))
+
+
+@pytest.fixture(autouse=True)
+def _fresh_interpreters():
+    FakeInterpreter.created = []
+
+
+def _pool(**kwargs) -> InterpreterPool:
+    options = {"input_shape": INPUT_SHAPE, "batch_sizes": (1, 4), "size": 2, "num_threads": 1}
+    options.update(kwargs)
+    return InterpreterPool(FAKE_TF, "model.tflite", **options)
+
+
+def _batch(count: int) -> np.ndarray:
+    return np.arange(count * 12, dtype=np.float32).reshape((count,) + INPUT_SHAPE)
+
+
+def _expected(batch: np.ndarray) -> np.ndarray:
+    return batch.reshape(batch.shape[0], -1).sum(axis=1, keepdims=True)
+
+
+def test_partial_batch_is_padded_and_trimmed():
+    pool = _pool()
+    batch = _batch(3)
+    np.testing.assert_allclose(pool.predict(batch), _expected(batch))
+    (interpreter,) = FakeInterpreter.created
+    assert interpreter.shape == (4,) + INPUT_SHAPE
+    assert interpreter.batches == [4]
+
+
+def test_single_item_uses_the_smallest_interpreter():
+    pool = _pool()
+    pool.predict(_batch(1))
+    (interpreter,) = FakeInterpreter.created
+    assert interpreter.shape == (1,) + INPUT_SHAPE
+
+
+def test_large_batch_is_split_across_the_largest_size():
+    pool = _pool()
+    batch = _batch(10)
+    np.testing.assert_allclose(pool.predict(batch), _expected(batch))
+    # 4 + 4, then the remaining 2 padded onto a batch of 4
+    assert sum((i.batches for i in FakeInterpreter.created), []) == [4, 4, 4]
+
+
+def test_interpreters_are_allocated_once_and_reused():
+    pool = _pool()
+    for _ in range(5):
+        pool.predict(_batch(4))
+    (interpreter,) = FakeInterpreter.created
+    assert interpreter.allocations == 1 and interpreter.invocations == 5
+
+
+def test_xnnpack_can_be_disabled():
+    _pool(use_xnnpack=False).predict(_batch(1))
+    assert FakeInterpreter.created[0].kwargs["experimental_op_resolver_type"] == "builtin"
+
+
+def test_concurrent_checkout_never_shares_an_interpreter():
+    pool = _pool(size=2)
+    errors = []
+
+    def work(seed: int):
+        try:
+            for i in range(20):
+                batch = _batch(4) + seed + i
+                np.testing.assert_allclose(pool.predict(batch), _expected(batch))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    # Six threads share at most `size` interpreters, never two at once
+    assert len(FakeInterpreter.created) <= 2
+    assert not any(i.overlapped for i in FakeInterpreter.created)
+    assert sum(i.invocations for i in FakeInterpreter.created) == 6 * 20
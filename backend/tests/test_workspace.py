@@ -0,0 +1,50 @@
+import shutil
+from collections import namedtuple
+
+import pytest
+
+from backend.services import workspace
+
+Usage = namedtuple("Usage", "total used free")
+MB = 1024 * 1024
+
+
+def _fake_disk(monkeypatch, tmp_path, free):
+    real_usage = shutil.disk_usage
+
+    def disk_usage(path):
+        if str(path).startswith("/dev/shm"):
+            return Usage(64 * MB, 0, 64 * MB)
+        if str(path).startswith(str(tmp_path)):
+            return Usage(10 * MB, 10 * MB - free, free)
+        return real_usage(path)
+
+    monkeypatch.setattr(workspace.shutil, "disk_usage", disk_usage)
+
+
+def test_small_tmpfs_falls_back_to_disk(tmp_path, monkeypatch):
+    monkeypatch.delenv("VIDEO_WORKSPACE_DIR", raising=False)
+    monkeypatch.setattr(workspace.tempfile, "gettempdir", lambda: str(tmp_path))
+    _fake_disk(monkeypatch, tmp_path, free=MB)
+    space = workspace.VideoWorkspace(quota_bytes=2048 * MB)
+    assert space.root == str(tmp_path / "sports_videos")
+
+
+@pytest.mark.parametrize("quota", [0, 2048 * MB])
+def test_writes_stop_at_the_filesystem_free_space(tmp_path, monkeypatch, quota):
+    _fake_disk(monkeypatch, tmp_path, free=MB)
+    space = workspace.VideoWorkspace(root=str(tmp_path / "ws"), quota_bytes=quota)
+    with space.scratch_file() as scratch:
+        scratch.write(b"x" * 1024)
+        with pytest.raises(workspace.WorkspaceQuotaExceeded):
+            scratch.write(b"x" * (2 * MB))
+    assert space.used_bytes == 0
+
+
+@pytest.mark.parametrize("quota", [0, 2048 * MB])
+def test_full_filesystem_rejects_every_write(tmp_path, monkeypatch, quota):
+    _fake_disk(monkeypatch, tmp_path, free=0)
+    space = workspace.VideoWorkspace(root=str(tmp_path / "ws"), quota_bytes=quota)
+    with space.scratch_file() as scratch:
+        with pytest.raises(workspace.WorkspaceQuotaExceeded):
+            scratch.write(b"x")
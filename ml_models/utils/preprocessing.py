@@ -1,43 +1,446 @@
+import itertools
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
 import numpy as np
 
-_USE_MEDIAPIPE = False
 try:
-    import mediapipe as mp  # type: ignore
-
-    _mp_pose = mp.solutions.pose
-    _pose = _mp_pose.Pose(static_image_mode=False,
-                          model_complexity=1,
-                          enable_segmentation=False,
-                          min_detection_confidence=0.5,
-                          min_tracking_confidence=0.5)
-    _USE_MEDIAPIPE = True
+    import cv2  # type: ignore
 except Exception:
-    _USE_MEDIAPIPE = False
+    cv2 = None
+
+# MediaPipe is imported on first use rather than at import time; it takes most of a second
+_mp_pose = None
+_USE_MEDIAPIPE = None
+_import_lock = threading.Lock()
+
+
+def _pose_solution():
+    """mp.solutions.pose, or None if MediaPipe is unavailable"""
+    global _mp_pose, _USE_MEDIAPIPE
+    if _USE_MEDIAPIPE is None:
+        with _import_lock:
+            if _USE_MEDIAPIPE is None:
+                try:
+                    import mediapipe as mp  # type: ignore
+
+                    _mp_pose = mp.solutions.pose
+                    _USE_MEDIAPIPE = True
+                except Exception:
+                    _USE_MEDIAPIPE = False
+    return _mp_pose
+
+POSE_OPTIONS = dict(static_image_mode=False,
+                    model_complexity=1,
+                    enable_segmentation=False,
+                    min_detection_confidence=0.5,
+                    min_tracking_confidence=0.5)
+
+# Idle estimators kept around for reuse; each one holds a MediaPipe graph
+POSE_POOL_SIZE = int(os.environ.get("POSE_POOL_SIZE", str(os.cpu_count() or 1)))
+# Frames are shrunk so their longer side is at most this many pixels before pose detection,
+# which works on 256px inputs internally anyway; 0 keeps the decoded resolution
+POSE_MAX_SIDE = int(os.environ.get("POSE_MAX_SIDE", "640"))
+# "linear", or "area" for anti-aliased resizing at several times the cost on large reductions
+POSE_RESIZE_INTERPOLATION = os.environ.get("POSE_RESIZE_INTERPOLATION", "linear")
+# Pose threads per video in extract_clip_pipelined. 1 keeps MediaPipe's tracking mode and
+# overlaps it with decoding; more than 1 detects each frame on its own (static mode) on
+# whichever thread is free; 0 decodes and extracts on the calling thread.
+PIPELINE_POSE_WORKERS = int(os.environ.get("PIPELINE_POSE_WORKERS", "1"))
+# Decoded frames allowed to wait for a pose thread; bounds the memory held per video
+PIPELINE_QUEUE_DEPTH = int(os.environ.get("PIPELINE_QUEUE_DEPTH", "8"))
+
+
+class LandmarkBuffer:
+    """
+    Preallocated float32 landmark storage for one clip: coords (T, 33, 3) and
+    visibility (T, 33). Frames without a detection stay all-zero.
+    """
+
+    def __init__(self, capacity: int):
+        capacity = max(1, capacity)
+        self.coords = np.zeros((capacity, 33, 3), dtype=np.float32)
+        self.visibility = np.zeros((capacity, 33), dtype=np.float32)
+        self.length = 0
+
+    def next_slot(self) -> int:
+        """Index of the next free frame, doubling the buffers if the estimate was short"""
+        return self.slot(self.length)
+
+    def slot(self, index: int) -> int:
+        """Make frame `index` addressable (frames may arrive out of order) and return it"""
+        while index >= self.coords.shape[0]:
+            grow = self.coords.shape[0]
+            self.coords = np.concatenate([self.coords, np.zeros_like(self.coords[:grow])])
+            self.visibility = np.concatenate([self.visibility, np.zeros_like(self.visibility[:grow])])
+        self.length = max(self.length, index + 1)
+        return index
+
+    @property
+    def landmarks(self) -> np.ndarray:
+        return self.coords[:self.length]
+
+    @property
+    def visibilities(self) -> np.ndarray:
+        return self.visibility[:self.length]
+
+
+def _landmarks_into(landmarks, coords_out: np.ndarray, visibility_out: np.ndarray) -> None:
+    """Copy MediaPipe landmarks into (33, 3) and (33,) views with a single fromiter pass"""
+    n = min(33, len(landmarks))
+    values = np.fromiter(
+        itertools.chain.from_iterable((p.x, p.y, p.z, p.visibility) for p in landmarks[:n]),
+        dtype=np.float32, count=n * 4,
+    ).reshape(n, 4)
+    coords_out[:n] = values[:, :3]
+    visibility_out[:n] = values[:, 3]
+
+
+class FramePreprocessor:
+    """
+    Downscale and convert BGR to RGB into buffers reused from frame to frame,
+    so a 4K frame costs one resize instead of a full-size channel-swapped copy
+    """
+
+    def __init__(self, max_side: int = POSE_MAX_SIDE, interpolation: str = POSE_RESIZE_INTERPOLATION):
+        self.max_side = max_side
+        self.interpolation = interpolation
+        self._resized = None
+        self._rgb = None
+
+    def __call__(self, frame: np.ndarray) -> np.ndarray:
+        if cv2 is None or frame.ndim != 3 or frame.shape[2] != 3 or frame.dtype != np.uint8:
+            return np.ascontiguousarray(frame[:, :, ::-1])
+        height, width = frame.shape[:2]
+        longest = max(height, width)
+        if 0 < self.max_side < longest:
+            scale = self.max_side / longest
+            shape = (max(1, round(height * scale)), max(1, round(width * scale)), 3)
+            if self._resized is None or self._resized.shape != shape:
+                self._resized = np.empty(shape, dtype=np.uint8)
+            flag = cv2.INTER_LINEAR if self.interpolation == "linear" else cv2.INTER_AREA
+            cv2.resize(frame, (shape[1], shape[0]), dst=self._resized, interpolation=flag)
+            frame = self._resized
+        if self._rgb is None or self._rgb.shape != frame.shape:
+            self._rgb = np.empty(frame.shape, dtype=np.uint8)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        return self._rgb
+
+
+class PoseEstimator:
+    """
+    A single MediaPipe Pose graph. In tracking mode it carries state from frame to frame,
+    so one estimator must only ever see one video at a time and be reset between videos.
+    With `static=True` every frame is detected on its own, so frames can be spread over
+    several estimators in any order.
+    """
+
+    def __init__(self, static: bool = False, preprocessor: Optional[Callable[[np.ndarray], np.ndarray]] = None):
+        self.options = dict(POSE_OPTIONS, static_image_mode=static)
+        self._prepare = preprocessor or FramePreprocessor()
+        solution = _pose_solution()
+        self._pose = solution.Pose(**self.options) if solution is not None else None
+
+    def reset(self) -> None:
+        """Drop tracking state left over from the previous video"""
+        if self._pose is None:
+            return
+        if hasattr(self._pose, "reset"):
+            self._pose.reset()
+        else:
+            self._pose.close()
+            self._pose = _pose_solution().Pose(**self.options)
+
+    def close(self) -> None:
+        if self._pose is not None:
+            self._pose.close()
+            self._pose = None
+
+    def extract_into(self, frame, coords_out: np.ndarray, visibility_out: np.ndarray) -> bool:
+        """
+        Write x,y,z landmarks (normalized to [0,1] where possible) into `coords_out` (33, 3)
+        and their visibility into `visibility_out` (33,). Returns False and leaves zeros
+        if MediaPipe is unavailable or detection fails.
+        """
+        coords_out[:] = 0.0
+        visibility_out[:] = 0.0
+        if self._pose is None or frame is None:
+            return False
+
+        try:
+            results = self._pose.process(self._prepare(frame))
+            if not results.pose_landmarks:
+                return False
+            _landmarks_into(results.pose_landmarks.landmark, coords_out, visibility_out)
+            return True
+        except Exception:
+            coords_out[:] = 0.0
+            visibility_out[:] = 0.0
+            return False
+
+    def extract(self, frame) -> np.ndarray:
+        """
+        Returns array shape (33, 3) for x,y,z pose landmarks normalized to [0,1] coordinates where possible.
+        Falls back to zeros if MediaPipe is unavailable or detection fails.
+        """
+        out = np.zeros((33, 3), dtype=np.float32)
+        self.extract_into(frame, out, np.zeros(33, dtype=np.float32))
+        return out
+
+    def extract_clip(self, frames: Iterable, capacity: int = 0) -> LandmarkBuffer:
+        """
+        Landmarks for the frames of one video, written straight into a buffer sized for
+        `capacity` frames (grown if the clip turns out longer)
+        """
+        buffer = LandmarkBuffer(capacity)
+        for frame in frames:
+            slot = buffer.next_slot()
+            self.extract_into(frame, buffer.coords[slot], buffer.visibility[slot])
+        return buffer
+
+    def extract_batch(self, frames: Iterable, capacity: int = 0) -> np.ndarray:
+        """Landmarks for a sequence of frames from one video as a float32 (T, 33, 3) array"""
+        return self.extract_clip(frames, capacity).landmarks
+
+
+class PoseEstimatorPool:
+    """Hands each concurrent video its own estimator so workers never share tracking state"""
+
+    def __init__(self, max_idle: int = POSE_POOL_SIZE, static: bool = False):
+        self.max_idle = max(1, max_idle)
+        self.static = static
+        self._idle: List[PoseEstimator] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def session(self) -> Iterator[PoseEstimator]:
+        """Borrow an estimator for one video; it starts with no tracking state"""
+        with self._lock:
+            estimator = self._idle.pop() if self._idle else None
+        if estimator is None:
+            estimator = PoseEstimator(self.static)
+        else:
+            estimator.reset()
+        try:
+            yield estimator
+        finally:
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(estimator)
+                    estimator = None
+            if estimator is not None:
+                estimator.close()
+
+    def warm_up(self, count: int = 1) -> None:
+        """Build `count` idle estimators and run each once so the first video skips graph setup"""
+        blank = np.zeros((256, 256, 3), dtype=np.uint8)
+        estimators = [PoseEstimator(self.static) for _ in range(max(0, count))]
+        for estimator in estimators:
+            estimator.extract(blank)
+            estimator.reset()
+        with self._lock:
+            for estimator in estimators:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(estimator)
+                else:
+                    estimator.close()
+
+
+POSE_POOL = PoseEstimatorPool()
+# Per-frame (no tracking) estimators for spreading one video's frames over several threads
+STATIC_POSE_POOL = PoseEstimatorPool(static=True)
+
+# Per-thread estimator behind the single-frame helper below
+_local = threading.local()
 
 
 def extract_pose_landmarks(frame) -> np.ndarray:
     """
     Returns array shape (33, 3) for x,y,z pose landmarks normalized to [0,1] coordinates where possible.
     Falls back to zeros if MediaPipe is unavailable or detection fails.
+    Each calling thread gets its own estimator; prefer POSE_POOL.session() for whole videos.
     """
-    if not _USE_MEDIAPIPE or frame is None:
-        return np.zeros((33, 3), dtype=float)
+    estimator = getattr(_local, "estimator", None)
+    if estimator is None:
+        estimator = _local.estimator = PoseEstimator()
+    return estimator.extract(frame)
+
+
+def extract_pose_landmarks_batch(frames: Iterable, capacity: int = 0) -> np.ndarray:
+    """Landmarks for the frames of one video as a float32 (T, 33, 3) array"""
+    with POSE_POOL.session() as estimator:
+        return estimator.extract_batch(frames, capacity)
+
+
+def warm_up_estimators() -> None:
+    """Build and prime the estimators extract_clip_pipelined will reach for first"""
+    if PIPELINE_POSE_WORKERS > 1:
+        STATIC_POSE_POOL.warm_up(PIPELINE_POSE_WORKERS)
+    else:
+        POSE_POOL.warm_up()
+
+
+_END = object()
 
+
+def _put(q: "queue.Queue[Any]", item: Any, stop: threading.Event) -> bool:
+    """Blocking put that gives up once `stop` is set"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q: "queue.Queue[Any]", stop: threading.Event) -> Any:
+    """Blocking get that returns _END once `stop` is set"""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _END
+
+
+def _decode(frames: Iterable, out: "queue.Queue[Any]", stop: threading.Event, consumers: int,
+            timings: Dict[str, float], errors: List[BaseException]) -> None:
+    """Decoder stage: push (index, frame) pairs, then one _END per consumer"""
+    busy = 0.0
     try:
-        img_rgb = frame[:, :, ::-1]
-        results = _pose.process(img_rgb)
-        if not results.pose_landmarks:
-            return np.zeros((33, 3), dtype=float)
-
-        lm = results.pose_landmarks.landmark
-        out = np.zeros((33, 3), dtype=float)
-        for i in range(min(33, len(lm))):
-            out[i, 0] = lm[i].x
-            out[i, 1] = lm[i].y
-            out[i, 2] = lm[i].z
-        return out
-    except Exception:
-        return np.zeros((33, 3), dtype=float)
+        iterator = iter(frames)
+        index = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            frame = next(iterator, _END)
+            busy += time.perf_counter() - start
+            if frame is _END or not _put(out, (index, frame), stop):
+                break
+            index += 1
+    except BaseException as exc:
+        errors.append(exc)
+    finally:
+        timings["decode_ms"] = busy * 1000
+        for _ in range(consumers):
+            _put(out, _END, stop)
+
+
+def _pose_worker(frames: "queue.Queue[Any]", results: "queue.Queue[Any]", stop: threading.Event,
+                 pose_seconds: List[float], errors: List[BaseException]) -> None:
+    """Pose stage with its own static-mode estimator: (index, coords, visibility) per frame"""
+    busy = 0.0
+    try:
+        with STATIC_POSE_POOL.session() as estimator:
+            while True:
+                item = _get(frames, stop)
+                if item is _END:
+                    break
+                index, frame = item
+                coords = np.zeros((33, 3), dtype=np.float32)
+                visibility = np.zeros(33, dtype=np.float32)
+                start = time.perf_counter()
+                estimator.extract_into(frame, coords, visibility)
+                busy += time.perf_counter() - start
+                if not _put(results, (index, coords, visibility), stop):
+                    break
+    except BaseException as exc:
+        errors.append(exc)
+        stop.set()
+    finally:
+        pose_seconds.append(busy)
+        _put(results, _END, stop)
+
+
+def extract_clip_pipelined(frames: Iterable, capacity: int = 0,
+                           workers: int = PIPELINE_POSE_WORKERS,
+                           queue_depth: int = PIPELINE_QUEUE_DEPTH) -> Tuple[LandmarkBuffer, Dict[str, float]]:
+    """
+    Landmarks for one video with decoding and pose extraction overlapped: a decoder thread
+    fills a bounded queue, `workers` pose threads drain it, and this thread collects the
+    results by frame index. Returns the buffer and per-stage timings in milliseconds.
+    """
+    started = time.perf_counter()
+    timings: Dict[str, float] = {}
+
+    if workers <= 0:
+        decode = [0.0]
 
+        def timed(iterator: Iterator) -> Iterator:
+            while True:
+                start = time.perf_counter()
+                frame = next(iterator, _END)
+                decode[0] += time.perf_counter() - start
+                if frame is _END:
+                    return
+                yield frame
 
+        with POSE_POOL.session() as estimator:
+            buffer = estimator.extract_clip(timed(iter(frames)), capacity)
+        timings["decode_ms"] = decode[0] * 1000
+        timings["extract_wall_ms"] = (time.perf_counter() - started) * 1000
+        timings["pose_ms"] = timings["extract_wall_ms"] - timings["decode_ms"]
+        return buffer, timings
+
+    frame_queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, queue_depth))
+    stop = threading.Event()
+    errors: List[BaseException] = []
+    buffer = LandmarkBuffer(capacity)
+    pose_seconds: List[float] = []
+    threads: List[threading.Thread] = []
+    decoder = threading.Thread(
+        target=_decode, name="pose-decode", daemon=True,
+        args=(frames, frame_queue, stop, 1 if workers == 1 else workers, timings, errors),
+    )
+    decoder.start()
+    try:
+        if workers == 1:
+            # Tracking mode needs the frames in order on one estimator
+            busy = 0.0
+            with POSE_POOL.session() as estimator:
+                while True:
+                    item = _get(frame_queue, stop)
+                    if item is _END:
+                        break
+                    index, frame = item
+                    slot = buffer.slot(index)
+                    start = time.perf_counter()
+                    estimator.extract_into(frame, buffer.coords[slot], buffer.visibility[slot])
+                    busy += time.perf_counter() - start
+            pose_seconds.append(busy)
+        else:
+            results: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, queue_depth))
+            for number in range(workers):
+                thread = threading.Thread(
+                    target=_pose_worker, name=f"pose-worker-{number}", daemon=True,
+                    args=(frame_queue, results, stop, pose_seconds, errors),
+                )
+                thread.start()
+                threads.append(thread)
+            remaining = workers
+            while remaining:
+                item = _get(results, stop)
+                if item is _END:
+                    remaining -= 1
+                    if stop.is_set():
+                        break
+                    continue
+                index, coords, visibility = item
+                slot = buffer.slot(index)
+                buffer.coords[slot] = coords
+                buffer.visibility[slot] = visibility
+    finally:
+        stop.set()
+        decoder.join()
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
 
+    timings["pose_ms"] = sum(pose_seconds) * 1000
+    timings["extract_wall_ms"] = (time.perf_counter() - started) * 1000
+    return buffer, timings